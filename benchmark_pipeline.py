@@ -0,0 +1,101 @@
+"""Offline throughput benchmark of the chat pipeline.
+
+Runs general_sports_chat.main() and prediction_chat.chat_loop() turns
+against the in-process FakeBackend and synthetic livescores payloads, so
+it needs no network and no API keys:
+
+    python benchmark_pipeline.py --turns 200 --threads 8 --latency 0.2
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from elo_ratings import elo_ratings
+from live_fetcher import SPORTS
+from llm_backend import FakeBackend, set_backend
+from llm_metrics import llm_metrics
+from snapshot_cache import snapshot_cache
+
+QUESTIONS = [
+    "What are the latest NBA scores?",
+    "Any goals in the Premier League today?",
+    "How is the NHL power play looking tonight?",
+    "Who is winning at Wimbledon?",
+    "Give me the MLB home run leaders from today's games",
+    "How are the Chiefs doing in the NFL?",
+    "What's happening right now?",
+    "Who do you think wins?"
+]
+
+
+def synthetic_livescores(sport: str, matches: int) -> dict:
+    """Build a statpal-shaped livescores payload with the given number of matches."""
+    games = []
+    for i in range(matches):
+        if sport == 'tennis':
+            game = {'id': f'{sport}-{i}', 'status': 'Set 2', 'player': [
+                {'name': f'Player {2 * i}', 'totalscore': '1'}, {'name': f'Player {2 * i + 1}', 'totalscore': '0'}]}
+        elif sport == 'soccer':
+            game = {'id': f'{sport}-{i}', 'status': str(10 + i % 80),
+                    'home': {'name': f'Home FC {i}', 'goals': str(i % 3)},
+                    'away': {'name': f'Away United {i}', 'goals': str(i % 2)}}
+        else:
+            game = {'id': f'{sport}-{i}', 'status': 'Q3' if i % 2 else 'Final',
+                    'home': {'name': f'Home {sport.upper()} {i}', 'totalscore': str(20 + i % 10)},
+                    'away': {'name': f'Away {sport.upper()} {i}', 'totalscore': str(18 + i % 7)}}
+        games.append(game)
+    if sport == 'soccer':
+        return {'livescore': {'league': [{'name': 'Synthetic League', 'country': 'Nowhere', 'match': games}]}}
+    return {'livescores': {'tournament': {'name': f'{sport.upper()} Synthetic', 'country': 'usa', 'match': games}}}
+
+
+def run_general_turn(index: int) -> float:
+    from general_sports_chat import main
+    started = time.perf_counter()
+    main(QUESTIONS[index % len(QUESTIONS)], session_id=f'bench-{index % 32}')
+    return time.perf_counter() - started
+
+
+def run_oracle_turn(index: int) -> float:
+    from prediction_chat import chat_loop
+    started = time.perf_counter()
+    chat_loop(QUESTIONS[index % len(QUESTIONS)], synthetic_livescores('nfl', 1), [])
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help='fake time to first token (s)')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='fake delay per token (s)')
+    parser.add_argument('--matches', type=int, default=200, help='matches per synthetic sport payload')
+    parser.add_argument('--pipeline', choices=('general', 'oracle'), default='general')
+    args = parser.parse_args()
+
+    set_backend(FakeBackend(latency=args.latency, token_latency=args.token_latency))
+    # Synthetic results must not end up in the persisted ratings
+    elo_ratings.path = None
+    # Turns read the synthetic payloads from the snapshot cache; the live poller would go to statpal
+    import general_sports_chat
+    general_sports_chat.LIVE_POLLER_AUTOSTART = False
+    for sport in SPORTS:
+        snapshot_cache.set(sport, synthetic_livescores(sport, args.matches), ttl=3600)
+
+    turn = run_general_turn if args.pipeline == 'general' else run_oracle_turn
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        latencies = sorted(pool.map(turn, range(args.turns)))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{args.turns} {args.pipeline} turns on {args.threads} threads in {elapsed:.2f}s "
+          f"({args.turns / elapsed:.1f} turns/s)")
+    print(f"turn latency p50 {latencies[len(latencies) // 2] * 1000:.0f}ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms")
+    for stage, stats in llm_metrics.stats().items():
+        print(f"  {stage}: {stats['calls']} calls, mean {stats['latency_ms']['mean']:.0f}ms, "
+              f"{stats['estimated_prompt_tokens'] // max(stats['calls'], 1)} prompt tokens/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from match_record import MatchRecord, StringTable, parse_score
+from match_status import FINAL, LIVE, SCHEDULED, classify_status
+
+# Directory holding the history segments, next to this module unless configured
+COLUMNAR_STORE_DIR = os.environ.get('COLUMNAR_STORE_DIR',
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'match_history'))
+
+# Fixed-width columns of a segment, one row per match per snapshot. String
+# fields are uint32 codes into the segment's string dictionary; scores are -1
+# when not numeric.
+COLUMNS = (
+    ('timestamp', '<f8'),
+    ('sport', '<u4'),
+    ('league', '<u4'),
+    ('country', '<u4'),
+    ('match_id', '<u4'),
+    ('home', '<u4'),
+    ('away', '<u4'),
+    ('status', '<u4'),
+    ('home_score', '<i4'),
+    ('away_score', '<i4'),
+    ('state', '|i1')
+)
+STRING_COLUMNS = ('sport', 'league', 'country', 'match_id', 'home', 'away', 'status')
+# Values of the 'state' column
+STATE_CODES = {SCHEDULED: 0, LIVE: 1, FINAL: 2}
+
+_MAGIC = b'MCOL'
+_VERSION = 1
+# magic, version, column count, row count, string count, string offsets offset, string blob offset, blob size
+_HEADER = struct.Struct('<4sHHQQQQQ')
+# column name, dtype, data offset
+_COLUMN_ENTRY = struct.Struct('<16s4sQ')
+_ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _score(value) -> int:
+    score = parse_score(value)
+    return score if score is not None else -1
+
+
+class SegmentWriter:
+    """Accumulates match-snapshot rows in memory and writes them as one segment file."""
+
+    def __init__(self):
+        self.strings = StringTable()
+        # 'state' is derived from the status codes when the segment is written
+        self.columns = {name: [] for name, _ in COLUMNS if name != 'state'}
+        self._scores = {}
+
+    def __len__(self):
+        return len(self.columns['timestamp'])
+
+    def add(self, timestamp: float, sport, league, country, match_id, home, away, status,
+            home_score, away_score) -> None:
+        code = self.strings.code
+        columns = self.columns
+        columns['timestamp'].append(timestamp)
+        columns['sport'].append(code(sport))
+        columns['league'].append(code(league))
+        columns['country'].append(code(country))
+        columns['match_id'].append(code(match_id))
+        columns['home'].append(code(home))
+        columns['away'].append(code(away))
+        columns['status'].append(code(status))
+        columns['home_score'].append(self._score(home_score))
+        columns['away_score'].append(self._score(away_score))
+
+    def _score(self, value) -> int:
+        # Raw scores repeat heavily ('0', '1', '?', ...), so conversions are memoized
+        score = self._scores.get(value)
+        if score is None:
+            score = self._scores[value] = _score(value)
+        return score
+
+    def add_record(self, record: MatchRecord, timestamp: float) -> None:
+        self.add(timestamp, record.sport, record.league, record.country, record.match_id, record.home,
+                 record.away, record.status, record.home_score, record.away_score)
+
+    def add_flat(self, match: Dict, timestamp: float) -> None:
+        """Add one match in the flat current_data layout (as archived and dumped to JSON).
+
+        Dumps written before the flat view carried match_id fall back to the
+        league and team names, as match_diff.match_key does.
+        """
+        league, home, away = match.get('league_name'), match.get('home_team'), match.get('away_team')
+        match_id = match.get('match_id')
+        if match_id in (None, '', 'N/A'):
+            match_id = f"{league}|{home}|{away}"
+        self.add(timestamp, match.get('sport'), league, match.get('country'), match_id, home, away,
+                 match.get('status'), match.get('home_score'), match.get('away_score'))
+
+    def write(self, path: str) -> None:
+        """Write the rows to path (atomically, via a temporary file)."""
+        rows = len(self)
+        encoded = [value.encode('utf-8') for value in self.strings.strings]
+        string_offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+        np.cumsum([len(value) for value in encoded], out=string_offsets[1:])
+
+        offset = _aligned(_HEADER.size + _COLUMN_ENTRY.size * len(COLUMNS))
+        layout = []
+        for name, dtype in COLUMNS:
+            layout.append((name, dtype, offset))
+            offset = _aligned(offset + rows * np.dtype(dtype).itemsize)
+        offsets_at = offset
+        blob_at = _aligned(offsets_at + string_offsets.nbytes)
+        blob = b''.join(encoded)
+        states = np.array([STATE_CODES[classify_status(value)] for value in self.strings.strings], dtype='|i1')
+        columns = dict(self.columns, state=states[np.asarray(self.columns['status'], dtype=np.intp)])
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(COLUMNS), rows, len(encoded), offsets_at, blob_at, len(blob)))
+            for name, dtype, column_at in layout:
+                f.write(_COLUMN_ENTRY.pack(name.encode('ascii'), dtype.encode('ascii'), column_at))
+            for name, dtype, column_at in layout:
+                f.seek(column_at)
+                f.write(np.asarray(columns[name], dtype=dtype).tobytes())
+            f.seek(offsets_at)
+            f.write(string_offsets.tobytes())
+            f.seek(blob_at)
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+
+class Segment:
+    """A segment file opened with mmap; columns are NumPy views of the mapping, not copies."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, column_count, self.rows, string_count, offsets_at, blob_at, blob_size = \
+            _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {_VERSION} match history segment")
+
+        self.columns = {}
+        for i in range(column_count):
+            name, dtype, column_at = _COLUMN_ENTRY.unpack_from(self._mmap, _HEADER.size + i * _COLUMN_ENTRY.size)
+            name = name.rstrip(b'\0').decode('ascii')
+            self.columns[name] = np.frombuffer(self._mmap, dtype=dtype.rstrip(b'\0').decode('ascii'), count=self.rows,
+                                               offset=column_at)
+        self._string_offsets = np.frombuffer(self._mmap, dtype='<u8', count=string_count + 1, offset=offsets_at)
+        self._blob_at = blob_at
+        self._strings = {}
+        self._codes = None
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def string(self, code: int) -> str:
+        """Decode one string dictionary entry."""
+        value = self._strings.get(code)
+        if value is None:
+            start, end = self._string_offsets[code], self._string_offsets[code + 1]
+            value = self._strings[code] = self._mmap[self._blob_at + start:self._blob_at + end].decode('utf-8')
+        return value
+
+    def code(self, value: str) -> Optional[int]:
+        """Return the dictionary code of a string, or None if the segment never saw it."""
+        if self._codes is None:
+            self._codes = {self.string(code): code for code in range(len(self._string_offsets) - 1)}
+        return self._codes.get(value)
+
+    def decode(self, name: str, rows=None) -> List[str]:
+        """Return the strings of a string column, for all rows or the selected ones."""
+        codes = self.columns[name] if rows is None else self.columns[name][rows]
+        return [self.string(int(code)) for code in codes]
+
+    def close(self) -> None:
+        self.columns = {}
+        self._string_offsets = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a column view; the mapping goes when that array is freed
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarStore:
+    """Match-snapshot history as a directory of immutable columnar segments.
+
+    Each append writes one segment: fixed-width columns (timestamp, sport,
+    league, teams, status, scores, state) followed by the segment's string
+    dictionary. Segments are opened with mmap and their columns exposed as
+    NumPy arrays over the mapping, so a scan reads no more than the pages
+    of the columns it touches and nothing is parsed or copied.
+    """
+
+    def __init__(self, root: str = COLUMNAR_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def segment_paths(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return [os.path.join(self.root, name) for name in sorted(os.listdir(self.root)) if name.endswith('.mcol')]
+
+    def append(self, writer: SegmentWriter) -> Optional[str]:
+        """Write a filled SegmentWriter as the store's next segment; returns its path."""
+        if not len(writer):
+            return None
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            paths = self.segment_paths()
+            number = int(os.path.basename(paths[-1])[:-len('.mcol')]) + 1 if paths else 1
+            path = os.path.join(self.root, f"{number:08d}.mcol")
+            writer.write(path)
+        return path
+
+    def append_records(self, records: Iterable[MatchRecord], timestamp: float) -> Optional[str]:
+        writer = SegmentWriter()
+        for record in records:
+            writer.add_record(record, timestamp)
+        return self.append(writer)
+
+    def import_archive(self, archive, sport: str, start: Optional[float] = None,
+                       end: Optional[float] = None) -> Optional[str]:
+        """Convert a range of a SnapshotArchive's polls into one segment."""
+        writer = SegmentWriter()
+        for snapshot in archive.read_range(sport, start, end):
+            for match in snapshot.matches:
+                writer.add_flat(match, snapshot.timestamp)
+        return self.append(writer)
+
+    def import_json(self, path: str, timestamp: Optional[float] = None) -> Optional[str]:
+        """Convert a flat JSON dump (e.g. soccer_filtered_data.json) into one segment."""
+        with open(path) as f:
+            matches = json.load(f)
+        timestamp = os.path.getmtime(path) if timestamp is None else timestamp
+        writer = SegmentWriter()
+        for match in matches:
+            writer.add_flat(match, timestamp)
+        return self.append(writer)
+
+    def segments(self) -> Iterator[Segment]:
+        """Open the segments one at a time, oldest first; each is closed after the caller moves on."""
+        for path in self.segment_paths():
+            with Segment(path) as segment:
+                yield segment
+
+    def scan(self, columns: Sequence[str], sport: Optional[str] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the requested columns per segment, optionally only the rows of one sport.
+
+        Without a sport filter the arrays are views of the mapped file and
+        are only valid until the next segment is yielded.
+        """
+        for segment in self.segments():
+            if sport is None:
+                yield {name: segment[name] for name in columns}
+                continue
+            code = segment.code(sport)
+            if code is None:
+                continue
+            rows = segment['sport'] == code
+            yield {name: segment[name][rows] for name in columns}
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments())
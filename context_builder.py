@@ -0,0 +1,148 @@
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from elo_ratings import elo_ratings
+from match_normalizer import NormalizedSlate
+from match_record import MatchRecord
+from match_status import FINAL, LIVE, classify_status
+from text_utils import GENERIC_NAME_WORDS, estimate_tokens
+
+# Default number of prompt tokens the live-data context may use
+LIVE_CONTEXT_TOKEN_BUDGET = int(os.environ.get('LIVE_CONTEXT_TOKEN_BUDGET', 1200))
+
+# Relevance weights used to rank matches against the user's message
+WEIGHT_TEAM_NAME = 10.0     # full team/player name mentioned
+WEIGHT_TEAM_WORD = 4.0      # a distinctive word of a team/player name mentioned
+WEIGHT_LEAGUE = 3.0         # league or country mentioned
+WEIGHT_STATUS = {LIVE: 2.0, FINAL: 0.5}
+WEIGHT_FOCUS = 20.0         # the match sport detection resolved the message to
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Kickoff date formats seen in the feeds, tried in order
+KICKOFF_DATE_FORMATS = ('%d.%m.%Y', '%Y-%m-%d', '%m/%d/%Y')
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def score_match(record: MatchRecord, message: str, message_words: set) -> float:
+    """Score how relevant a match is to a lowercased user message."""
+    score = 0.0
+    for name in (record.home, record.away):
+        name_lower = name.lower()
+        if len(name_lower) > 2 and name_lower in message:
+            score += WEIGHT_TEAM_NAME
+        else:
+            for word in _words(name_lower):
+                if len(word) > 2 and word not in GENERIC_NAME_WORDS and word in message_words:
+                    score += WEIGHT_TEAM_WORD
+                    break
+
+    league = str(record.league).lower()
+    country = str(record.country).lower()
+    if (league not in ('n/a', '') and league in message) or (
+            country not in ('n/a', '') and len(country) > 2 and country in message_words):
+        score += WEIGHT_LEAGUE
+
+    return score + WEIGHT_STATUS.get(classify_status(record.status), 0.0)
+
+
+@lru_cache(maxsize=1024)
+def _kickoff(date: str, time: str) -> Optional[datetime]:
+    for date_format in KICKOFF_DATE_FORMATS:
+        try:
+            day = datetime.strptime(str(date), date_format)
+        except ValueError:
+            continue
+        try:
+            clock = datetime.strptime(str(time), '%H:%M')
+        except ValueError:
+            return day
+        return day.replace(hour=clock.hour, minute=clock.minute)
+    return None
+
+
+def recency(record: MatchRecord, now: datetime) -> float:
+    """Seconds between a match's kickoff and now; infinite when the kickoff can't be parsed."""
+    kickoff = _kickoff(record.date, record.time)
+    return abs((now - kickoff).total_seconds()) if kickoff is not None else float('inf')
+
+
+def _same_match(record: MatchRecord, focus: MatchRecord) -> bool:
+    if record is focus:
+        return True
+    if record.sport != focus.sport:
+        return False
+    if focus.match_id not in (None, '', 'N/A'):
+        return record.match_id == focus.match_id
+    return (record.league, record.home, record.away) == (focus.league, focus.home, focus.away)
+
+
+def rank_matches(slate: NormalizedSlate, user_input: str,
+                 focus: Optional[MatchRecord] = None) -> List[Tuple[float, int]]:
+    """Return (score, index) pairs for the slate, most relevant first.
+
+    focus, the match the message was resolved to (see EntityIndex.resolve),
+    ranks above every other mention.
+
+    Ties go to the match whose kickoff is closest to now (the latest
+    results and the next fixtures), then keep the feed order, so with no
+    mentions live matches come first, then finished ones, then upcoming
+    fixtures.
+    """
+    message = (user_input or '').lower()
+    message_words = _words(message)
+    now = datetime.now()
+    ranked = [(score_match(record, message, message_words)
+               + (WEIGHT_FOCUS if focus is not None and _same_match(record, focus) else 0.0),
+               recency(record, now), i)
+              for i, record in enumerate(slate.records)]
+    ranked.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+    return [(score, i) for score, _, i in ranked]
+
+
+def build_context(slate: Optional[NormalizedSlate], user_input: str,
+                  token_budget: int = LIVE_CONTEXT_TOKEN_BUDGET, focus: Optional[MatchRecord] = None) -> str:
+    """Build the live-data context for a prompt within a token budget.
+
+    Matches are ranked by relevance to the user's message (team/player and
+    league mentions, then live status, then kickoff closest to now) and
+    emitted one compact line each while they fit the budget; a line too
+    long for what is left is skipped so shorter ones after it still fit.
+    The prompt stays the same size however large the slate grows.
+    """
+    if slate is None or not slate.records:
+        return ""
+
+    sport = slate.sport.upper()
+    header = (f"=== {sport} LIVE DATA ({datetime.now().strftime('%Y-%m-%d %H:%M')}) ===\n"
+              f"Format: Home score-score Away | status | details | league (country)"
+              f" [| model win% home/draw/away, live matches] [| elo home/away rating]\n")
+    footer = f"=== END OF {sport} DATA ===\n\n"
+    remaining = token_budget - estimate_tokens(header) - estimate_tokens(footer) - 12
+
+    probabilities = slate.win_probabilities()
+    lines = []
+    for _, index in rank_matches(slate, user_input, focus):
+        line = slate.lines[index]
+        position = probabilities.index_of(slate.records[index])
+        if position is not None:
+            line = f"{line} | {probabilities.label(position)}"
+        ratings = elo_ratings.label(slate.records[index])
+        if ratings:
+            line = f"{line} | {ratings}"
+        cost = estimate_tokens(line) + 1
+        if cost > remaining:
+            continue
+        lines.append(line)
+        remaining -= cost
+
+    context = header + "\n".join(lines) + "\n"
+    omitted = len(slate.records) - len(lines)
+    if omitted:
+        context += f"(+{omitted} less relevant {slate.sport} matches omitted)\n"
+    return context + footer
@@ -0,0 +1,225 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from live_poller import LiveSnapshot
+from match_normalizer import NormalizedSlate
+from match_record import MatchRecord, parse_score
+from match_status import is_final
+
+# Where ratings are persisted, next to this module unless configured (set to '' to keep them in memory only)
+ELO_RATINGS_PATH = os.environ.get('ELO_RATINGS_PATH',
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'elo_ratings.json'))
+# Minimum seconds between saves; results applied in between are written by the next save or at exit
+ELO_SAVE_INTERVAL = float(os.environ.get('ELO_SAVE_INTERVAL', 60))
+ELO_INITIAL_RATING = 1500.0
+
+# Rating points at stake per result, and the home side's edge in rating points
+ELO_K = {'soccer': 20.0, 'nba': 20.0, 'nfl': 20.0, 'nhl': 12.0, 'mlb': 6.0, 'tennis': 32.0}
+ELO_HOME_ADVANTAGE = {'soccer': 65.0, 'nba': 70.0, 'nfl': 55.0, 'nhl': 35.0, 'mlb': 24.0, 'tennis': 0.0}
+DEFAULT_K = 20.0
+
+# Players move between tournaments every week, so tennis ratings span the whole
+# sport; other sports are rated per league
+SPORT_WIDE_RATINGS = {'tennis'}
+# Results kept in a team's form string, most recent last
+FORM_LENGTH = 5
+# Finished match ids remembered so a result is never counted twice
+ELO_SETTLED_MAXSIZE = int(os.environ.get('ELO_SETTLED_MAXSIZE', 20000))
+
+_STORE_VERSION = 1
+
+
+def rating_key(sport: str, league: str, team: str) -> str:
+    """Return the store key of a team: 'sport|league|team' ('sport||team' for sport-wide ratings)."""
+    if sport in SPORT_WIDE_RATINGS:
+        league = ''
+    return f"{sport}|{league}|{team}"
+
+
+def result_key(record: MatchRecord) -> str:
+    """Return the id a finished match is remembered by."""
+    if record.match_id not in (None, '', 'N/A'):
+        return f"{record.sport}:{record.match_id}"
+    return f"{record.sport}:{record.league}:{record.date}:{record.home}:{record.away}"
+
+
+def expected_score(sport: str, home_rating: float, away_rating: float) -> float:
+    """Return the home side's expected score (win probability, draws counting half)."""
+    edge = home_rating + ELO_HOME_ADVANTAGE.get(sport, 0.0) - away_rating
+    return 1.0 / (1.0 + 10 ** (-edge / 400.0))
+
+
+def margin_multiplier(margin: int) -> float:
+    """Scale rating changes up for bigger wins: 1.0 for a one-score game, growing with log(margin)."""
+    return max(1.0, math.log(abs(margin) + 1))
+
+
+class TeamRating:
+    """A team's (or player's) current rating, games rated and recent form."""
+    __slots__ = ('rating', 'games', 'form')
+
+    def __init__(self, rating: float = ELO_INITIAL_RATING, games: int = 0, form: str = ''):
+        self.rating = rating
+        self.games = games
+        self.form = form
+
+    def to_list(self):
+        return [round(self.rating, 1), self.games, self.form]
+
+
+class EloRatings:
+    """Incremental Elo ratings per sport and league, fed by finished matches.
+
+    Every snapshot is scanned for matches whose status is final; each one
+    not seen before updates both sides' ratings once, in constant time.
+    Ratings and the recently settled match ids are persisted to path as
+    compact JSON, at most once per save_interval seconds; flush() writes
+    any changes still pending.
+    """
+
+    def __init__(self, path: Optional[str] = ELO_RATINGS_PATH, save_interval: float = ELO_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self._ratings: Dict[str, TeamRating] = {}
+        self._settled = OrderedDict()
+        self._dirty = False
+        self._saved_at = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._ratings)
+
+    def get(self, sport: str, league: str, team: str) -> Optional[TeamRating]:
+        """Return a team's rating, or None if it has no rated results yet."""
+        return self._ratings.get(rating_key(sport, league, team))
+
+    def rating(self, sport: str, league: str, team: str) -> float:
+        """Return a team's rating, ELO_INITIAL_RATING if it is unrated."""
+        rated = self.get(sport, league, team)
+        return rated.rating if rated is not None else ELO_INITIAL_RATING
+
+    def expected(self, sport: str, league: str, home: str, away: str) -> float:
+        """Return the home side's expected score against away from the current ratings."""
+        return expected_score(sport, self.rating(sport, league, home), self.rating(sport, league, away))
+
+    def record_result(self, record: MatchRecord) -> bool:
+        """Apply a finished match to both sides' ratings; returns False if it was not applied."""
+        if not is_final(record.status):
+            return False
+        home_score, away_score = parse_score(record.home_score), parse_score(record.away_score)
+        if home_score is None or away_score is None:
+            return False
+
+        key = result_key(record)
+        sport, league = record.sport, record.league
+        with self._lock:
+            if key in self._settled:
+                return False
+            self._settled[key] = None
+            self._dirty = True
+            while len(self._settled) > ELO_SETTLED_MAXSIZE:
+                self._settled.popitem(last=False)
+
+            home = self._ratings.setdefault(rating_key(sport, league, record.home), TeamRating())
+            away = self._ratings.setdefault(rating_key(sport, league, record.away), TeamRating())
+            expected = expected_score(sport, home.rating, away.rating)
+            actual = 1.0 if home_score > away_score else 0.0 if home_score < away_score else 0.5
+            change = ELO_K.get(sport, DEFAULT_K) * margin_multiplier(home_score - away_score) * (actual - expected)
+
+            home.rating += change
+            away.rating -= change
+            home_result, away_result = ('W', 'L') if actual == 1.0 else ('L', 'W') if actual == 0.0 else ('D', 'D')
+            for team, result in ((home, home_result), (away, away_result)):
+                team.games += 1
+                team.form = (team.form + result)[-FORM_LENGTH:]
+        return True
+
+    def update(self, slate: NormalizedSlate) -> int:
+        """Apply every newly finished match in a slate; returns how many were applied."""
+        applied = sum(1 for record in slate.records if self.record_result(record))
+        if applied and self.path and (self._saved_at is None
+                                      or time.monotonic() - self._saved_at >= self.save_interval):
+            self.save()
+        return applied
+
+    def flush(self) -> None:
+        """Save the store if results were applied since the last save."""
+        if self._dirty and self.path:
+            self.save()
+
+    def on_snapshot(self, snapshot: LiveSnapshot) -> None:
+        """LivePoller listener rating the results in each published snapshot."""
+        self.update(snapshot.slate)
+
+    def describe(self, record: MatchRecord) -> Optional[str]:
+        """Return a prompt line with both sides' ratings and form, or None if neither is rated."""
+        home = self.get(record.sport, record.league, record.home)
+        away = self.get(record.sport, record.league, record.away)
+        if home is None and away is None:
+            return None
+
+        def side(name, rated):
+            if rated is None:
+                return f"{name} unrated"
+            return f"{name} {rated.rating:.0f} (form {rated.form or '-'}, {rated.games} games)"
+
+        expected = self.expected(record.sport, record.league, record.home, record.away)
+        return f"{side(record.home, home)} vs {side(record.away, away)}: Elo expectancy {record.home} {expected:.0%}"
+
+    def label(self, record: MatchRecord) -> Optional[str]:
+        """Compact annotation for a context line, e.g. 'elo 1562/1540', when both sides are rated."""
+        home = self.get(record.sport, record.league, record.home)
+        away = self.get(record.sport, record.league, record.away)
+        if home is None or away is None:
+            return None
+        return f"elo {home.rating:.0f}/{away.rating:.0f}"
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the store as compact JSON, atomically replacing the previous file."""
+        path = path or self.path
+        with self._lock:
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            data = {
+                'version': _STORE_VERSION,
+                'ratings': {key: team.to_list() for key, team in self._ratings.items()},
+                'settled': list(self._settled)
+            }
+        tmp_path = f"{path}.tmp"
+        with self._save_lock:
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error saving Elo ratings to {path}: {e}")
+                self._dirty = True
+
+    def load(self, path: Optional[str] = None) -> None:
+        """Replace the in-memory store with the one saved at path."""
+        path = path or self.path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading Elo ratings from {path}: {e}")
+            return
+        with self._lock:
+            self._ratings = {key: TeamRating(*values) for key, values in data.get('ratings', {}).items()}
+            self._settled = OrderedDict((key, None) for key in data.get('settled', []))
+
+    def stats(self) -> Dict[str, int]:
+        return {'teams': len(self._ratings), 'settled': len(self._settled)}
+
+
+# Process-wide ratings; the chat app subscribes them to the live poller and
+# flushes pending results at exit
+elo_ratings = EloRatings()
@@ -0,0 +1,170 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from live_poller import LiveSnapshot
+from match_normalizer import NormalizedSlate
+from match_record import MatchRecord
+from text_utils import GENERIC_NAME_WORDS
+
+# Weight of a mentioned phrase by the field it names
+WEIGHT_NAME = 10.0          # full team/player name
+WEIGHT_NAME_WORD = 4.0      # distinctive word of a team/player name
+WEIGHT_LEAGUE = 3.0         # full league name
+WEIGHT_COUNTRY = 1.0        # league country
+
+# Single name words are everyday words as often as not ("new", "world", "star"):
+# deciding the sport takes a full name, a league name or this many distinct name words
+MIN_NAME_WORDS = 2
+# Longest phrase, in words, looked up in a message
+MAX_PHRASE_WORDS = 6
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _phrase(text) -> str:
+    return ' '.join(_WORD.findall(str(text).lower()))
+
+
+def record_terms(record: MatchRecord) -> Dict[str, float]:
+    """Return the phrases a match can be found by, with their weights."""
+    terms = {}
+
+    def add(phrase, weight):
+        if phrase and phrase != 'n a' and weight > terms.get(phrase, 0.0):
+            terms[phrase] = weight
+
+    for name in (record.home, record.away):
+        phrase = _phrase(name)
+        add(phrase, WEIGHT_NAME)
+        for word in phrase.split():
+            if len(word) > 2 and word not in GENERIC_NAME_WORDS:
+                add(word, WEIGHT_NAME_WORD)
+    add(_phrase(record.league), WEIGHT_LEAGUE)
+    country = _phrase(record.country)
+    if country not in GENERIC_NAME_WORDS:
+        add(country, WEIGHT_COUNTRY)
+    return terms
+
+
+class EntityMatch:
+    """Result of resolving a message against the entity index."""
+
+    def __init__(self, sport: str, record: Optional[MatchRecord], score: float):
+        self.sport = sport
+        self.record = record
+        self.score = score
+
+    def __repr__(self):
+        return f"EntityMatch({self.sport}, {self.record!r}, score={self.score})"
+
+
+class EntityIndex:
+    """Inverted index of team, player, league and country names across live slates.
+
+    Each phrase maps to the matches it names. Indexing a new slate for a
+    sport only touches matches that were added or rebuilt since the last
+    one: unchanged matches keep the same MatchRecord object between slates,
+    so the diff is done on record identity.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Tuple[str, int], float]] = {}
+        self._records: Dict[str, Dict[int, Tuple[MatchRecord, Dict[str, float]]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, slate: NormalizedSlate) -> None:
+        """Index a sport's latest slate, replacing what was indexed for it before."""
+        sport = slate.sport
+        current = {id(record): record for record in slate.records}
+        with self._lock:
+            indexed = self._records.setdefault(sport, {})
+            for record_id in [record_id for record_id in indexed if record_id not in current]:
+                _, terms = indexed.pop(record_id)
+                for phrase in terms:
+                    postings = self._postings.get(phrase)
+                    if postings is not None:
+                        postings.pop((sport, record_id), None)
+                        if not postings:
+                            del self._postings[phrase]
+
+            for record_id, record in current.items():
+                if record_id in indexed:
+                    continue
+                terms = record_terms(record)
+                indexed[record_id] = (record, terms)
+                for phrase, weight in terms.items():
+                    self._postings.setdefault(phrase, {})[(sport, record_id)] = weight
+
+    def on_snapshot(self, snapshot: LiveSnapshot) -> None:
+        """LivePoller listener keeping the index in step with published snapshots."""
+        self.update(snapshot.slate)
+
+    def clear(self, sport: Optional[str] = None) -> None:
+        with self._lock:
+            sports = [sport] if sport else list(self._records)
+            for name in sports:
+                for record_id, (_, terms) in self._records.pop(name, {}).items():
+                    for phrase in terms:
+                        postings = self._postings.get(phrase, {})
+                        postings.pop((name, record_id), None)
+                        if not postings:
+                            self._postings.pop(phrase, None)
+
+    def __len__(self):
+        return sum(len(records) for records in self._records.values())
+
+    def lookup(self, text: str) -> List[Tuple[float, str, MatchRecord]]:
+        """Return (score, sport, record) for every match named in text, best first."""
+        return [(score, sport, record) for score, sport, record, _ in self._lookup(text)]
+
+    def _lookup(self, text: str) -> List[Tuple[float, str, MatchRecord, bool]]:
+        """lookup() with, per match, whether the mention is strong enough to decide the sport."""
+        words = _WORD.findall(text.lower())
+        scores = {}
+        name_words = {}
+        decisive = set()
+        with self._lock:
+            seen = set()
+            for start in range(len(words)):
+                for end in range(start + 1, min(start + MAX_PHRASE_WORDS, len(words)) + 1):
+                    phrase = ' '.join(words[start:end])
+                    if phrase in seen:
+                        continue
+                    postings = self._postings.get(phrase)
+                    if postings is None:
+                        continue
+                    seen.add(phrase)
+                    for key, weight in postings.items():
+                        scores[key] = scores.get(key, 0.0) + weight
+                        if weight == WEIGHT_NAME_WORD:
+                            name_words[key] = name_words.get(key, 0) + 1
+                        elif weight >= WEIGHT_LEAGUE:
+                            decisive.add(key)
+            results = [(score, sport, self._records[sport][record_id][0],
+                        (sport, record_id) in decisive or name_words.get((sport, record_id), 0) >= MIN_NAME_WORDS)
+                       for (sport, record_id), score in scores.items()]
+        results.sort(key=lambda result: -result[0])
+        return results
+
+    def resolve(self, text: str) -> Optional[EntityMatch]:
+        """Resolve the sport, and the match when it is unambiguous, named in text.
+
+        Only matches named by a full team/player name, a league name or at
+        least MIN_NAME_WORDS distinct name words count. Returns None when
+        there are none or when the best of them belong to different sports.
+        """
+        results = [result[:3] for result in self._lookup(text) if result[3]]
+        if not results:
+            return None
+
+        best_score, sport, record = results[0]
+        tied = [result for result in results if result[0] == best_score]
+        if any(result[1] != sport for result in tied):
+            return None
+        return EntityMatch(sport, record if len(tied) == 1 else None, best_score)
+
+
+# Process-wide index, kept current by the bots that fetch directly and, once the
+# chat app subscribes it, by the live poller
+entity_index = EntityIndex()
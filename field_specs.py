@@ -0,0 +1,328 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+_MISSING = object()
+
+
+class Field:
+    """Declarative description of where a match field lives in a raw statpal match.
+
+    paths are tried in order and the first one that exists with a non-None
+    value wins; later paths and the default are never evaluated once an
+    earlier path matched. A path is a tuple of dict keys and list indexes and
+    may contain '{side}', '{index}' and '{player}' placeholders, which are
+    filled in per side for fields declared under 'sides'/'side_details'.
+    A custom getter(match) can be given instead of paths.
+    """
+
+    def __init__(self, *paths, default: Any = 'N/A', getter: Optional[Callable[[Dict], Any]] = None):
+        self.paths = paths
+        self.default = default
+        self.getter = getter
+
+
+def _venue(match):
+    venue = match.get('venue_name')
+    if venue:
+        return venue
+
+    venue_obj = match.get('venue')
+    if isinstance(venue_obj, dict):
+        return venue_obj.get('name', 'N/A')
+    elif isinstance(venue_obj, str):
+        return venue_obj
+
+    return 'N/A'
+
+
+def _tennis_game_score(match):
+    game_score = match.get('game_score')
+    if game_score:
+        return game_score
+    players = match.get('player')
+    if isinstance(players, list) and len(players) >= 2:
+        first, second = players[0].get('game_score'), players[1].get('game_score')
+        if first or second:
+            return f"{first or ''} - {second or ''}"
+    return 'N/A'
+
+
+def _quarter_scores(match):
+    home = match.get('home') if isinstance(match.get('home'), dict) else {}
+    away = match.get('away') if isinstance(match.get('away'), dict) else {}
+    return {
+        quarter: f"{home.get(quarter) if home.get(quarter) is not None else '0'}-"
+                 f"{away.get(quarter) if away.get(quarter) is not None else '0'}"
+        for quarter in ('q1', 'q2', 'q3', 'q4')
+    }
+
+
+# Fields every sport shares
+COMMON_FIELDS = {
+    'match_id': Field(('id',), ('match_id',)),
+    'date': Field(('date',), ('formatted_date',)),
+    'time': Field(('time',), ('match_time',), ('game_time',), ('start_time',)),
+    'status': Field(('status',), ('match_status',), ('game_status',), ('state',)),
+    'round': Field(('round',), ('week',)),
+    'venue': Field(getter=_venue),
+    'city': Field(('venue_city',), ('city',)),
+    'attendance': Field(('attendance',))
+}
+
+_TEAM_NAME = Field(('{side}', 'name'), ('{side}_team', 'name'), ('teams', '{side}', 'name'))
+_TEAM_ID = Field(('{side}', 'id'))
+
+# Per-sport field specs. 'sides' fields are declared once with '{side}' and
+# extracted for both home and away ('name', 'id' and 'score' are required);
+# 'side_details' become home_<key>/away_<key> details; 'details' are
+# sport-specific match fields. Supporting a new sport only needs an entry here.
+SPORT_FIELD_SPECS = {
+    'soccer': {
+        'sides': {
+            'name': Field(('{side}', 'name'), ('{side}_team', 'name')),
+            'id': _TEAM_ID,
+            'score': Field(('{side}', 'goals'), ('{side}_team', 'goals'))
+        },
+        'details': {
+            'minute': Field(('minute',)),
+            'half': Field(('half',)),
+            'cards': Field(('cards',), default={}),
+            'substitutions': Field(('substitutions',), default={})
+        }
+    },
+    'tennis': {
+        'sides': {
+            # statpal sends a two-element 'player' list; older feeds use home/away or player1/player2
+            'name': Field(('player', '{index}', 'name'), ('{side}', 'name'), ('{player}', 'name')),
+            'id': Field(('player', '{index}', 'id'), ('{side}', 'id'), ('{player}', 'id')),
+            'score': Field(('player', '{index}', 'totalscore'), ('player', '{index}', 'sets'),
+                           ('{side}', 'score'), ('{player}', 'sets'))
+        },
+        'side_details': {
+            'ranking': Field(('player', '{index}', 'ranking'))
+        },
+        'details': {
+            'set_score': Field(('set_score',)),
+            'game_score': Field(getter=_tennis_game_score),
+            'serving': Field(('serving',)),
+            'surface': Field(('surface',))
+        },
+        'flat': ('set_score', 'surface', 'game_score')
+    },
+    'nba': {
+        'sides': {
+            'name': _TEAM_NAME,
+            'id': _TEAM_ID,
+            'score': Field(('{side}', 'score'), ('{side}', 'totalscore'), ('{side}_team', 'score'), ('scores', '{side}'))
+        },
+        'details': {
+            'quarter': Field(('period',), ('quarter',)),
+            'time_remaining': Field(('time_remaining',)),
+            'quarter_scores': Field(('quarter_scores',), default={})
+        },
+        'flat': ('quarter', 'time_remaining')
+    },
+    'nfl': {
+        'sides': {
+            'name': _TEAM_NAME,
+            'id': _TEAM_ID,
+            'score': Field(('{side}', 'totalscore'), ('{side}', 'score'), ('{side}_team', 'score'), ('scores', '{side}'))
+        },
+        'details': {
+            'quarter': Field(('period',), ('quarter',)),
+            'week': Field(('week',)),
+            'time_remaining': Field(('timer',), ('time_remaining',)),
+            'down': Field(('down',)),
+            'distance': Field(('distance',)),
+            'possession': Field(('possession',)),
+            'venue_name': Field(('venue_name',)),
+            'quarter_scores': Field(getter=_quarter_scores)
+        },
+        'flat': ('quarter', 'week', 'time_remaining', 'venue_name', 'quarter_scores', 'attendance')
+    },
+    'mlb': {
+        'sides': {
+            'name': Field(('{side}', 'name'), ('{side}', 'team_name'), ('{side}_team', 'name'), ('teams', '{side}', 'name')),
+            'id': _TEAM_ID,
+            'score': Field(('{side}', 'totalscore'), ('{side}', 'score'), ('{side}', 'runs'),
+                           ('{side}_team', 'runs'), ('scores', '{side}'))
+        },
+        'side_details': {
+            'hits': Field(('{side}', 'hits')),
+            'errors': Field(('{side}', 'errors'))
+        },
+        'details': {
+            'inning': Field(('inning',), ('current_inning',)),
+            'inning_half': Field(('inning_half',)),
+            'outs': Field(('outs',)),
+            'balls': Field(('balls',)),
+            'strikes': Field(('strikes',)),
+            'pitcher': Field(('pitcher',), default={}),
+            'batter': Field(('batter',), default={})
+        },
+        'flat': ('inning', 'outs')
+    },
+    'nhl': {
+        'sides': {
+            'name': _TEAM_NAME,
+            'id': _TEAM_ID,
+            'score': Field(('{side}', 'totalscore'), ('{side}', 'score'), ('{side}_team', 'score'), ('scores', '{side}'))
+        },
+        'details': {
+            'period': Field(('period',)),
+            'time_remaining': Field(('timer',), ('time_remaining',)),
+            'power_play': Field(('power_play',)),
+            'fix_id': Field(('fix_id',))
+        },
+        'flat': ('period', 'time_remaining', 'fix_id')
+    }
+}
+
+_SIDE_PLACEHOLDERS = {
+    'home': {'{side}': 'home', '{index}': 0, '{player}': 'player1'},
+    'away': {'{side}': 'away', '{index}': 1, '{player}': 'player2'}
+}
+
+
+def _expand(field: Field, side: str) -> Field:
+    """Substitute the side placeholders in a per-side Field."""
+    placeholders = _SIDE_PLACEHOLDERS[side]
+    paths = []
+    for path in field.paths:
+        expanded = []
+        for key in path:
+            if key in placeholders:
+                key = placeholders[key]
+            elif isinstance(key, str) and '{side}' in key:
+                key = key.replace('{side}', side)
+            expanded.append(key)
+        paths.append(tuple(expanded))
+    return Field(*paths, default=field.default, getter=field.getter)
+
+
+def _compile_path(path: Tuple) -> Callable[[Dict], Any]:
+    """Compile a key path into a getter returning _MISSING when the path is absent or None."""
+    def step(obj, key):
+        if isinstance(key, int):
+            if isinstance(obj, list) and len(obj) > key:
+                return obj[key]
+            return _MISSING
+        if isinstance(obj, dict):
+            value = obj.get(key)
+            return _MISSING if value is None else value
+        return _MISSING
+
+    if len(path) == 1:
+        key = path[0]
+
+        def get_one(match):
+            value = match.get(key)
+            return _MISSING if value is None else value
+        return get_one
+
+    if len(path) == 2 and all(isinstance(key, str) for key in path):
+        outer, inner = path
+
+        def get_two(match):
+            obj = match.get(outer)
+            if isinstance(obj, dict):
+                value = obj.get(inner)
+                if value is not None:
+                    return value
+            return _MISSING
+        return get_two
+
+    def get_path(match):
+        obj = match
+        for key in path:
+            obj = step(obj, key)
+            if obj is _MISSING:
+                return _MISSING
+        return obj
+    return get_path
+
+
+def compile_field(field: Field) -> Callable[[Dict], Any]:
+    """Compile a Field into a single callable extractor(match) -> value."""
+    if field.getter is not None:
+        return field.getter
+
+    getters = tuple(_compile_path(path) for path in field.paths)
+    default = field.default
+
+    if len(getters) == 1:
+        getter = getters[0]
+
+        def extract_one(match):
+            value = getter(match)
+            return default if value is _MISSING else value
+        return extract_one
+
+    def extract_first(match):
+        for getter in getters:
+            value = getter(match)
+            if value is not _MISSING:
+                return value
+        return default
+    return extract_first
+
+
+class SportExtractor:
+    """All field extractors for one sport, compiled once from its spec."""
+
+    def __init__(self, sport: str, spec: Dict):
+        self.sport = sport
+        self.common = tuple((name, compile_field(field)) for name, field in COMMON_FIELDS.items())
+        sides = spec['sides']
+        self.home_name = compile_field(_expand(sides['name'], 'home'))
+        self.away_name = compile_field(_expand(sides['name'], 'away'))
+        self.sides = tuple(
+            (f'{side}_{name}' if name != 'name' else side, compile_field(_expand(field, side)))
+            for side in ('home', 'away') for name, field in sides.items() if name != 'name'
+        )
+        self.details = tuple(
+            compile_field(field) for field in spec.get('details', {}).values()
+        ) + tuple(
+            compile_field(_expand(field, side))
+            for side in ('home', 'away') for field in spec.get('side_details', {}).values()
+        )
+
+    def extract(self, match: Dict) -> Optional[Dict[str, Any]]:
+        """Return MatchRecord keyword arguments for a raw match, or None if a side has no name.
+
+        Names are resolved first so matches that will be dropped never pay for
+        the remaining fields.
+        """
+        home = self.home_name(match)
+        if home == 'N/A':
+            return None
+        away = self.away_name(match)
+        if away == 'N/A':
+            return None
+
+        fields = {'sport': self.sport, 'home': home, 'away': away}
+        for name, extract in self.common:
+            fields[name] = extract(match)
+        for name, extract in self.sides:
+            fields[name] = extract(match)
+        fields['details'] = tuple(extract(match) for extract in self.details)
+        return fields
+
+
+def detail_keys(sport: str) -> Tuple[str, ...]:
+    """Return the detail field names of a sport in MatchRecord.details order."""
+    spec = SPORT_FIELD_SPECS.get(sport, {})
+    return tuple(spec.get('details', {})) + tuple(
+        f'{side}_{name}' for side in ('home', 'away') for name in spec.get('side_details', {})
+    )
+
+
+_extractors = {}
+
+
+def get_extractor(sport: str) -> Optional[SportExtractor]:
+    """Return the compiled extractor for a sport, or None if it has no spec."""
+    extractor = _extractors.get(sport)
+    if extractor is None and sport in SPORT_FIELD_SPECS:
+        extractor = _extractors[sport] = SportExtractor(sport, SPORT_FIELD_SPECS[sport])
+    return extractor
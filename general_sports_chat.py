@@ -1,551 +1,71 @@
+import atexit
 import os 
 import openai
 import re
-import json
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import requests
+from context_builder import build_context
+from elo_ratings import elo_ratings
+from entity_index import entity_index
+from keyword_automaton import KeywordAutomaton
+from live_poller import live_poller
+from llm_metrics import chat_completion
+from llm_stream import ResponseStream, iter_completion_text
+from match_normalizer import normalize_livescores
+from session_registry import session_registry
+from snapshot_archive import snapshot_archive
+from snapshot_cache import SNAPSHOT_CACHE_TTL, TTLCache, get_livescores
+from snapshot_store import snapshot_store
 
 load_dotenv()
 
-OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
-openai.api_key = OPENAI_API_KEY
-api_key = os.environ.get('STATPAL_API_KEY')
+# Every snapshot the live poller publishes feeds the name index, the Elo ratings
+# and the history archive; Elo results still pending a save are written at exit
+live_poller.subscribe(entity_index.on_snapshot)
+live_poller.subscribe(elo_ratings.on_snapshot)
+live_poller.subscribe(snapshot_archive.on_snapshot)
+atexit.register(elo_ratings.flush)
 
-# Your existing API URLs and functions
-url_soccer = 'https://statpal.io/api/v1/soccer/livescores' 
-url_nhl = 'https://statpal.io/api/v1/nhl/livescores'
-url_nba = 'https://statpal.io/api/v1/nba/livescores'
-url_nfl = 'https://statpal.io/api/v1/nfl/livescores'
-url_mlb = 'https://statpal.io/api/v1/mlb/livescores'
-url_tennis = 'https://statpal.io/api/v1/tennis/livescores'
+# Start the live poller on the first chat turn so later turns read live data from
+# memory; set to 0 when something else owns the poller (or for offline runs)
+LIVE_POLLER_AUTOSTART = os.environ.get('LIVE_POLLER_AUTOSTART', '1') not in ('0', 'false', 'False')
 
-params = {"access_key": api_key}
-
-class DynamicSportsBot:
-    def __init__(self):
-        self.current_sport = None
-        self.current_data = None
-        self.raw_data = None  # Store raw data for full access
-        self.conversation_history = []
-        
-        # Sport detection keywords and patterns
-        self.sport_keywords = {
-            'soccer': ['soccer', 'football', 'fifa', 'premier league', 'champions league', 'la liga', 'bundesliga', 'serie a', 'messi', 'ronaldo', 'goal', 'penalty', 'offside'],
-            'nba': ['nba', 'basketball', 'lebron', 'curry', 'lakers', 'warriors', 'celtics', 'nets', 'dunk', 'three pointer', 'playoffs'],
-            'nfl': ['nfl', 'american football', 'super bowl', 'patriots', 'cowboys', 'packers', 'touchdown', 'quarterback', 'playoff'],
-            'nhl': ['nhl', 'hockey', 'ice hockey', 'stanley cup', 'rangers', 'bruins', 'maple leafs', 'goal', 'assist', 'power play'],
-            'mlb': ['mlb', 'baseball', 'world series', 'yankees', 'red sox', 'dodgers', 'home run', 'pitcher', 'batting'],
-            'tennis': ['tennis', 'wimbledon', 'us open', 'french open', 'australian open', 'federer', 'nadal', 'djokovic', 'serve', 'ace', 'match point']
-        }
-
-    def detect_sport_from_text(self, user_input):
-        """Dynamically detect sport category from user input using AI"""
-        try:
-            # First, try keyword matching for quick detection
-            user_input_lower = user_input.lower()
-            sport_scores = {}
-            
-            for sport, keywords in self.sport_keywords.items():
-                score = sum(1 for keyword in keywords if keyword in user_input_lower)
-                if score > 0:
-                    sport_scores[sport] = score
-            
-            # If we have a clear winner from keywords, return it
-            if sport_scores:
-                detected_sport = max(sport_scores, key=sport_scores.get)
-                return detected_sport
-            
-            # If no clear match, use AI for more sophisticated detection
-            prompt = f"""
-            Analyze this user message and determine which sport they're asking about. 
-            Return ONLY the sport name from this list: soccer, nba, nfl, nhl, mlb, tennis
-            If no specific sport is mentioned, return 'general'
-            
-            User message: "{user_input}"
-            
-            Sport:"""
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
-                temperature=0.2
-            )
-            
-            detected_sport = response.choices[0].message.content.strip().lower()
-            
-            # Validate the response
-            valid_sports = ['soccer', 'nba', 'nfl', 'nhl', 'mlb', 'tennis']
-            if detected_sport in valid_sports:
-                return detected_sport
-            else:
-                return 'general'
-                
-        except Exception as e:
-            print(f"Error in sport detection: {e}")
-            return 'general'
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+openai.api_key = OPENAI_API_KEY
 
-    def fetch_sport_data(self, sport):
-        """Fetch data for a specific sport (your existing function)"""
-        url_map = {
-            "soccer": url_soccer,
-            "nhl": url_nhl,
-            "nba": url_nba,
-            "nfl": url_nfl,
-            "mlb": url_mlb,
-            "tennis": url_tennis
-        }
-
-        if sport not in url_map:
-            return None
+# Sport detection keywords; (keyword, weight) entries count more than plain ones
+SPORT_KEYWORDS = {
+    'soccer': [('soccer', 2.0), 'football', 'fifa', 'premier league', 'champions league', 'la liga', 'bundesliga', 'serie a', 'messi', 'ronaldo', 'goal', 'penalty', 'offside'],
+    'nba': [('nba', 2.0), 'basketball', 'lebron', 'curry', 'lakers', 'warriors', 'celtics', 'nets', 'dunk', 'three pointer', 'playoffs'],
+    'nfl': [('nfl', 2.0), 'american football', 'super bowl', 'patriots', 'cowboys', 'packers', 'touchdown', 'quarterback', 'playoff'],
+    'nhl': [('nhl', 2.0), 'hockey', 'ice hockey', 'stanley cup', 'rangers', 'bruins', 'maple leafs', 'goal', 'assist', 'power play'],
+    'mlb': [('mlb', 2.0), 'baseball', 'world series', 'yankees', 'red sox', 'dodgers', 'home run', 'pitcher', 'batting'],
+    'tennis': [('tennis', 2.0), 'wimbledon', 'us open', 'french open', 'australian open', 'federer', 'nadal', 'djokovic', 'serve', 'ace', 'match point']
+}
+SPORT_KEYWORD_AUTOMATON = KeywordAutomaton(SPORT_KEYWORDS)
 
-        try:
-            response = requests.get(url_map[sport], params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching {sport} data: {e}")
-            return None
+# LLM sport classifications are reused for repeated questions across bots and sessions
+SPORT_DETECTION_CACHE_TTL = float(os.environ.get('SPORT_DETECTION_CACHE_TTL', 3600))
+SPORT_DETECTION_CACHE_MAXSIZE = int(os.environ.get('SPORT_DETECTION_CACHE_MAXSIZE', 4096))
+sport_detection_cache = TTLCache(maxsize=SPORT_DETECTION_CACHE_MAXSIZE, ttl=SPORT_DETECTION_CACHE_TTL)
 
-    def safe_get_nested(self, obj, *keys, default='N/A'):
-        """Safely get nested dictionary values with fallback."""
-        for key in keys:
-            if isinstance(obj, dict) and key in obj:
-                obj = obj[key]
-            else:
-                return default
-        return obj if obj is not None else default
-
-    def safe_get_venue(self, match):
-        """Safely extract venue information from match data."""
-        venue = match.get('venue_name')
-        if venue:
-            return venue
-        
-        venue_obj = match.get('venue')
-        if isinstance(venue_obj, dict):
-            return venue_obj.get('name', 'N/A')
-        elif isinstance(venue_obj, str):
-            return venue_obj
-        
-        return 'N/A'
+# Overlap the live-data fetch for a guessed sport with LLM sport classification
+PIPELINED_TURNS = os.environ.get('PIPELINED_TURNS', '1') not in ('0', 'false', 'False')
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='turn-prefetch')
 
-    def filter_important_data(self, data, sport):
-        """Filter and return the most important data from the response for any sport (your existing function with minor modifications)"""
-        important_data = []
-        
-        # Handle different API response structures
-        matches_data = []
-        
-        # Try different possible data structures
-        if 'livescore' in data:
-            for league in data['livescore'].get('league', []):
-                league_name = league.get('name', 'N/A')
-                country = league.get('country', 'N/A')
-                for match in league.get('match', []):
-                    matches_data.append((match, league_name, country))
-        
-        elif 'livescores' in data:
-            tournaments = data['livescores'].get('tournament', [])
-            
-            if isinstance(tournaments, dict):
-                tournaments = [tournaments]
-            
-            for tournament in tournaments:
-                league_name = tournament.get('name', tournament.get('league', 'N/A'))
-                country = tournament.get('country', 'N/A')
-                matches = tournament.get('match', [])
-                
-                if isinstance(matches, dict):
-                    matches = [matches]
-                
-                for match in matches:
-                    matches_data.append((match, league_name, country))
-        
-        # Process each match based on sport type
-        for match, league_name, country in matches_data:
-            if not isinstance(match, dict):
-                continue
-                
-            match_info = {
-                'time': 'N/A',
-                'home_team': 'N/A',
-                'home_score': 'N/A',
-                'away_team': 'N/A',
-                'away_score': 'N/A',
-                'status': 'N/A',
-                'league_name': league_name,
-                'country': country,
-                'venue': 'N/A',
-                'sport': sport,
-                'date': 'N/A'
-            }
-            
-            try:
-                # Extract common fields
-                match_info['time'] = match.get('time', match.get('match_time', match.get('game_time', match.get('start_time', 'N/A'))))
-                match_info['status'] = match.get('status', match.get('match_status', match.get('game_status', match.get('state', 'N/A'))))
-                match_info['venue'] = self.safe_get_venue(match)
-                match_info['date'] = match.get('date', match.get('formatted_date', 'N/A'))
-                
-                if sport.lower() == "soccer":
-                    match_info.update({
-                        'home_team': self.safe_get_nested(match, 'home', 'name', default=
-                                    self.safe_get_nested(match, 'home_team', 'name', default='N/A')),
-                        'home_score': self.safe_get_nested(match, 'home', 'goals', default=
-                                     self.safe_get_nested(match, 'home_team', 'goals', default='N/A')),
-                        'away_team': self.safe_get_nested(match, 'away', 'name', default=
-                                    self.safe_get_nested(match, 'away_team', 'name', default='N/A')),
-                        'away_score': self.safe_get_nested(match, 'away', 'goals', default=
-                                     self.safe_get_nested(match, 'away_team', 'goals', default='N/A'))
-                    })
-                
-                elif sport.lower() == "tennis":
-                    players = match.get('player', [])
-                    if len(players) >= 2:
-                        player1 = players[0]
-                        player2 = players[1]
-                        
-                        match_info.update({
-                            'home_team': player1.get('name', 'N/A'),
-                            'home_score': player1.get('totalscore', player1.get('sets', 'N/A')),
-                            'away_team': player2.get('name', 'N/A'),
-                            'away_score': player2.get('totalscore', player2.get('sets', 'N/A')),
-                            'set_score': match.get('set_score', 'N/A'),
-                            'surface': match.get('surface', 'N/A')
-                        })
-                
-                elif sport.lower() == "nba":
-                    match_info.update({
-                        'home_team': self.safe_get_nested(match, 'home', 'name', default='N/A'),
-                        'home_score': self.safe_get_nested(match, 'home', 'score', default='N/A'),
-                        'away_team': self.safe_get_nested(match, 'away', 'name', default='N/A'),
-                        'away_score': self.safe_get_nested(match, 'away', 'score', default='N/A'),
-                        'quarter': match.get('period', match.get('quarter', 'N/A'))
-                    })
-                
-                elif sport.lower() == "nfl":
-                    match_info.update({
-                        'home_team': self.safe_get_nested(match, 'home', 'name', default='N/A'),
-                        'home_score': self.safe_get_nested(match, 'home', 'totalscore', default='N/A'),
-                        'away_team': self.safe_get_nested(match, 'away', 'name', default='N/A'),
-                        'away_score': self.safe_get_nested(match, 'away', 'totalscore', default='N/A'),
-                        'quarter': match.get('period', match.get('quarter', 'N/A'))
-                    })
-                
-                elif sport.lower() == "mlb":
-                    match_info.update({
-                        'home_team': self.safe_get_nested(match, 'home', 'name', default='N/A'),
-                        'home_score': self.safe_get_nested(match, 'home', 'totalscore', default='N/A'),
-                        'away_team': self.safe_get_nested(match, 'away', 'name', default='N/A'),
-                        'away_score': self.safe_get_nested(match, 'away', 'totalscore', default='N/A'),
-                        'inning': match.get('inning', 'N/A')
-                    })
-                
-                elif sport.lower() == "nhl":
-                    match_info.update({
-                        'home_team': self.safe_get_nested(match, 'home', 'name', default='N/A'),
-                        'home_score': self.safe_get_nested(match, 'home', 'totalscore', default='N/A'),
-                        'away_team': self.safe_get_nested(match, 'away', 'name', default='N/A'),
-                        'away_score': self.safe_get_nested(match, 'away', 'totalscore', default='N/A'),
-                        'period': match.get('period', 'N/A')
-                    })
-                
-                # Only add matches with valid team names
-                if match_info['home_team'] != 'N/A' and match_info['away_team'] != 'N/A':
-                    important_data.append(match_info)
-                    
-            except Exception as e:
-                print(f"Error processing match data for {sport}: {e}")
-                continue
-        
-        return important_data
+_PUNCTUATION = re.compile(r"[^\w\s]+", re.UNICODE)
 
-    def update_sport_data(self, sport):
-        """Update the current sport data"""
-        if sport != 'general':
-            print(f"Fetching live data for {sport}...")
-            raw_data = self.fetch_sport_data(sport)
-            if raw_data:
-                self.raw_data = raw_data  # Store the complete raw data
-                self.current_data = self.filter_important_data(raw_data, sport)
-                self.current_sport = sport
-                print(f"Successfully updated {sport} data with {len(self.current_data)} matches")
-            else:
-                print(f"Failed to fetch data for {sport}")
-                self.current_data = None
-                self.raw_data = None
 
-    def create_enhanced_data_context(self, raw_data, sport):
-        """Create a comprehensive but token-efficient data context"""
-        context = f"=== ENHANCED {sport.upper()} LIVE DATA CONTEXT ===\n"
-        
-        # Extract and structure key information from raw data
-        enhanced_matches = []
-        
-        try:
-            # Navigate through different API structures
-            matches_data = []
-            
-            if 'livescore' in raw_data:
-                for league in raw_data['livescore'].get('league', []):
-                    league_info = {
-                        'name': league.get('name', 'N/A'),
-                        'country': league.get('country', 'N/A'),
-                        'season': league.get('season', 'N/A')
-                    }
-                    for match in league.get('match', []):
-                        matches_data.append((match, league_info))
-            
-            elif 'livescores' in raw_data:
-                tournaments = raw_data['livescores'].get('tournament', [])
-                if isinstance(tournaments, dict):
-                    tournaments = [tournaments]
-                
-                for tournament in tournaments:
-                    league_info = {
-                        'name': tournament.get('name', tournament.get('league', 'N/A')),
-                        'country': tournament.get('country', 'N/A'),
-                        'season': tournament.get('season', 'N/A')
-                    }
-                    matches = tournament.get('match', [])
-                    if isinstance(matches, dict):
-                        matches = [matches]
-                    
-                    for match in matches:
-                        matches_data.append((match, league_info))
-            
-            # Process matches with comprehensive data extraction
-            for match, league_info in matches_data:
-                if not isinstance(match, dict):
-                    continue
-                
-                enhanced_match = {
-                    'league': league_info,
-                    'basic_info': {},
-                    'teams': {},
-                    'score_info': {},
-                    'game_details': {},
-                    'venue_info': {}
-                }
-                
-                # Basic match information
-                enhanced_match['basic_info'] = {
-                    'match_id': match.get('id', match.get('match_id', 'N/A')),
-                    'date': match.get('date', match.get('formatted_date', 'N/A')),
-                    'time': match.get('time', match.get('match_time', match.get('start_time', 'N/A'))),
-                    'status': match.get('status', match.get('match_status', match.get('state', 'N/A'))),
-                    'round': match.get('round', match.get('week', 'N/A'))
-                }
-                
-                # Venue information
-                enhanced_match['venue_info'] = {
-                    'name': self.safe_get_venue(match),
-                    'city': match.get('venue_city', match.get('city', 'N/A')),
-                    'attendance': match.get('attendance', 'N/A')
-                }
-                
-                # Team and score information (sport-specific)
-                if sport.lower() == 'soccer':
-                    enhanced_match['teams'] = {
-                        'home': {
-                            'name': self.safe_get_nested(match, 'home', 'name'),
-                            'id': self.safe_get_nested(match, 'home', 'id'),
-                            'goals': self.safe_get_nested(match, 'home', 'goals')
-                        },
-                        'away': {
-                            'name': self.safe_get_nested(match, 'away', 'name'),
-                            'id': self.safe_get_nested(match, 'away', 'id'),
-                            'goals': self.safe_get_nested(match, 'away', 'goals')
-                        }
-                    }
-                    enhanced_match['game_details'] = {
-                        'minute': match.get('minute', 'N/A'),
-                        'half': match.get('half', 'N/A'),
-                        'cards': match.get('cards', {}),
-                        'substitutions': match.get('substitutions', {})
-                    }
-                
-                elif sport.lower() == 'mlb':
-                    enhanced_match['teams'] = {
-                        'home': {
-                            'name': self.safe_get_nested(match, 'home', 'name'),
-                            'id': self.safe_get_nested(match, 'home', 'id'),
-                            'score': self.safe_get_nested(match, 'home', 'totalscore'),
-                            'hits': self.safe_get_nested(match, 'home', 'hits'),
-                            'errors': self.safe_get_nested(match, 'home', 'errors')
-                        },
-                        'away': {
-                            'name': self.safe_get_nested(match, 'away', 'name'),
-                            'id': self.safe_get_nested(match, 'away', 'id'),
-                            'score': self.safe_get_nested(match, 'away', 'totalscore'),
-                            'hits': self.safe_get_nested(match, 'away', 'hits'),
-                            'errors': self.safe_get_nested(match, 'away', 'errors')
-                        }
-                    }
-                    enhanced_match['game_details'] = {
-                        'inning': match.get('inning', 'N/A'),
-                        'inning_half': match.get('inning_half', 'N/A'),
-                        'outs': match.get('outs', 'N/A'),
-                        'balls': match.get('balls', 'N/A'),
-                        'strikes': match.get('strikes', 'N/A'),
-                        'pitcher': match.get('pitcher', {}),
-                        'batter': match.get('batter', {})
-                    }
-                
-                elif sport.lower() == 'nba':
-                    enhanced_match['teams'] = {
-                        'home': {
-                            'name': self.safe_get_nested(match, 'home', 'name'),
-                            'id': self.safe_get_nested(match, 'home', 'id'),
-                            'score': self.safe_get_nested(match, 'home', 'score')
-                        },
-                        'away': {
-                            'name': self.safe_get_nested(match, 'away', 'name'),
-                            'id': self.safe_get_nested(match, 'away', 'id'),
-                            'score': self.safe_get_nested(match, 'away', 'score')
-                        }
-                    }
-                    enhanced_match['game_details'] = {
-                        'quarter': match.get('period', match.get('quarter', 'N/A')),
-                        'time_remaining': match.get('time_remaining', 'N/A'),
-                        'quarter_scores': match.get('quarter_scores', {})
-                    }
-                
-                elif sport.lower() == 'nfl':
-                    enhanced_match['teams'] = {
-                        'home': {
-                            'name': self.safe_get_nested(match, 'home', 'name'),
-                            'id': self.safe_get_nested(match, 'home', 'id'),
-                            'score': self.safe_get_nested(match, 'home', 'totalscore')
-                        },
-                        'away': {
-                            'name': self.safe_get_nested(match, 'away', 'name'),
-                            'id': self.safe_get_nested(match, 'away', 'id'),
-                            'score': self.safe_get_nested(match, 'away', 'totalscore')
-                        }
-                    }
-                    enhanced_match['game_details'] = {
-                        'quarter': match.get('period', match.get('quarter', 'N/A')),
-                        'time_remaining': match.get('time_remaining', 'N/A'),
-                        'down': match.get('down', 'N/A'),
-                        'distance': match.get('distance', 'N/A'),
-                        'possession': match.get('possession', 'N/A')
-                    }
-                
-                elif sport.lower() == 'nhl':
-                    enhanced_match['teams'] = {
-                        'home': {
-                            'name': self.safe_get_nested(match, 'home', 'name'),
-                            'id': self.safe_get_nested(match, 'home', 'id'),
-                            'score': self.safe_get_nested(match, 'home', 'totalscore')
-                        },
-                        'away': {
-                            'name': self.safe_get_nested(match, 'away', 'name'),
-                            'id': self.safe_get_nested(match, 'away', 'id'),
-                            'score': self.safe_get_nested(match, 'away', 'totalscore')
-                        }
-                    }
-                    enhanced_match['game_details'] = {
-                        'period': match.get('period', 'N/A'),
-                        'time_remaining': match.get('time_remaining', 'N/A'),
-                        'power_play': match.get('power_play', 'N/A')
-                    }
-                
-                elif sport.lower() == 'tennis':
-                    players = match.get('player', [])
-                    if len(players) >= 2:
-                        enhanced_match['teams'] = {
-                            'player1': {
-                                'name': players[0].get('name', 'N/A'),
-                                'id': players[0].get('id', 'N/A'),
-                                'score': players[0].get('totalscore', players[0].get('sets', 'N/A')),
-                                'ranking': players[0].get('ranking', 'N/A')
-                            },
-                            'player2': {
-                                'name': players[1].get('name', 'N/A'),
-                                'id': players[1].get('id', 'N/A'),
-                                'score': players[1].get('totalscore', players[1].get('sets', 'N/A')),
-                                'ranking': players[1].get('ranking', 'N/A')
-                            }
-                        }
-                        enhanced_match['game_details'] = {
-                            'set_score': match.get('set_score', 'N/A'),
-                            'game_score': match.get('game_score', 'N/A'),
-                            'serving': match.get('serving', 'N/A'),
-                            'surface': match.get('surface', 'N/A')
-                        }
-                
-                # Only add matches with valid team/player names
-                if ((enhanced_match['teams'].get('home', {}).get('name', 'N/A') != 'N/A' and 
-                     enhanced_match['teams'].get('away', {}).get('name', 'N/A') != 'N/A') or
-                    (enhanced_match['teams'].get('player1', {}).get('name', 'N/A') != 'N/A' and 
-                     enhanced_match['teams'].get('player2', {}).get('name', 'N/A') != 'N/A')):
-                    enhanced_matches.append(enhanced_match)
-        
-        except Exception as e:
-            print(f"Error processing enhanced data: {e}")
-        
-        # Create structured context
-        context += f"SPORT: {sport.upper()}\n"
-        context += f"TOTAL MATCHES: {len(enhanced_matches)}\n"
-        context += f"DATA TIMESTAMP: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        
-        # Add structured match data
-        for i, match in enumerate(enhanced_matches):
-            context += f"MATCH {i+1}:\n"
-            context += f"  League: {match['league']['name']} ({match['league']['country']})\n"
-            
-            if sport.lower() == 'tennis':
-                context += f"  Players: {match['teams']['player1']['name']} vs {match['teams']['player2']['name']}\n"
-                context += f"  Score: {match['teams']['player1']['score']} - {match['teams']['player2']['score']}\n"
-                if match['game_details']['set_score'] != 'N/A':
-                    context += f"  Set Score: {match['game_details']['set_score']}\n"
-                if match['game_details']['surface'] != 'N/A':
-                    context += f"  Surface: {match['game_details']['surface']}\n"
-            else:
-                context += f"  Teams: {match['teams']['home']['name']} vs {match['teams']['away']['name']}\n"
-                context += f"  Score: {match['teams']['home']['score']} - {match['teams']['away']['score']}\n"
-            
-            context += f"  Status: {match['basic_info']['status']}\n"
-            context += f"  Time: {match['basic_info']['time']}\n"
-            context += f"  Venue: {match['venue_info']['name']}\n"
-            
-            # Add sport-specific details
-            if sport.lower() == 'mlb':
-                if match['game_details']['inning'] != 'N/A':
-                    context += f"  Inning: {match['game_details']['inning']}\n"
-                if match['teams']['home']['hits'] != 'N/A':
-                    context += f"  Hits: {match['teams']['home']['name']} {match['teams']['home']['hits']}, {match['teams']['away']['name']} {match['teams']['away']['hits']}\n"
-            elif sport.lower() == 'nba':
-                if match['game_details']['quarter'] != 'N/A':
-                    context += f"  Quarter: {match['game_details']['quarter']}\n"
-            elif sport.lower() == 'nfl':
-                if match['game_details']['quarter'] != 'N/A':
-                    context += f"  Quarter: {match['game_details']['quarter']}\n"
-            elif sport.lower() == 'nhl':
-                if match['game_details']['period'] != 'N/A':
-                    context += f"  Period: {match['game_details']['period']}\n"
-            
-            context += "\n" + "-" * 40 + "\n"
-        
-        context += f"=== END OF {sport.upper()} DATA ===\n\n"
-        return context
+def normalize_utterance(text):
+    """Casefold text, strip punctuation and collapse whitespace for use as a cache key"""
+    return ' '.join(_PUNCTUATION.sub(' ', text.casefold()).split())
 
-    def generate_response(self, user_input):
-        """Generate AI response using enhanced structured sport data"""
-        try:
-            # Build comprehensive but efficient context
-            context = ""
-            if self.raw_data and self.current_sport:
-                context = self.create_enhanced_data_context(self.raw_data, self.current_sport)
-            
-            # Create conversation prompt with FULL data access
-      
-            system_prompt = f"""You are ATLAS - the Advanced Total Live Athletic Sports AI, your ultimate sports companion who lives and breathes every game, every play, and every moment of athletic greatness. Think of me as that friend who never misses a game, remembers every stat, and gets genuinely excited talking about sports with you.
 
-            {context}
+# Static ATLAS persona prompt, built once. It is the byte-identical prefix of every
+# ATLAS system prompt so provider-side prompt caching can reuse it; session state
+# and live data are appended after it in build_messages.
+ATLAS_SYSTEM_PROMPT = """You are ATLAS - the Advanced Total Live Athletic Sports AI, your ultimate sports companion who lives and breathes every game, every play, and every moment of athletic greatness. Think of me as that friend who never misses a game, remembers every stat, and gets genuinely excited talking about sports with you.
 
             === WHO I AM ===
             🏆 **My Sports Identity**: 
@@ -666,22 +186,221 @@ class DynamicSportsBot:
             - Miss opportunities to create engaging dialogue
             - Overwhelm casual fans with excessive technical detail
 
-            **Current Sport Focus**: {self.current_sport if self.current_sport else 'Ready to dive into any sport you want to talk about!'}
-            **Live Data Status**: {'Locked and loaded with real-time sports action!' if self.raw_data else 'Standing by for live sports data'}
             **Conversation Mode**: Sports storyteller + Real-time analyst + Your personal sports companion
 
             Remember: I'm not just an information provider - I'm ATLAS, your passionate sports companion who turns every conversation into an engaging sports experience. Every response should feel like talking to your most knowledgeable, enthusiastic sports friend who never runs out of great stories and insights!"""
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ]
+class DynamicSportsBot:
+    def __init__(self):
+        self.current_sport = None
+        self.current_data = None
+        self.raw_data = None  # Store raw data for full access
+        self.current_slate = None  # Normalized view of raw_data
+        self.snapshot = None  # StoredSnapshot that raw_data came from, referenced from history
+        self.data_loaded_at = 0.0  # When raw_data was fetched, to refresh it once it goes stale
+        self.focus_match = None  # Match named in the last message, when detection found one
+        self.conversation_history = []
+        
+        # Sport detection keywords, compiled once into SPORT_KEYWORD_AUTOMATON
+        self.sport_keywords = SPORT_KEYWORDS
+        self.keyword_automaton = SPORT_KEYWORD_AUTOMATON
+
+    def detect_sport_from_text(self, user_input):
+        """Dynamically detect sport category from user input using AI"""
+        detected_sport = self.quick_detect_sport(user_input)
+        if detected_sport:
+            return detected_sport
+        return self.classify_sport_with_llm(user_input)
+
+    def quick_detect_sport(self, user_input):
+        """Detect the sport without calling the LLM; returns None when unsure"""
+        self.focus_match = None
+        try:
+            # First, try keyword matching for quick detection
+            detected_sport = self.keyword_automaton.best(user_input)
+            
+            # If we have a clear winner from keywords, return it
+            if detected_sport:
+                return detected_sport
+            
+            # Next, look the message up in the names of the live slates
+            entity = entity_index.resolve(user_input)
+            if entity:
+                self.focus_match = entity.record
+                return entity.sport
+            
+            # Reuse the classification of an earlier, equivalent question
+            return sport_detection_cache.get(normalize_utterance(user_input))
+                
+        except Exception as e:
+            print(f"Error in sport detection: {e}")
+            return None
+
+    def classify_sport_with_llm(self, user_input):
+        """Classify the sport of a message with the LLM, caching the answer"""
+        try:
+            # If no clear match, use AI for more sophisticated detection
+            prompt = f"""
+            Analyze this user message and determine which sport they're asking about. 
+            Return ONLY the sport name from this list: soccer, nba, nfl, nhl, mlb, tennis
+            If no specific sport is mentioned, return 'general'
+            
+            User message: "{user_input}"
             
-            # Add conversation history
-            for msg in self.conversation_history[-4:]:  # Reduced to 4 messages for token efficiency
-                messages.insert(-1, msg)
+            Sport:"""
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
+                "detect_sport",
+                model="gpt-4-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=10,
+                temperature=0.2
+            )
+            
+            detected_sport = response.choices[0].message.content.strip().lower()
+            
+            # Validate the response
+            valid_sports = ['soccer', 'nba', 'nfl', 'nhl', 'mlb', 'tennis']
+            if detected_sport not in valid_sports:
+                detected_sport = 'general'
+            sport_detection_cache.set(normalize_utterance(user_input), detected_sport)
+            return detected_sport
+                
+        except Exception as e:
+            print(f"Error in sport detection: {e}")
+            return 'general'
+
+    def guess_sport(self, user_input):
+        """Best guess at the sport while the LLM classifier runs: a weak name match, else the current sport"""
+        candidates = entity_index.lookup(user_input)
+        if candidates:
+            return candidates[0][1]
+        return self.current_sport
+
+    def fetch_sport_data(self, sport):
+        """Fetch data for a specific sport, served from the process-wide snapshot cache when fresh"""
+        return get_livescores(sport)
+
+    def filter_important_data(self, data, sport):
+        """Filter and return the most important data from the response for any sport"""
+        return normalize_livescores(data, sport).flat()
+
+    def load_sport_data(self, sport):
+        """Fetch and normalize a sport's live data without touching the bot's state
+        
+        Returns (raw_data, slate), or (None, None) if the fetch failed
+        """
+        # Serve the poller's pre-normalized snapshot when it is warm
+        snapshot = live_poller.get_snapshot(sport)
+        if snapshot:
+            return snapshot.raw_data, snapshot.slate
+
+        print(f"Fetching live data for {sport}...")
+        raw_data = self.fetch_sport_data(sport)
+        if not raw_data:
+            return None, None
+        slate = normalize_livescores(raw_data, sport)
+        entity_index.update(slate)
+        elo_ratings.update(slate)
+        return raw_data, slate
+
+    def apply_sport_data(self, sport, raw_data, slate):
+        """Make loaded live data the bot's current data"""
+        if raw_data:
+            self.raw_data = raw_data  # Store the complete raw data
+            self.current_slate = slate
+            self.current_data = slate.flat()
+            self.current_sport = sport
+            self.snapshot = snapshot_store.put(sport, raw_data, slate)
+            self.data_loaded_at = time.time()
+            print(f"Successfully updated {sport} data with {len(self.current_data)} matches")
+        else:
+            print(f"Failed to fetch data for {sport}")
+            self.current_slate = None
+            self.current_data = None
+            self.raw_data = None
+            self.snapshot = None
+
+    def restore_snapshot(self, ref):
+        """Restore live data from a history snapshot reference, fetching afresh if it expired"""
+        snapshot = snapshot_store.resolve(ref)
+        if snapshot is not None:
+            self.raw_data = snapshot.raw_data
+            self.current_slate = snapshot.slate
+            self.current_data = snapshot.slate.flat()
+            self.current_sport = snapshot.sport
+            self.snapshot = snapshot
+            self.data_loaded_at = snapshot.stored_at
+        elif isinstance(ref, dict) and ref.get('sport'):
+            self.update_sport_data(ref['sport'])
+
+    def update_sport_data(self, sport):
+        """Update the current sport data"""
+        if sport != 'general':
+            self.apply_sport_data(sport, *self.load_sport_data(sport))
+
+    def needs_sport_data(self, sport):
+        """Return True if a turn about sport has to load live data
+        
+        Data for the current sport is reloaded once the poller has published a
+        newer snapshot or, without one, once it is older than the snapshot cache TTL.
+        """
+        if sport in (None, 'general'):
+            return False
+        if sport != self.current_sport or not self.raw_data:
+            return True
+        snapshot = live_poller.get_snapshot(sport)
+        if snapshot is not None:
+            return snapshot.raw_data is not self.raw_data
+        return time.time() - self.data_loaded_at > SNAPSHOT_CACHE_TTL
+
+    def create_enhanced_data_context(self, raw_data, sport):
+        """Create a comprehensive but token-efficient data context"""
+        return normalize_livescores(raw_data, sport).render_context()
+
+    def build_messages(self, user_input):
+        """Build the chat messages (system prompt, recent history, user turn) for a response"""
+        # Build comprehensive but efficient context
+        context = ""
+        if self.raw_data and self.current_sport:
+            # Reuse the slate parsed in update_sport_data instead of walking raw_data again
+            if self.current_slate is None:
+                self.current_slate = normalize_livescores(self.raw_data, self.current_sport)
+            # Only the matches most relevant to this message, within a fixed token budget
+            context = build_context(self.current_slate, user_input, focus=self.focus_match)
+        
+        # Static persona first (identical on every call), then this session's state and live data
+        system_prompt = ATLAS_SYSTEM_PROMPT + (
+            f"\n\n            === CURRENT SESSION ===\n"
+            f"            **Current Sport Focus**: {self.current_sport if self.current_sport else 'Ready to dive into any sport you want to talk about!'}\n"
+            f"            **Live Data Status**: {'Locked and loaded with real-time sports action!' if self.raw_data else 'Standing by for live sports data'}\n"
+        )
+        if context:
+            system_prompt += f"\n{context}"
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input}
+        ]
+        
+        # Add conversation history
+        for msg in self.conversation_history[-4:]:  # Reduced to 4 messages for token efficiency
+            messages.insert(-1, msg)
+        
+        return messages
+
+    def remember_exchange(self, user_input, ai_response):
+        """Update conversation history with a completed exchange"""
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.append({"role": "assistant", "content": ai_response})
+
+    def generate_response(self, user_input):
+        """Generate AI response using enhanced structured sport data"""
+        try:
+            messages = self.build_messages(user_input)
+            
+            response = chat_completion(
+                "generate_response",
                 model="gpt-4-turbo",
                 messages=messages,
                 max_tokens=1500,  # Reduced for efficiency
@@ -691,8 +410,7 @@ class DynamicSportsBot:
             ai_response = response.choices[0].message.content.strip()
             
             # Update conversation history
-            self.conversation_history.append({"role": "user", "content": user_input})
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
+            self.remember_exchange(user_input, ai_response)
             
             return ai_response
             
@@ -700,66 +418,185 @@ class DynamicSportsBot:
             print(f"Error generating response: {e}")
             return "I'm sorry, I'm having trouble processing your request right now. Please try again."
 
+    def generate_response_stream(self, user_input, messages=None):
+        """Generate the AI response as a stream of text chunks.
+
+        Chunks are yielded as the model produces them. The generator does not
+        touch the conversation history: it returns the response to remember,
+        or None if generation failed, and the caller records the exchange
+        with remember_exchange (under the session lock, for shared sessions).
+        messages, when given, are the already built chat messages for the turn.
+        """
+        parts = []
+        try:
+            if messages is None:
+                messages = self.build_messages(user_input)
+            
+            response = chat_completion(
+                "generate_response",
+                model="gpt-4-turbo",
+                messages=messages,
+                max_tokens=1500,
+                temperature=0.7,
+                stream=True
+            )
+            
+            for chunk in iter_completion_text(response):
+                parts.append(chunk)
+                yield chunk
+            
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            if not parts:
+                yield "I'm sorry, I'm having trouble processing your request right now. Please try again."
+            return None
+        
+        return ''.join(parts).strip()
+
     def chat(self, user_input):
         """Main chat function"""
         print(f"\nUser: {user_input}")
         
-        # Detect sport from user input
-        detected_sport = self.detect_sport_from_text(user_input)
+        # Detect sport from user input and refresh live data if needed
+        detected_sport = self.prepare_turn(user_input)
         print(f"Detected sport: {detected_sport}")
         
-        # Update data if sport changed or if we don't have current data
-        if detected_sport != 'general' and (detected_sport != self.current_sport or not self.raw_data):
-            self.update_sport_data(detected_sport)
-        
         # Generate and return response
         response = self.generate_response(user_input)
         print(f"Bot: {response}")
         return response
 
-def main(user_input: str, conversation_history: dict = None) -> tuple[str, list]:
+    def prepare_turn(self, user_input, pipelined=None):
+        """Detect the sport for a turn and refresh live data if it changed
+        
+        In pipelined mode, when the LLM classifier is needed, the live data for
+        the guessed sport is loaded concurrently and discarded if the guess
+        turns out wrong, so the turn waits for max(detect, fetch).
+        """
+        if pipelined is None:
+            pipelined = PIPELINED_TURNS
+        if not pipelined:
+            detected_sport = self.detect_sport_from_text(user_input)
+        else:
+            detected_sport = self.quick_detect_sport(user_input)
+            if not detected_sport:
+                guess = self.guess_sport(user_input)
+                speculative = None
+                if self.needs_sport_data(guess):
+                    speculative = _prefetch_executor.submit(self.load_sport_data, guess)
+                
+                detected_sport = self.classify_sport_with_llm(user_input)
+                
+                if speculative is not None:
+                    if detected_sport == guess:
+                        self.apply_sport_data(guess, *speculative.result())
+                        return detected_sport
+                    # Wrong guess: drop the fetch (it still warms the snapshot cache if already running)
+                    speculative.cancel()
+        
+        # Update data if sport changed or if we don't have current data
+        if self.needs_sport_data(detected_sport):
+            self.update_sport_data(detected_sport)
+        return detected_sport
+
+    def chat_stream(self, user_input):
+        """Streaming variant of chat(): yields response chunks as they arrive"""
+        self.prepare_turn(user_input)
+        reply = yield from self.generate_response_stream(user_input)
+        if reply is not None:
+            self.remember_exchange(user_input, reply)
+
+def load_bot(conversation_history: dict = None) -> DynamicSportsBot:
+    """Create a bot and restore its state from a conversation history dict"""
+    bot = DynamicSportsBot()
+    
+    # Load conversation history if provided
+    if conversation_history and isinstance(conversation_history, dict):
+        if 'messages' in conversation_history:
+            bot.conversation_history = conversation_history['messages']
+        if 'current_sport' in conversation_history:
+            bot.current_sport = conversation_history['current_sport']
+        if conversation_history.get('snapshot'):
+            bot.restore_snapshot(conversation_history['snapshot'])
+        # Histories from before snapshot references embed the data itself
+        if 'current_data' in conversation_history:
+            bot.current_data = conversation_history['current_data']
+        if 'raw_data' in conversation_history:
+            bot.raw_data = conversation_history['raw_data']
+    return bot
+
+
+def snapshot_ref(bot: DynamicSportsBot):
+    """Return the compact reference to the bot's live data, or None if it has none"""
+    return bot.snapshot.ref() if bot.snapshot is not None and bot.raw_data is bot.snapshot.raw_data else None
+
+
+def export_history(bot: DynamicSportsBot) -> dict:
+    """Return the conversation history dict handed back to the caller
+    
+    Live data is referenced by snapshot id and version rather than embedded,
+    so the dict stays the same size however large the slate is.
+    """
+    return {
+        'messages': bot.conversation_history,
+        'current_sport': bot.current_sport,
+        'snapshot': snapshot_ref(bot)
+    }
+
+
+def export_session(bot: DynamicSportsBot, session_id) -> dict:
+    """Return the history dict for a registered session; live data stays in the process"""
+    return {
+        'session_id': session_id,
+        'messages': bot.conversation_history,
+        'current_sport': bot.current_sport,
+        'snapshot': snapshot_ref(bot)
+    }
+
+
+def start_live_poller():
+    """Start the process-wide live poller unless LIVE_POLLER_AUTOSTART is off (a no-op once running)"""
+    if LIVE_POLLER_AUTOSTART:
+        live_poller.start()
+
+def main(user_input: str, conversation_history: dict = None, session_id: str = None) -> tuple[str, list]:
     """
     Main function to get AI response for sports queries
     
     Args:
         user_input (str): The user's input/query
         conversation_history (dict, optional): Previous conversation context
+        session_id (str, optional): Keep the bot in the session registry under this id;
+            later turns only need to pass the id. conversation_history is only used
+            to restore a session that is not (or no longer) registered.
     
     Returns:
         tuple[str, list]: (AI response, updated conversation history)
     """
+    start_live_poller()
     try:
-        # Initialize bot
-        bot = DynamicSportsBot()
-        
-        # Load conversation history if provided
-        if conversation_history and isinstance(conversation_history, dict):
-            if 'messages' in conversation_history:
-                bot.conversation_history = conversation_history['messages']
-            if 'current_sport' in conversation_history:
-                bot.current_sport = conversation_history['current_sport']
-            if 'current_data' in conversation_history:
-                bot.current_data = conversation_history['current_data']
-            if 'raw_data' in conversation_history:
-                bot.raw_data = conversation_history['raw_data']
-        
-        # Detect sport from user input
-        detected_sport = bot.detect_sport_from_text(user_input)
-        
-        # Update data if sport changed or if we don't have current data
-        if detected_sport != 'general' and (detected_sport != bot.current_sport or not bot.raw_data):
-            bot.update_sport_data(detected_sport)
-        
-        # Generate response
-        response = bot.generate_response(user_input)
+        if session_id is None:
+            # Initialize bot
+            bot = load_bot(conversation_history)
+            
+            # Detect sport from user input and update data if it changed
+            bot.prepare_turn(user_input)
+            
+            # Generate response
+            response = bot.generate_response(user_input)
+            
+            # Prepare updated conversation history
+            updated_history = export_history(bot)
+            
+            return response, updated_history
         
-        # Prepare updated conversation history
-        updated_history = {
-            'messages': bot.conversation_history,
-            'current_sport': bot.current_sport,
-            'current_data': bot.current_data,
-            'raw_data': bot.raw_data
-        }
+        session = session_registry.get_or_create(session_id, lambda: load_bot(conversation_history))
+        with session.lock:
+            bot = session.bot
+            bot.prepare_turn(user_input)
+            response = bot.generate_response(user_input)
+            updated_history = export_session(bot, session_id)
+        session_registry.touch(session)
         
         return response, updated_history
         
@@ -767,6 +604,55 @@ def main(user_input: str, conversation_history: dict = None) -> tuple[str, list]
         error_message = f"Error processing request: {str(e)}"
         return error_message, conversation_history or {}
 
+
+def main_stream(user_input: str, conversation_history: dict = None, session_id: str = None) -> ResponseStream:
+    """
+    Streaming variant of main()
+    
+    Args:
+        user_input (str): The user's input/query
+        conversation_history (dict, optional): Previous conversation context
+        session_id (str, optional): Session registry id, as for main()
+    
+    Returns:
+        ResponseStream: iterate it for response chunks; once exhausted, .text holds
+        the full response and .result the updated conversation history
+    """
+    start_live_poller()
+    try:
+        if session_id is None:
+            bot = load_bot(conversation_history)
+            bot.prepare_turn(user_input)
+            
+            def finish_private(text):
+                if private_stream.value is not None:
+                    bot.remember_exchange(user_input, private_stream.value)
+                return export_history(bot)
+            
+            private_stream = ResponseStream(bot.generate_response_stream(user_input), on_complete=finish_private)
+            return private_stream
+        
+        session = session_registry.get_or_create(session_id, lambda: load_bot(conversation_history))
+        # Lock only around state changes: a stream the client stops reading must not keep the session locked
+        with session.lock:
+            session.bot.prepare_turn(user_input)
+            messages = session.bot.build_messages(user_input)
+    except Exception as e:
+        error_message = f"Error processing request: {str(e)}"
+        return ResponseStream(iter([error_message]), on_complete=lambda text: conversation_history or {})
+    
+    def finish(text):
+        # The exchange is recorded here, under the lock, never from the unlocked generator
+        with session.lock:
+            if stream.value is not None:
+                session.bot.remember_exchange(user_input, stream.value)
+            updated_history = export_session(session.bot, session_id)
+        session_registry.touch(session)
+        return updated_history
+    
+    stream = ResponseStream(session.bot.generate_response_stream(user_input, messages), on_complete=finish)
+    return stream
+
 # Example usage:
 if __name__ == "__main__":
     # Single query example
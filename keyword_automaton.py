@@ -0,0 +1,113 @@
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+
+Keyword = Union[str, Tuple[str, float]]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse runs of whitespace to single spaces."""
+    return ' '.join(text.lower().split())
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton scoring text against weighted keywords per label.
+
+    All keywords are matched in one left-to-right pass over the text, so the
+    cost grows with the length of the message, not the size of the
+    vocabulary. A keyword only counts when it stands on word boundaries (an
+    optional plural 's' is allowed), so 'ace' does not fire inside 'place'
+    and 'goal' still matches 'goals'. Each keyword counts once per text.
+    A keyword listed under several labels splits its weight between them.
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[Keyword]]):
+        self.labels = list(table)
+
+        # keyword -> [(label, weight)]
+        keywords = {}
+        for label, entries in table.items():
+            for entry in entries:
+                keyword, weight = (entry, 1.0) if isinstance(entry, str) else entry
+                keyword = normalize_text(keyword)
+                if keyword:
+                    keywords.setdefault(keyword, []).append((label, float(weight)))
+        self.keywords = list(keywords)
+        self._scores = [
+            tuple((label, weight / len(owners)) for label, weight in owners)
+            for owners in keywords.values()
+        ]
+
+        # Trie: goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Failure links, breadth first; outputs are merged along them
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._lengths = [len(keyword) for keyword in self.keywords]
+
+    def find(self, text: str, normalized: bool = False) -> List[int]:
+        """Return the indexes of the keywords found in text on word boundaries, once each."""
+        if not normalized:
+            text = normalize_text(text)
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        size = len(text)
+        found = []
+        seen = set()
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            for index in output[state]:
+                if index in seen:
+                    continue
+                start = end - lengths[index]
+                if start > 0 and _is_word(text[start - 1]):
+                    continue
+                if end < size and _is_word(text[end]) and not (
+                        text[end] == 's' and (end + 1 == size or not _is_word(text[end + 1]))):
+                    continue
+                seen.add(index)
+                found.append(index)
+        return found
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return the summed keyword weight of every label found in text, in label order."""
+        totals = {}
+        for index in self.find(text):
+            for label, weight in self._scores[index]:
+                totals[label] = totals.get(label, 0.0) + weight
+        return {label: totals[label] for label in self.labels if label in totals}
+
+    def best(self, text: str):
+        """Return the highest scoring label, the first listed one on ties, or None."""
+        scores = self.scores(text)
+        return max(scores, key=scores.get) if scores else None
@@ -0,0 +1,130 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATPAL_API_KEY = os.environ.get('STATPAL_API_KEY')
+
+# Base URL and sports endpoints
+BASE_URL = 'https://statpal.io/api/v1'
+SPORTS = ['soccer', 'nhl', 'nba', 'nfl', 'mlb', 'tennis']
+
+# Per-sport read timeouts in seconds; sports not listed use DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = 10
+CONNECT_TIMEOUT = 3.05
+SPORT_TIMEOUTS = {
+    'soccer': 15,  # the soccer slate is by far the largest payload
+}
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session used for every statpal request.
+
+    All sports live on the same host, so a single pool sized for one connection
+    per sport lets a full refresh reuse warm TLS connections instead of opening
+    a new one for each endpoint.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(SPORTS))
+                session.mount('https://', adapter)
+                session.params = {"access_key": STATPAL_API_KEY}
+                _session = session
+    return _session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=len(SPORTS), thread_name_prefix='statpal')
+    return _executor
+
+
+def livescores_url(sport: str) -> str:
+    """Return the statpal livescores endpoint for a sport."""
+    return f"{BASE_URL}/{sport}/livescores"
+
+
+def sport_timeout(sport: str) -> float:
+    """Return the read timeout used for a sport's livescores request."""
+    return SPORT_TIMEOUTS.get(sport, DEFAULT_TIMEOUT)
+
+
+def fetch_livescores(sport: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Fetch the livescores payload for a single sport.
+
+    Args:
+        sport: One of SPORTS.
+        timeout: Read timeout in seconds, defaults to the sport's entry in SPORT_TIMEOUTS.
+
+    Returns:
+        The decoded JSON payload, or None if the sport is unknown or the request fails.
+    """
+    if sport not in SPORTS:
+        return None
+
+    read_timeout = timeout if timeout is not None else sport_timeout(sport)
+    try:
+        response = get_session().get(livescores_url(sport), timeout=(CONNECT_TIMEOUT, read_timeout))
+        response.raise_for_status()
+        return response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error fetching {sport} data: {e}")
+        return None
+
+
+def fetch_all_livescores(sports: Optional[Iterable[str]] = None,
+                         timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Dict]:
+    """Fetch livescores for several sports concurrently over the shared session.
+
+    Every request is issued at once, so a refresh takes as long as the slowest
+    endpoint rather than the sum of all of them. Sports that fail or do not
+    answer within their timeout are left out of the result.
+
+    Args:
+        sports: Sports to fetch, defaults to SPORTS.
+        timeouts: Optional per-sport read timeout overrides.
+
+    Returns:
+        A dictionary with sports as keys and API responses as values (possibly empty).
+    """
+    sports = [sport for sport in (sports or SPORTS) if sport in SPORTS]
+    timeouts = timeouts or {}
+    if not sports:
+        return {}
+
+    executor = _get_executor()
+    futures = {}
+    for sport in sports:
+        read_timeout = timeouts.get(sport, sport_timeout(sport))
+        futures[executor.submit(fetch_livescores, sport, read_timeout)] = sport
+
+    # requests timeouts bound each socket operation, not the whole transfer, so
+    # also stop waiting once the slowest allowed sport should have finished
+    deadline = CONNECT_TIMEOUT + max(timeouts.get(sport, sport_timeout(sport)) for sport in sports)
+    done, not_done = wait(futures, timeout=deadline)
+
+    sports_data = {}
+    for future in done:
+        data = future.result()
+        if data:
+            sports_data[futures[future]] = data
+    for future in not_done:
+        print(f"Timed out fetching {futures[future]} data")
+
+    return sports_data
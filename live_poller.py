@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from live_fetcher import SPORTS, fetch_all_livescores
+from match_normalizer import NormalizedSlate, normalize_livescores
+from match_record import MatchRecord
+from match_status import is_live
+from snapshot_cache import snapshot_cache
+
+# Seconds between polls for a sport with matches in play, and for one without
+LIVE_POLL_INTERVAL = float(os.environ.get('LIVE_POLL_INTERVAL', 15))
+IDLE_POLL_INTERVAL = float(os.environ.get('IDLE_POLL_INTERVAL', 120))
+# Retry delay after a sport's fetch fails
+RETRY_POLL_INTERVAL = float(os.environ.get('RETRY_POLL_INTERVAL', 30))
+
+
+class LiveSnapshot:
+    """A normalized livescores snapshot for one sport as published by LivePoller."""
+
+    def __init__(self, sport: str, raw_data: Dict, slate: NormalizedSlate, version: int,
+                 fetched_at: float, live_count: int, expires_at: float):
+        self.sport = sport
+        self.raw_data = raw_data
+        self.slate = slate
+        self.version = version
+        self.fetched_at = fetched_at
+        self.live_count = live_count
+        self.expires_at = expires_at
+
+    @property
+    def matches(self) -> List[MatchRecord]:
+        return self.slate.records
+
+    @property
+    def has_live_matches(self) -> bool:
+        return self.live_count > 0
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Return True while the snapshot is still within its poll window."""
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class LivePoller:
+    """Background service that keeps a normalized snapshot of every sport warm.
+
+    Each sport is polled on its own schedule: every live_interval seconds while
+    any of its matches is in play (judged from the match status), every
+    idle_interval seconds otherwise. Sports that are due together are fetched
+    concurrently. Readers call get_snapshot() and never touch statpal.
+
+    The poller does not start itself: the chat entrypoints start it on their
+    first turn, anything else calls start() once at application startup.
+    """
+
+    def __init__(self, normalize: Callable[[Dict, str], NormalizedSlate] = normalize_livescores,
+                 sports: Optional[Iterable[str]] = None, live_interval: float = LIVE_POLL_INTERVAL, idle_interval: float = IDLE_POLL_INTERVAL,
+                 retry_interval: float = RETRY_POLL_INTERVAL):
+        self.normalize = normalize
+        self.sports = list(sports or SPORTS)
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.retry_interval = retry_interval
+
+        self._snapshots = {}
+        self._next_poll = {sport: 0.0 for sport in self.sports}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback: Callable[[LiveSnapshot], None]) -> None:
+        """Register a callback invoked with every newly published snapshot."""
+        self._listeners.append(callback)
+
+    def get_snapshot(self, sport: str) -> Optional[LiveSnapshot]:
+        """Return the latest fresh snapshot for a sport, or None if there is none."""
+        snapshot = self._snapshots.get(sport)
+        if snapshot is not None and snapshot.is_fresh():
+            return snapshot
+        return None
+
+    def publish(self, sport: str, raw_data: Dict) -> LiveSnapshot:
+        """Normalize a raw payload and publish it as the sport's current snapshot."""
+        slate = self.normalize(raw_data, sport)
+        live_count = sum(1 for record in slate.records if is_live(record.status))
+        interval = self.live_interval if live_count else self.idle_interval
+        now = time.time()
+
+        with self._lock:
+            previous = self._snapshots.get(sport)
+            snapshot = LiveSnapshot(
+                sport=sport,
+                raw_data=raw_data,
+                slate=slate,
+                version=previous.version + 1 if previous else 1,
+                fetched_at=now,
+                live_count=live_count,
+                # Keep serving the snapshot for one missed poll before calling it stale
+                expires_at=now + 2 * interval
+            )
+            self._snapshots[sport] = snapshot
+            self._next_poll[sport] = time.monotonic() + interval
+
+        snapshot_cache.set(sport, raw_data)
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in snapshot listener for {sport}: {e}")
+        return snapshot
+
+    def poll_once(self, sports: Optional[Iterable[str]] = None) -> Dict[str, LiveSnapshot]:
+        """Fetch and publish the given sports (default: all) right now."""
+        sports = list(sports or self.sports)
+        sports_data = fetch_all_livescores(sports)
+
+        published = {}
+        for sport in sports:
+            raw_data = sports_data.get(sport)
+            if raw_data is None:
+                self._next_poll[sport] = time.monotonic() + self.retry_interval
+                continue
+            try:
+                published[sport] = self.publish(sport, raw_data)
+            except Exception as e:
+                print(f"Error normalizing {sport} snapshot: {e}")
+                self._next_poll[sport] = time.monotonic() + self.retry_interval
+        return published
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [sport for sport, next_poll in self._next_poll.items() if next_poll <= now]
+            if due:
+                self.poll_once(due)
+                now = time.monotonic()
+            wait = min(self._next_poll.values()) - now
+            self._stop.wait(max(wait, 0.5))
+
+    def start(self) -> None:
+        """Start polling in a daemon thread. Calling start() twice is a no-op."""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='live-poller', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the polling thread to exit and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+# Process-wide poller. general_sports_chat.main()/main_stream() start it on the
+# first turn (see LIVE_POLLER_AUTOSTART); other long-running processes call
+# live_poller.start() once at startup so chat turns read snapshots from memory
+live_poller = LivePoller()
@@ -0,0 +1,201 @@
+import abc
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+import openai
+
+from keyword_automaton import KeywordAutomaton
+from text_utils import estimate_tokens
+
+# Which backend serves model calls: 'openai' (default) or 'fake' for offline runs
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+# Fake backend timing: seconds before the first token and per generated token
+LLM_FAKE_LATENCY = float(os.environ.get('LLM_FAKE_LATENCY', 0.3))
+LLM_FAKE_TOKEN_LATENCY = float(os.environ.get('LLM_FAKE_TOKEN_LATENCY', 0.01))
+
+
+class _Response(dict):
+    """dict with attribute access, shaped like the openai client's response objects."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _wrap(value):
+    if isinstance(value, dict):
+        return _Response({key: _wrap(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_wrap(item) for item in value]
+    return value
+
+
+class LLMBackend(abc.ABC):
+    """Interface for chat completion providers.
+
+    create() takes the keyword arguments of openai.ChatCompletion.create and
+    returns a response with choices[0].message.content and usage, or, with
+    stream=True, an iterator of chunks with choices[0].delta.content.
+    """
+
+    name = 'base'
+
+    @abc.abstractmethod
+    def create(self, **kwargs):
+        """Run one chat completion."""
+
+
+class OpenAIBackend(LLMBackend):
+    """The OpenAI chat completions API."""
+
+    name = 'openai'
+
+    def create(self, **kwargs):
+        return openai.ChatCompletion.create(**kwargs)
+
+
+_SPORT_WORDS = KeywordAutomaton({
+    'soccer': ['soccer', 'football', 'premier league', 'goal'],
+    'nba': ['nba', 'basketball', 'lakers', 'celtics'],
+    'nfl': ['nfl', 'super bowl', 'touchdown', 'chiefs', 'eagles'],
+    'nhl': ['nhl', 'hockey', 'stanley cup'],
+    'mlb': ['mlb', 'baseball', 'home run'],
+    'tennis': ['tennis', 'wimbledon', 'djokovic']
+})
+_QUOTED_USER_MESSAGE = re.compile(r'User message: "(.*?)"', re.DOTALL)
+_MATCH_LINE = re.compile(r"^(.+?) (\d+)-(\d+) (.+?) \|", re.MULTILINE)
+_TEAM_NAME = re.compile(r"'name': '([^']+)'")
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic in-process stand-in for the chat API, for offline load tests.
+
+    Replies are canned but shaped like the real ones for each call site
+    (sport classification, prediction JSON extraction, Oracle analysis with
+    its prediction trailer, ATLAS chat), usage echoes token counts, and
+    latency (time to first token plus a per-token delay) is configurable.
+    Streaming is supported. The same request always gets the same reply.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: float = LLM_FAKE_LATENCY, token_latency: float = LLM_FAKE_TOKEN_LATENCY,
+                 sleep=time.sleep):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.sleep = sleep
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def reply(self, messages: List[Dict], max_tokens: Optional[int] = None) -> str:
+        """Return the canned completion text for a request."""
+        system = next((str(m.get('content', '')) for m in messages if m.get('role') == 'system'), '')
+        last = str(messages[-1].get('content', '')) if messages else ''
+
+        if 'which sport they\'re asking about' in last:
+            quoted = _QUOTED_USER_MESSAGE.search(last)
+            return _SPORT_WORDS.best(quoted.group(1) if quoted else last) or 'general'
+
+        names = self._team_names(system + '\n' + last)
+        if 'Extract team/player names and predictions' in system:
+            return json.dumps({'entities': self._entities(names)})
+
+        if 'You are **Oracle**' in system:
+            home, away = (names + ['The home side', 'the visitors'])[:2]
+            text = (f"🔥 {home} have the edge in this one against {away}.\n\n"
+                    f"**Current Situation**: The momentum has swung {home}'s way and the numbers back it up.\n\n"
+                    f"**Key Factors**:\n- {home} are controlling the tempo\n- {away} need a response quickly\n\n"
+                    f"**My Take**: {home} will win this one.")
+            if '<prediction_json>' in system:
+                text += f"\n<prediction_json>{json.dumps({'entities': self._entities(names)})}</prediction_json>"
+            return text
+
+        return ("Great question! Here's what's happening right now: the action is heating up across the board, "
+                "and there are a few storylines worth watching closely. Which team are you following today?")
+
+    def _team_names(self, text: str) -> List[str]:
+        line = _MATCH_LINE.search(text)
+        if line:
+            return [line.group(1).strip(), line.group(4).strip()]
+        names = []
+        for name in _TEAM_NAME.findall(text):
+            if name not in names:
+                names.append(name)
+        return names[:2]
+
+    def _entities(self, names: List[str]) -> List[Dict[str, str]]:
+        if len(names) < 2:
+            return []
+        return [{'name': names[0], 'prediction': 'win'}, {'name': names[1], 'prediction': 'lose'}]
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        messages = kwargs.get('messages', [])
+        text = self.reply(messages, kwargs.get('max_tokens'))
+        tokens = self._tokens(text, kwargs.get('max_tokens'))
+        prompt_tokens = sum(estimate_tokens(str(m.get('content', ''))) + 4 for m in messages) + 2
+        model = kwargs.get('model', 'fake')
+
+        if kwargs.get('stream'):
+            return self._stream(tokens, model)
+
+        self.sleep(self.latency + self.token_latency * len(tokens))
+        text = ''.join(tokens)
+        return _wrap({
+            'object': 'chat.completion',
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                      'total_tokens': prompt_tokens + len(tokens)}
+        })
+
+    def _tokens(self, text: str, max_tokens: Optional[int]) -> List[str]:
+        """Split text into ~4 character pieces standing in for tokens."""
+        tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+        return tokens[:max_tokens] if max_tokens else tokens
+
+    def _stream(self, tokens: List[str], model: str) -> Iterator:
+        self.sleep(self.latency)
+        yield _wrap({'object': 'chat.completion.chunk', 'model': model,
+                     'choices': [{'index': 0, 'delta': {'role': 'assistant'}, 'finish_reason': None}]})
+        for token in tokens:
+            if self.token_latency:
+                self.sleep(self.token_latency)
+            yield _wrap({'object': 'chat.completion.chunk', 'model': model,
+                         'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]})
+        yield _wrap({'object': 'chat.completion.chunk', 'model': model,
+                     'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+
+
+_BACKENDS = {'openai': OpenAIBackend, 'fake': FakeBackend}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend, created from LLM_BACKEND on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                factory = _BACKENDS.get(LLM_BACKEND)
+                if factory is None:
+                    print(f"Unknown LLM_BACKEND '{LLM_BACKEND}', using openai")
+                    factory = OpenAIBackend
+                _backend = factory()
+    return _backend
+
+
+def set_backend(backend: LLMBackend) -> LLMBackend:
+    """Route every model call through backend; returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
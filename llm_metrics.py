@@ -0,0 +1,254 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from llm_backend import get_backend
+from text_utils import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the ~4 characters per token estimate
+    tiktoken = None
+
+# Histogram bucket upper bounds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+# Per-message framing tokens the chat format adds around each message
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+_encodings = {}
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens locally, with tiktoken when it is installed."""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        encoding = _encodings.get(model)
+        if encoding is None:
+            try:
+                encoding = tiktoken.encoding_for_model(model or 'gpt-4')
+            except KeyError:
+                encoding = tiktoken.get_encoding('cl100k_base')
+            _encodings[model] = encoding
+        return len(encoding.encode(text))
+    return estimate_tokens(text)
+
+
+def count_message_tokens(messages: Iterable[Dict], model: Optional[str] = None) -> int:
+    """Estimate the prompt tokens of a chat message list."""
+    return sum(count_tokens(str(message.get('content') or ''), model) + _MESSAGE_OVERHEAD_TOKENS
+               for message in messages) + 2
+
+
+class Histogram:
+    """Fixed-bucket histogram with count and sum."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the q-quantile (inf for the last)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.models = {}
+        self.backends = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_prompt_tokens = 0
+        self.estimated_completion_tokens = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.first_token_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_size = Histogram(TOKEN_BUCKETS)
+        self.completion_size = Histogram(TOKEN_BUCKETS)
+
+
+class LLMMetrics:
+    """Per-stage token, size and latency accounting for model calls.
+
+    Each call records the local prompt/completion token estimate, the
+    provider-reported usage when the response carries one, wall time (and
+    time to first token for streams), the model and the call-site stage.
+    """
+
+    def __init__(self, keep_last: int = 100):
+        self.keep_last = keep_last
+        self._stages = {}
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, model: str, latency: float, estimated_prompt_tokens: int,
+               estimated_completion_tokens: int, usage: Optional[Dict] = None,
+               first_token: Optional[float] = None, error: Optional[str] = None,
+               backend: str = 'openai') -> None:
+        """Record one model call; latency and first_token are in seconds."""
+        prompt_tokens = (usage or {}).get('prompt_tokens')
+        completion_tokens = (usage or {}).get('completion_tokens')
+        entry = {
+            'stage': stage,
+            'model': model,
+            'backend': backend,
+            'latency_ms': round(latency * 1000, 1),
+            'first_token_ms': round(first_token * 1000, 1) if first_token is not None else None,
+            'estimated_prompt_tokens': estimated_prompt_tokens,
+            'estimated_completion_tokens': estimated_completion_tokens,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'error': error
+        }
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.calls += 1
+            stats.models[model] = stats.models.get(model, 0) + 1
+            stats.backends[backend] = stats.backends.get(backend, 0) + 1
+            stats.latency_ms.observe(latency * 1000)
+            if error:
+                stats.errors += 1
+            else:
+                stats.estimated_prompt_tokens += estimated_prompt_tokens
+                stats.estimated_completion_tokens += estimated_completion_tokens
+                stats.prompt_tokens += prompt_tokens or 0
+                stats.completion_tokens += completion_tokens or 0
+                stats.prompt_size.observe(prompt_tokens if prompt_tokens is not None else estimated_prompt_tokens)
+                stats.completion_size.observe(
+                    completion_tokens if completion_tokens is not None else estimated_completion_tokens)
+                if first_token is not None:
+                    stats.first_token_ms.observe(first_token * 1000)
+            self._recent.append(entry)
+            del self._recent[:-self.keep_last]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage totals and histograms."""
+        with self._lock:
+            return {
+                stage: {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'models': dict(stats.models),
+                    'backends': dict(stats.backends),
+                    'prompt_tokens': stats.prompt_tokens,
+                    'completion_tokens': stats.completion_tokens,
+                    'estimated_prompt_tokens': stats.estimated_prompt_tokens,
+                    'estimated_completion_tokens': stats.estimated_completion_tokens,
+                    'latency_ms': stats.latency_ms.to_dict(),
+                    'first_token_ms': stats.first_token_ms.to_dict(),
+                    'prompt_size': stats.prompt_size.to_dict(),
+                    'completion_size': stats.completion_size.to_dict()
+                }
+                for stage, stats in self._stages.items()
+            }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Return the most recent calls, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._recent.clear()
+
+
+# Process-wide metrics for every model call
+llm_metrics = LLMMetrics()
+
+
+def _response_text(response) -> str:
+    try:
+        return response.choices[0].message.content or ''
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return ''
+
+
+def _usage(response) -> Optional[Dict]:
+    usage = getattr(response, 'usage', None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get('usage')
+    return dict(usage) if usage else None
+
+
+def chat_completion(stage: str, **kwargs):
+    """Run a chat completion on the configured backend and record the call under stage.
+
+    Takes the same keyword arguments as openai.ChatCompletion.create.
+    Streaming calls (stream=True) return a generator over the response
+    chunks that records the call once the stream is exhausted or closed.
+    """
+    backend = get_backend()
+    model = kwargs.get('model', 'unknown')
+    prompt_estimate = count_message_tokens(kwargs.get('messages', ()), model)
+    started = time.perf_counter()
+    try:
+        response = backend.create(**kwargs)
+    except Exception as e:
+        llm_metrics.record(stage, model, time.perf_counter() - started, prompt_estimate, 0,
+                           error=str(e), backend=backend.name)
+        raise
+
+    if kwargs.get('stream'):
+        return _instrumented_stream(stage, model, backend.name, response, started, prompt_estimate)
+
+    text = _response_text(response)
+    llm_metrics.record(stage, model, time.perf_counter() - started, prompt_estimate,
+                       count_tokens(text, model), usage=_usage(response), backend=backend.name)
+    return response
+
+
+def _instrumented_stream(stage: str, model: str, backend: str, response: Iterable, started: float,
+                         prompt_estimate: int) -> Iterator:
+    parts = []
+    first_token = None
+    error = None
+    try:
+        for chunk in response:
+            try:
+                content = chunk['choices'][0]['delta'].get('content')
+            except (KeyError, IndexError, TypeError, AttributeError):
+                content = None
+            if content:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(content)
+            yield chunk
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        llm_metrics.record(stage, model, time.perf_counter() - started, prompt_estimate,
+                           count_tokens(''.join(parts), model), first_token=first_token, error=error,
+                           backend=backend)
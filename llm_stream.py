@@ -0,0 +1,102 @@
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+def iter_completion_text(response: Iterable) -> Iterator[str]:
+    """Yield the text deltas of a streamed ChatCompletion response."""
+    for chunk in response:
+        choices = chunk.get('choices') if hasattr(chunk, 'get') else None
+        if not choices:
+            continue
+        delta = choices[0].get('delta') or {}
+        content = delta.get('content')
+        if content:
+            yield content
+
+
+class ResponseStream:
+    """Iterable of response text chunks that finalizes itself once fully consumed.
+
+    Iterate it to forward chunks to the client as they arrive. When the
+    underlying stream is exhausted the full text is available as .text, the
+    value a chunks generator returned as .value, and on_complete(text) is
+    called once; its return value is stored in .result (for example the
+    updated conversation history).
+    """
+
+    def __init__(self, chunks: Iterable[str], on_complete: Optional[Callable[[str], Any]] = None):
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self._parts = []
+        self.text = None
+        self.value = None
+        self.result = None
+
+    @property
+    def done(self) -> bool:
+        return self.text is not None
+
+    def __iter__(self) -> Iterator[str]:
+        if self.done:
+            return
+        chunks = iter(self._chunks)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                self.value = stop.value
+                break
+            self._parts.append(chunk)
+            yield chunk
+        self.text = ''.join(self._parts)
+        if self._on_complete is not None:
+            self.result = self._on_complete(self.text)
+
+    def read(self) -> str:
+        """Consume the rest of the stream and return the full text."""
+        for _ in self:
+            pass
+        return self.text
+
+
+def _partial_marker(text: str, marker: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of marker."""
+    for size in range(min(len(text), len(marker) - 1), 0, -1):
+        if text.endswith(marker[:size]):
+            return size
+    return 0
+
+
+class TrailerSplitter:
+    """Forward streamed text up to a marker and collect everything after it.
+
+    Text that might be the start of the marker is held back until the next
+    chunk decides it, so the marker and the trailer never reach the client.
+    After iteration .trailer holds the text following the marker, or None if
+    the marker never appeared.
+    """
+
+    def __init__(self, chunks: Iterable[str], marker: str):
+        self._chunks = chunks
+        self.marker = marker
+        self.trailer = None
+
+    def __iter__(self) -> Iterator[str]:
+        pending = ''
+        for chunk in self._chunks:
+            if self.trailer is not None:
+                self.trailer += chunk
+                continue
+            pending += chunk
+            index = pending.find(self.marker)
+            if index != -1:
+                if index:
+                    yield pending[:index]
+                self.trailer = pending[index + len(self.marker):]
+                pending = ''
+                continue
+            ready = len(pending) - _partial_marker(pending, self.marker)
+            if ready:
+                yield pending[:ready]
+                pending = pending[ready:]
+        if pending:
+            yield pending
@@ -0,0 +1,200 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+def iter_raw_matches(raw_data) -> Iterator[Tuple[Dict, Dict]]:
+    """Yield (match, league_info) for every match in a raw livescores payload.
+
+    Handles both statpal layouts: livescore -> league -> match and
+    livescores -> tournament -> match, where tournaments and matches may be a
+    single dict instead of a list. Plain lists of matches are also accepted.
+    """
+    if isinstance(raw_data, list):
+        for match in raw_data:
+            yield match, {'name': 'N/A', 'country': 'N/A', 'season': 'N/A'}
+        return
+    if not isinstance(raw_data, dict):
+        return
+
+    if 'livescore' in raw_data:
+        for league in raw_data['livescore'].get('league', []):
+            league_info = {
+                'name': league.get('name', 'N/A'),
+                'country': league.get('country', 'N/A'),
+                'season': league.get('season', 'N/A')
+            }
+            for match in league.get('match', []):
+                yield match, league_info
+
+    elif 'livescores' in raw_data:
+        tournaments = raw_data['livescores'].get('tournament', [])
+        if isinstance(tournaments, dict):
+            tournaments = [tournaments]
+
+        for tournament in tournaments:
+            league_info = {
+                'name': tournament.get('name', tournament.get('league', 'N/A')),
+                'country': tournament.get('country', 'N/A'),
+                'season': tournament.get('season', 'N/A')
+            }
+            matches = tournament.get('match', [])
+            if isinstance(matches, dict):
+                matches = [matches]
+
+            for match in matches:
+                yield match, league_info
+
+    else:
+        # Flat lists of matches used by other feeds
+        no_league = {'name': 'N/A', 'country': 'N/A', 'season': 'N/A'}
+        for key in ('matches', 'games', 'events'):
+            if key in raw_data:
+                for match in raw_data[key]:
+                    yield match, no_league
+                return
+
+        for key in ('data', 'results', 'response', 'fixtures', 'schedule'):
+            if key in raw_data:
+                sub_data = raw_data[key]
+                if isinstance(sub_data, list):
+                    for match in sub_data:
+                        yield match, no_league
+                elif isinstance(sub_data, dict):
+                    for sub_key in ('matches', 'games', 'events', 'fixtures'):
+                        if isinstance(sub_data.get(sub_key), list):
+                            for match in sub_data[sub_key]:
+                                yield match, no_league
+                return
+
+
+def _side_name(match, side):
+    value = match.get(side)
+    return value.get('name') if isinstance(value, dict) else value
+
+
+def match_key(match: Dict, league_info: Dict) -> Hashable:
+    """Return a key identifying a match across successive payloads.
+
+    Uses the statpal match id (id/match_id) and falls back to the league and
+    participant names for feeds that do not carry one.
+    """
+    match_id = match.get('id') or match.get('match_id')
+    if match_id:
+        return str(match_id)
+
+    players = match.get('player')
+    if isinstance(players, list) and len(players) >= 2:
+        names = tuple(player.get('name') for player in players[:2] if isinstance(player, dict))
+    else:
+        names = (_side_name(match, 'home'), _side_name(match, 'away'))
+    return (league_info.get('name'),) + names
+
+
+class MatchDelta:
+    """Keys of the matches added, removed and changed between two payloads."""
+
+    def __init__(self, added=None, removed=None, changed=None, unchanged=0):
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+        self.unchanged = unchanged
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f"MatchDelta(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)}, unchanged={self.unchanged})")
+
+
+class _SlateEntry:
+    __slots__ = ('match', 'league_info', 'artefact')
+
+    def __init__(self, match, league_info, artefact):
+        self.match = match
+        self.league_info = league_info
+        self.artefact = artefact
+
+
+class IncrementalSlate:
+    """Per-match derived data for one sport, rebuilt only where the payload changed.
+
+    Each update() walks the new payload, compares every match with the one
+    stored under the same key in the previous payload and calls build() only
+    for matches that were added or whose raw data differs. Artefacts of
+    unchanged matches are reused as-is.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._order = []
+        self._raw_data = None
+        self._lock = threading.Lock()
+        self.last_delta = MatchDelta()
+
+    def update(self, raw_data: Dict, build: Callable[[Dict, Dict], Any]) -> Tuple[MatchDelta, List[Any]]:
+        """Diff raw_data against the previous payload and rebuild the changed matches.
+
+        Returns the delta together with the artefacts of this payload, taken
+        under the same lock so a concurrent update cannot pair one call's
+        artefacts with another call's delta.
+        """
+        with self._lock:
+            if raw_data is self._raw_data:
+                return MatchDelta(unchanged=len(self._order)), self._artefacts()
+
+            entries = {}
+            order = []
+            delta = MatchDelta()
+            for match, league_info in iter_raw_matches(raw_data):
+                if not isinstance(match, dict):
+                    continue
+
+                key = match_key(match, league_info)
+                if key in entries:
+                    # Feeds without ids can repeat a pairing; keep both occurrences
+                    key = (key, len(order))
+
+                previous = self._entries.get(key)
+                if previous is not None and previous.match == match and previous.league_info == league_info:
+                    entries[key] = previous
+                    delta.unchanged += 1
+                else:
+                    entries[key] = _SlateEntry(match, league_info, build(match, league_info))
+                    (delta.changed if previous is not None else delta.added).append(key)
+                order.append(key)
+
+            delta.removed = [key for key in self._order if key not in entries]
+            self._entries = entries
+            self._order = order
+            self._raw_data = raw_data
+            self.last_delta = delta
+            return delta, self._artefacts()
+
+    def _artefacts(self) -> List[Any]:
+        """Artefacts in payload order, skipping matches build() rejected. Caller must hold the lock."""
+        entries = self._entries
+        return [entries[key].artefact for key in self._order if entries[key].artefact is not None]
+
+    def artefacts(self) -> List[Any]:
+        """Return the artefacts in payload order, skipping matches build() rejected."""
+        with self._lock:
+            return self._artefacts()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the artefact stored for a match key."""
+        entry = self._entries.get(key)
+        return entry.artefact if entry is not None else None
+
+
+_slates = {}
+_slates_lock = threading.Lock()
+
+
+def get_slate(name: Hashable) -> IncrementalSlate:
+    """Return the process-wide IncrementalSlate registered under name, creating it if needed."""
+    with _slates_lock:
+        slate = _slates.get(name)
+        if slate is None:
+            slate = _slates[name] = IncrementalSlate()
+        return slate
@@ -0,0 +1,211 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from match_diff import MatchDelta, get_slate, iter_raw_matches
+from field_specs import get_extractor
+from match_record import MatchRecord
+from win_probability import WinProbabilities, live_win_probabilities
+
+
+def normalize_match(match: Dict, league_info: Dict, sport: str) -> Optional[MatchRecord]:
+    """Parse one raw match into a canonical MatchRecord.
+
+    The canonical match holds everything both the flat current_data view and
+    the enhanced prompt context need, so neither has to look at the raw
+    payload again. Fields are read through the sport's compiled extractor
+    (see field_specs). Returns None for matches without two named sides or
+    sports without a field spec.
+    """
+    extractor = get_extractor(sport.lower())
+    if extractor is None:
+        return None
+
+    fields = extractor.extract(match)
+    if fields is None:
+        return None
+    return MatchRecord(league=league_info['name'], country=league_info['country'],
+                       season=league_info['season'], **fields)
+
+
+# statpal's livescores.sport values mapped to the sport keys used here
+PAYLOAD_SPORTS = {
+    'soccer': 'soccer',
+    'american_football': 'nfl',
+    'basketball': 'nba',
+    'hockey': 'nhl',
+    'ice_hockey': 'nhl',
+    'baseball': 'mlb',
+    'tennis': 'tennis'
+}
+
+
+def payload_sport(raw_data) -> Optional[str]:
+    """Return the sport of a raw livescores payload, or None if it does not say."""
+    if not isinstance(raw_data, dict):
+        return None
+    if 'livescore' in raw_data:
+        return 'soccer'
+    sport = str((raw_data.get('livescores') or {}).get('sport', '')).lower()
+    return PAYLOAD_SPORTS.get(sport, sport if get_extractor(sport) else None)
+
+
+def normalize_records(raw_data, sport: Optional[str] = None) -> List[MatchRecord]:
+    """Parse a one-off payload (e.g. Oracle's MATCH_DATA) into canonical matches.
+
+    Unlike normalize_livescores this does not touch the sport's shared
+    incremental slate, which tracks the live feed.
+    """
+    sport = (sport or payload_sport(raw_data) or '').lower()
+    if get_extractor(sport) is None:
+        return []
+    records = []
+    for match, league_info in iter_raw_matches(raw_data):
+        try:
+            record = normalize_match(match, league_info, sport)
+        except Exception as e:
+            print(f"Error processing match data for {sport}: {e}")
+            continue
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def to_flat(record: MatchRecord) -> Dict:
+    """Return the flat current_data view of a canonical match."""
+    return record.to_flat()
+
+
+def render_match(record: MatchRecord) -> str:
+    """Render the prompt context block for one canonical match (without its MATCH header)."""
+    sport = record.sport
+    detail = record.detail
+
+    context = f"  League: {record.league} ({record.country})\n"
+
+    if sport == 'tennis':
+        context += f"  Players: {record.home} vs {record.away}\n"
+        context += f"  Score: {record.home_score} - {record.away_score}\n"
+        if detail('set_score') != 'N/A':
+            context += f"  Set Score: {detail('set_score')}\n"
+        if detail('surface') != 'N/A':
+            context += f"  Surface: {detail('surface')}\n"
+    else:
+        context += f"  Teams: {record.home} vs {record.away}\n"
+        context += f"  Score: {record.home_score} - {record.away_score}\n"
+
+    context += f"  Status: {record.status}\n"
+    context += f"  Time: {record.time}\n"
+    context += f"  Venue: {record.venue}\n"
+
+    # Add sport-specific details
+    if sport == 'mlb':
+        if detail('inning') != 'N/A':
+            context += f"  Inning: {detail('inning')}\n"
+        if detail('home_hits') != 'N/A':
+            context += f"  Hits: {record.home} {detail('home_hits')}, {record.away} {detail('away_hits')}\n"
+    elif sport in ('nba', 'nfl'):
+        if detail('quarter') != 'N/A':
+            context += f"  Quarter: {detail('quarter')}\n"
+    elif sport == 'nhl':
+        if detail('period') != 'N/A':
+            context += f"  Period: {detail('period')}\n"
+
+    return context
+
+
+# Sport-specific detail shown in the compact one-line encoding, with its label
+COMPACT_DETAILS = {
+    'nba': (('quarter', 'Q'),),
+    'nfl': (('quarter', 'Q'),),
+    'nhl': (('period', 'P'),),
+    'mlb': (('inning', 'Inn '),),
+    'tennis': (('set_score', 'Sets '), ('surface', ''))
+}
+
+
+def render_compact(record: MatchRecord) -> str:
+    """Render one match as a single compact line for token-budgeted contexts."""
+    parts = [f"{record.home} {record.home_score}-{record.away_score} {record.away}", str(record.status)]
+    for key, label in COMPACT_DETAILS.get(record.sport, ()):
+        value = record.detail(key)
+        if value not in ('N/A', '', None):
+            parts.append(f"{label}{value}")
+    parts.append(f"{record.league} ({record.country})")
+    return " | ".join(parts)
+
+
+class _NormalizedMatch:
+    """Slate artefact: a canonical match with its rendered context block and compact line."""
+    __slots__ = ('record', 'block', 'line')
+
+    def __init__(self, record, block, line):
+        self.record = record
+        self.block = block
+        self.line = line
+
+
+def _build(match, league_info, sport):
+    try:
+        record = normalize_match(match, league_info, sport)
+    except Exception as e:
+        print(f"Error processing match data for {sport}: {e}")
+        return None
+    if record is None:
+        return None
+    return _NormalizedMatch(record, render_match(record), render_compact(record))
+
+
+class NormalizedSlate:
+    """One raw payload parsed into canonical matches, with its derived views."""
+
+    def __init__(self, sport: str, entries: List, delta: MatchDelta):
+        self.sport = sport
+        self.records = [entry.record for entry in entries]
+        self.blocks = [entry.block for entry in entries]
+        self.lines = [entry.line for entry in entries]
+        self.delta = delta
+        self._flat = None
+        self._win_probabilities = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def flat(self) -> List[Dict]:
+        """Return the flat current_data view, built once per slate and shared by its readers."""
+        if self._flat is None:
+            self._flat = [record.to_flat() for record in self.records]
+        return self._flat
+
+    def win_probabilities(self) -> WinProbabilities:
+        """Return model win probabilities for the slate's live matches, computed once per slate."""
+        if self._win_probabilities is None:
+            self._win_probabilities = live_win_probabilities(self.records)
+        return self._win_probabilities
+
+    def render_context(self) -> str:
+        """Return the enhanced live-data context for the system prompt."""
+        sport = self.sport
+        context = f"=== ENHANCED {sport.upper()} LIVE DATA CONTEXT ===\n"
+        context += f"SPORT: {sport.upper()}\n"
+        context += f"TOTAL MATCHES: {len(self.blocks)}\n"
+        context += f"DATA TIMESTAMP: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+        for i, block in enumerate(self.blocks):
+            context += f"MATCH {i+1}:\n"
+            context += block
+            context += "\n" + "-" * 40 + "\n"
+
+        context += f"=== END OF {sport.upper()} DATA ===\n\n"
+        return context
+
+
+def normalize_livescores(raw_data: Dict, sport: str) -> NormalizedSlate:
+    """Parse a raw livescores payload once into a NormalizedSlate.
+
+    Matches unchanged since the previous payload for the sport are reused
+    from the sport's incremental slate instead of being parsed again.
+    """
+    sport = sport.lower()
+    slate = get_slate(sport)
+    delta, artefacts = slate.update(raw_data, lambda match, league_info: _build(match, league_info, sport))
+    return NormalizedSlate(sport, artefacts, delta)
@@ -0,0 +1,252 @@
+import re
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from field_specs import SPORT_FIELD_SPECS, detail_keys
+
+# Sport-specific detail fields, in the order MatchRecord.details stores them
+DETAIL_KEYS = {sport: detail_keys(sport) for sport in SPORT_FIELD_SPECS}
+
+# Per-side detail fields that to_dict() nests under 'home'/'away'
+SIDE_DETAIL_KEYS = {sport: tuple(spec.get('side_details', ())) for sport, spec in SPORT_FIELD_SPECS.items()}
+
+# Sport-specific keys added to a match's flat view
+FLAT_DETAIL_KEYS = {sport: spec.get('flat', ()) for sport, spec in SPORT_FIELD_SPECS.items()}
+
+
+# Leading digits of a feed score: '2', ' 2', '1 (4)' after penalties
+_SCORE = re.compile(r'\s*(\d+)')
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class MatchRecord:
+    """Compact canonical representation of one match.
+
+    Fields are stored in __slots__ rather than nested dicts, strings that repeat
+    across matches and snapshots (sport, league, country, status, team names,
+    ...) are interned, and sport-specific details are a tuple aligned with
+    DETAIL_KEYS[sport]. Use to_dict() or to_flat() when a dict is needed.
+    """
+
+    __slots__ = ('sport', 'match_id', 'league', 'country', 'season', 'date', 'time', 'status', 'round',
+                 'venue', 'city', 'attendance', 'home', 'home_id', 'home_score',
+                 'away', 'away_id', 'away_score', 'details')
+
+    def __init__(self, sport, match_id='N/A', league='N/A', country='N/A', season='N/A', date='N/A',
+                 time='N/A', status='N/A', round='N/A', venue='N/A', city='N/A', attendance='N/A',
+                 home='N/A', home_id='N/A', home_score='N/A', away='N/A', away_id='N/A', away_score='N/A',
+                 details=()):
+        self.sport = _intern(sport)
+        self.match_id = match_id
+        self.league = _intern(league)
+        self.country = _intern(country)
+        self.season = _intern(season)
+        self.date = _intern(date)
+        self.time = _intern(time)
+        self.status = _intern(status)
+        self.round = _intern(round)
+        self.venue = _intern(venue)
+        self.city = _intern(city)
+        self.attendance = attendance
+        self.home = _intern(home)
+        self.home_id = home_id
+        self.home_score = _intern(home_score)
+        self.away = _intern(away)
+        self.away_id = away_id
+        self.away_score = _intern(away_score)
+        self.details = details
+
+    def detail(self, key: str, default: Any = 'N/A') -> Any:
+        """Return a sport-specific detail field by name."""
+        keys = DETAIL_KEYS.get(self.sport, ())
+        if key in keys:
+            return self.details[keys.index(key)]
+        return default
+
+    def details_dict(self) -> Dict[str, Any]:
+        return dict(zip(DETAIL_KEYS.get(self.sport, ()), self.details))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the nested canonical dict view of the match."""
+        details = self.details_dict()
+        home = {'name': self.home, 'id': self.home_id, 'score': self.home_score}
+        away = {'name': self.away, 'id': self.away_id, 'score': self.away_score}
+        for key in SIDE_DETAIL_KEYS.get(self.sport, ()):
+            home[key] = details.pop(f'home_{key}', 'N/A')
+            away[key] = details.pop(f'away_{key}', 'N/A')
+        return {
+            'sport': self.sport,
+            'league': {'name': self.league, 'country': self.country, 'season': self.season},
+            'match_id': self.match_id,
+            'date': self.date,
+            'time': self.time,
+            'status': self.status,
+            'round': self.round,
+            'venue': {'name': self.venue, 'city': self.city, 'attendance': self.attendance},
+            'home': home,
+            'away': away,
+            'details': details
+        }
+
+    def to_flat(self) -> Dict[str, Any]:
+        """Return the flat current_data view of the match."""
+        match_info = {
+            'match_id': self.match_id,
+            'time': self.time,
+            'home_team': self.home,
+            'home_score': self.home_score,
+            'away_team': self.away,
+            'away_score': self.away_score,
+            'status': self.status,
+            'league_name': self.league,
+            'country': self.country,
+            'venue': self.venue,
+            'sport': self.sport,
+            'date': self.date
+        }
+        for key in FLAT_DETAIL_KEYS.get(self.sport, ()):
+            match_info[key] = getattr(self, key) if key in self.__slots__ else self.detail(key)
+        return match_info
+
+    def __eq__(self, other):
+        if not isinstance(other, MatchRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        # Records are not modified after they are built; equal records agree on these fields
+        return hash((self.sport, self.match_id, self.league, self.home, self.away, self.status,
+                     self.home_score, self.away_score))
+
+    def __repr__(self):
+        return f"MatchRecord({self.sport}: {self.home} {self.home_score}-{self.away_score} {self.away}, {self.status})"
+
+
+def parse_score(value) -> Optional[int]:
+    """Parse a feed score ('2', 2, '1 (4)') into an int; None when it is not numeric ('N/A', '?', '')."""
+    if type(value) is int:
+        return value
+    match = _SCORE.match(value) if type(value) is str else None
+    return int(match.group(1)) if match else None
+
+
+def _goals(value) -> int:
+    score = parse_score(value)
+    return score if score is not None else -1
+
+
+class StringTable:
+    """Append-only dictionary mapping strings to small integer codes."""
+
+    def __init__(self, strings: Optional[Sequence[str]] = None):
+        self.strings = []
+        self._codes = {}
+        for value in strings or ():
+            self.code(value)
+
+    def code(self, value) -> int:
+        value = 'N/A' if value is None else str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.strings[code]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class ValueTable:
+    """Append-only dictionary mapping field values to small integer codes, keeping their types.
+
+    Unlike StringTable, 7 and '7' get different codes and decode back as given.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value) -> int:
+        key = (type(value), value)
+        try:
+            code = self._codes.get(key)
+        except TypeError:
+            # Unhashable values (a list from an odd feed) are stored without sharing
+            self.values.append(value)
+            return len(self.values) - 1
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> Any:
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class MatchColumns:
+    """Column-oriented store for a whole slate of MatchRecords.
+
+    Every field is held as a uint32 code into one shared ValueTable, which
+    keeps values with their original types, so records and flat views read
+    back from the store equal the ones that went in. Scores are additionally
+    kept as int32 columns (-1 when not numeric), so scanning a slate touches
+    a few flat arrays instead of one object per match. Detail tuples are
+    kept as-is in an object column.
+    """
+
+    FIELDS = ('sport', 'match_id', 'league', 'country', 'season', 'date', 'time', 'status', 'round',
+              'venue', 'city', 'attendance', 'home', 'home_id', 'home_score',
+              'away', 'away_id', 'away_score')
+
+    def __init__(self):
+        self.values = ValueTable()
+        self.columns = {name: array('I') for name in self.FIELDS}
+        self.home_goals = array('i')
+        self.away_goals = array('i')
+        self.details = []
+
+    @classmethod
+    def from_records(cls, records: Sequence[MatchRecord]) -> 'MatchColumns':
+        store = cls()
+        for record in records:
+            store.append(record)
+        return store
+
+    def append(self, record: MatchRecord) -> None:
+        code = self.values.code
+        for name, column in self.columns.items():
+            column.append(code(getattr(record, name)))
+        self.home_goals.append(_goals(record.home_score))
+        self.away_goals.append(_goals(record.away_score))
+        self.details.append(record.details)
+
+    def __len__(self):
+        return len(self.details)
+
+    def column(self, name: str) -> List[Any]:
+        """Return the decoded values of a column."""
+        values = self.values.values
+        return [values[code] for code in self.columns[name]]
+
+    def record(self, index: int) -> MatchRecord:
+        """Rebuild the MatchRecord stored at index."""
+        values = self.values.values
+        fields = {name: values[column[index]] for name, column in self.columns.items()}
+        return MatchRecord(details=self.details[index], **fields)
+
+    def records(self) -> List[MatchRecord]:
+        return [self.record(i) for i in range(len(self))]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return the flat current_data view of every match in the store."""
+        return [self.record(i).to_flat() for i in range(len(self))]
@@ -0,0 +1,41 @@
+import re
+
+# statpal status strings are free text and differ per sport ("FT", "Final/OT",
+# "HT", "67", "3rd Quarter", "Set 2", "23:00", "Not Started", ...). These sets
+# hold the lowercase values that mean a match is over or has not begun.
+FINAL_STATUSES = {
+    'ft', 'aet', 'pen.', 'pen', 'ap', 'final', 'finished', 'ended', 'after over time',
+    'after penalties', 'after pen.', 'awarded', 'retired', 'walkover', 'w.o.'
+}
+NOT_PLAYED_STATUSES = {
+    '', 'n/a', 'ns', 'not started', 'scheduled', 'tbd', 'tba', 'postp.', 'postponed',
+    'canc.', 'cancl.', 'cancelled', 'canceled', 'abandoned', 'aban.', 'delayed', 'susp.',
+    'suspended', 'int.', 'interrupted'
+}
+
+# A bare kick-off time such as "23:00" or "6:30 PM" means the match is scheduled
+_KICKOFF_TIME = re.compile(r'^\d{1,2}:\d{2}(\s*[ap]\.?m\.?)?$', re.IGNORECASE)
+
+SCHEDULED = 'scheduled'
+LIVE = 'live'
+FINAL = 'final'
+
+
+def classify_status(status) -> str:
+    """Classify a raw status value as SCHEDULED, LIVE or FINAL."""
+    text = str(status or '').strip().lower()
+    if text in FINAL_STATUSES or text.startswith('final'):
+        return FINAL
+    if text in NOT_PLAYED_STATUSES or _KICKOFF_TIME.match(text):
+        return SCHEDULED
+    return LIVE
+
+
+def is_live(status) -> bool:
+    """Return True when the status says the match is currently being played."""
+    return classify_status(status) == LIVE
+
+
+def is_final(status) -> bool:
+    """Return True when the status says the match has finished."""
+    return classify_status(status) == FINAL
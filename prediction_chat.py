@@ -4,19 +4,38 @@ import re
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+from elo_ratings import elo_ratings
+from llm_metrics import chat_completion
+from llm_stream import ResponseStream, TrailerSplitter, iter_completion_text
+from match_normalizer import normalize_records
+from prediction_extractor import prediction_extractor
+from score_simulator import simulate_scores
+from win_probability import win_probabilities
 
 load_dotenv()
 
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 openai.api_key= OPENAI_API_KEY
 
+# Ask the main completion to append the prediction JSON as a delimited trailer
+# instead of extracting it with a second LLM call (set to 0 to disable)
+INLINE_PREDICTION = os.environ.get('INLINE_PREDICTION', '1') not in ('0', 'false', 'False')
 
+PREDICTION_OPEN_TAG = "<prediction_json>"
+PREDICTION_CLOSE_TAG = "</prediction_json>"
+PREDICTION_VALUES = ("win", "lose", "draw", "none")
 
+# Most matches whose model win probabilities go into the Oracle prompt
+MODEL_PROBABILITY_MATCHES = int(os.environ.get('MODEL_PROBABILITY_MATCHES', 10))
 
-def get_system_prompt(MATCH_DATA):
-    # Convert parsed_output to string to avoid f-string nesting issues
-    match_data_str = dict(MATCH_DATA) if MATCH_DATA else "No live data available"
-    
+
+
+
+def build_static_prompt(inline_prediction: bool = False) -> str:
+    """
+    Build the static part of the Oracle system prompt (role, framework, templates)
+    It does not depend on the match, so it is built once per variant at import
+    """
     # Base prompt section
     base_prompt = """
     # AI Sports Analyst – Conversational Match Companion 🤖⚽🏀🏈🎾
@@ -34,18 +53,8 @@ def get_system_prompt(MATCH_DATA):
     - Be **sport-specific**: Adapt terminology and focus areas depending on the sport.
 
     ---
-
-    ## CURRENT MATCH DATA
-
-    Here’s the latest you know:
-
-    **Match Info**:  
-    {match_data_str}
     """
     
-    # Match data section
-    match_data = f"{match_data_str}\n\n---\n\n"
-    
     # Analysis framework section
     analysis_framework = """
     ## ANALYSIS FRAMEWORK
@@ -186,6 +195,27 @@ def get_system_prompt(MATCH_DATA):
     ---
     """
     
+    # Inline variant: the prediction JSON comes back as a trailer of the same completion
+    inline_json_structure = """
+    ## PREDICTION JSON TRAILER
+
+    **Important**: After your conversational response, append the prediction as JSON on its own
+    line, wrapped in <prediction_json> tags. The trailer is stripped programmatically and never
+    shown to the user, so it does not count as JSON in your conversational response.
+    Do not use markdown code fences in the trailer and write nothing after the closing tag.
+
+    <prediction_json>{"entities": [{"name": "team or player name", "prediction": "win/lose/draw/none"}, {"name": "team or player name", "prediction": "win/lose/draw/none"}]}</prediction_json>
+
+    **Note**:
+    - Include the two main teams/players (maximum 2 entities); use an empty list if no match is discussed
+    - Prediction must be exactly: "win", "lose", "draw", or "none"
+    - IF team 1 is win then team 2 is lose, and vice versa. If both teams are expected to draw, both should be marked as "draw".
+
+    ---
+    """
+    if inline_prediction:
+        json_structure = inline_json_structure
+
     # Quality standards section
     quality_standards = """
     ## QUALITY STANDARDS
@@ -280,10 +310,30 @@ def get_system_prompt(MATCH_DATA):
     Remember: You're not just analyzing data—you're creating a premium sports experience that makes users feel like they have a personal expert guiding their understanding of the match. The JSON extraction happens behind the scenes, so keep your response purely conversational.
     """
     
+    if inline_prediction:
+        # The trailer is JSON too; the rules against JSON apply to the conversational part only
+        quality_standards = quality_standards.replace(
+            "- Provide structured prediction elements for JSON extraction",
+            "- End every response with the <prediction_json> trailer described above"
+        ).replace(
+            "- **NO JSON in conversational response** - keep it purely conversational",
+            "- **NO JSON in conversational response** - keep it purely conversational; the only JSON is the <prediction_json> trailer after it"
+        ).replace(
+            "- **Including JSON formatting in conversational response**",
+            "- **Including JSON formatting in conversational response** (outside the <prediction_json> trailer)"
+        )
+        edge_cases = edge_cases.replace("- Provide updated JSON prediction", "- Provide an updated <prediction_json> trailer")
+        success_metrics = success_metrics.replace(
+            "5. Response contains clear prediction elements for JSON extraction",
+            "5. Response ends with a valid <prediction_json> trailer"
+        ).replace(
+            "The JSON extraction happens behind the scenes, so keep your response purely conversational.",
+            "The <prediction_json> trailer is stripped before the user sees your response, so keep everything before it purely conversational."
+        )
+
     # Combine all sections
     full_prompt = (
         base_prompt + 
-        match_data + 
         analysis_framework + 
         sports_guidelines + 
         response_structure + 
@@ -297,6 +347,174 @@ def get_system_prompt(MATCH_DATA):
     return full_prompt
 
 
+# Static prompt prefixes, built once; byte-identical across calls so provider-side
+# prompt caching can reuse them. The per-call match data is appended after them.
+ORACLE_STATIC_PROMPTS = {
+    inline_prediction: build_static_prompt(inline_prediction).strip()
+    for inline_prediction in (False, True)
+}
+
+
+def get_system_prompt(MATCH_DATA, inline_prediction: bool = False):
+    # Convert parsed_output to string to avoid f-string nesting issues
+    match_data_str = dict(MATCH_DATA) if MATCH_DATA else "No live data available"
+    
+    # Dynamic match data section goes after the static prefix
+    match_data = f"""
+
+    ## CURRENT MATCH DATA
+
+    Here’s the latest you know:
+
+    **Match Info**:  
+    {match_data_str}
+
+    ---
+    """
+    records = normalize_records(MATCH_DATA) if MATCH_DATA else []
+    probabilities = model_win_probabilities(records)
+    if probabilities:
+        match_data += f"""
+    ## MODEL WIN PROBABILITIES
+
+    Precomputed from the score, the time left and the sport's scoring rates. Use these numbers instead of estimating your own:
+{probabilities}
+
+    ---
+    """
+    ratings = team_ratings(records)
+    if ratings:
+        match_data += f"""
+    ## TEAM RATINGS
+
+    Elo ratings and recent form (most recent result last) from the results we have tracked:
+{ratings}
+
+    ---
+    """
+    scores = simulated_final_scores(records)
+    if scores:
+        match_data += f"""
+    ## SIMULATED FINAL SCORES
+
+    From Monte Carlo simulation of the remaining play. Base any final-score call on these:
+{scores}
+
+    ---
+    """
+    return ORACLE_STATIC_PROMPTS[inline_prediction] + match_data
+
+
+def _prompt_lines(lines) -> str:
+    return "\n".join(f"    - {line}" for line in lines)
+
+
+def model_win_probabilities(records: list) -> str:
+    """Return the win probability lines for canonical matches, or '' if there are none."""
+    if not records:
+        return ""
+    probabilities = win_probabilities(records[:MODEL_PROBABILITY_MATCHES])
+    return _prompt_lines(probabilities.describe(i) for i in range(len(probabilities)))
+
+
+def team_ratings(records: list) -> str:
+    """Return rating and form lines for the matches whose sides have been rated, or ''."""
+    lines = (elo_ratings.describe(record) for record in records[:MODEL_PROBABILITY_MATCHES])
+    return _prompt_lines(line for line in lines if line)
+
+
+def simulated_final_scores(records: list) -> str:
+    """Return simulated final score lines for the unfinished matches, or '' if there are none."""
+    distributions = simulate_scores(records[:MODEL_PROBABILITY_MATCHES]) if records else []
+    return _prompt_lines(distribution.describe() for distribution in distributions if distribution)
+
+
+def parse_prediction_entities(text: str) -> list:
+    """
+    Parse an {"entities": [...]} JSON object out of model output
+    Raises ValueError when no valid JSON object is found
+    """
+    # Remove markdown formatting if present
+    text = re.sub(r'```json\s*', '', text.strip())
+    text = re.sub(r'```\s*$', '', text)
+    text = text.strip()
+    
+    # Find JSON boundaries
+    start = text.find('{')
+    end = text.rfind('}') + 1
+    if start != -1 and end > start:
+        text = text[start:end]
+    
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("prediction JSON is not an object")
+    entities = data.get("entities", [])
+    if not isinstance(entities, list):
+        raise ValueError("'entities' is not a list")
+    return entities
+
+
+def map_prediction_entities(entities: list) -> dict:
+    """Map parsed entities to the prediction_json format returned to clients"""
+    prediction_data = {
+        "team/player": "none",
+        "prediction": "none", 
+        "opponent": "none",
+        "opponent_prediction": "none"
+    }
+    entities = [entity for entity in entities if isinstance(entity, dict)]
+    
+    if len(entities) >= 2:
+        prediction_data["team/player"] = entities[0].get("name", "none")
+        prediction_data["prediction"] = entities[0].get("prediction", "none")
+        prediction_data["opponent"] = entities[1].get("name", "none")
+        prediction_data["opponent_prediction"] = entities[1].get("prediction", "none")
+        
+        # Ensure complementary predictions
+        if prediction_data["prediction"] == "win" and prediction_data["opponent_prediction"] == "none":
+            prediction_data["opponent_prediction"] = "lose"
+        elif prediction_data["prediction"] == "lose" and prediction_data["opponent_prediction"] == "none":
+            prediction_data["opponent_prediction"] = "win"
+        elif prediction_data["prediction"] == "draw":
+            prediction_data["opponent_prediction"] = "draw"
+            
+    elif len(entities) == 1:
+        prediction_data["team/player"] = entities[0].get("name", "none")
+        prediction_data["prediction"] = entities[0].get("prediction", "none")
+    
+    return prediction_data
+
+
+def split_prediction_trailer(text: str) -> tuple:
+    """
+    Split a completion into its conversational text and the raw prediction trailer
+    Returns (response, trailer); trailer is None when the model did not append one
+    """
+    start = text.find(PREDICTION_OPEN_TAG)
+    if start == -1:
+        return text.strip(), None
+    trailer = text[start + len(PREDICTION_OPEN_TAG):]
+    end = trailer.find(PREDICTION_CLOSE_TAG)
+    if end != -1:
+        trailer = trailer[:end]
+    return text[:start].strip(), trailer
+
+
+def inline_prediction_json(trailer: str):
+    """Parse a prediction trailer, returning None if it is missing or malformed"""
+    if not trailer:
+        return None
+    try:
+        entities = parse_prediction_entities(trailer)
+    except ValueError as e:
+        print(f"Inline prediction parsing failed: {e}")
+        return None
+    if any(not isinstance(entity, dict) or entity.get("prediction", "none") not in PREDICTION_VALUES
+           for entity in entities):
+        print("Inline prediction parsing failed: unexpected entity format")
+        return None
+    return map_prediction_entities(entities)
+
 
 def extract_prediction_json(response_text: str):
     """
@@ -336,7 +554,8 @@ def extract_prediction_json(response_text: str):
         """
         
         # Call OpenAI API
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            "extract_prediction_json",
             model="gpt-4-turbo",
             messages=[
                 {
@@ -352,42 +571,9 @@ def extract_prediction_json(response_text: str):
             max_tokens=300
         )
         
-        # Get and clean the response
+        # Get and parse the response
         openai_result = response.choices[0].message.content.strip()
-        
-        # Remove markdown formatting if present
-        openai_result = re.sub(r'```json\s*', '', openai_result)
-        openai_result = re.sub(r'```\s*$', '', openai_result)
-        openai_result = openai_result.strip()
-        
-        # Find JSON boundaries
-        start = openai_result.find('{')
-        end = openai_result.rfind('}') + 1
-        if start != -1 and end > start:
-            openai_result = openai_result[start:end]
-        
-        # Parse JSON response
-        extracted_data = json.loads(openai_result)
-        entities = extracted_data.get("entities", [])
-        
-        # Map to your desired format (overwrite the initialized values)
-        if len(entities) >= 2:
-            prediction_data["team/player"] = entities[0].get("name", "none")
-            prediction_data["prediction"] = entities[0].get("prediction", "none")
-            prediction_data["opponent"] = entities[1].get("name", "none")
-            prediction_data["opponent_prediction"] = entities[1].get("prediction", "none")
-            
-            # Ensure complementary predictions
-            if prediction_data["prediction"] == "win" and prediction_data["opponent_prediction"] == "none":
-                prediction_data["opponent_prediction"] = "lose"
-            elif prediction_data["prediction"] == "lose" and prediction_data["opponent_prediction"] == "none":
-                prediction_data["opponent_prediction"] = "win"
-            elif prediction_data["prediction"] == "draw":
-                prediction_data["opponent_prediction"] = "draw"
-                
-        elif len(entities) == 1:
-            prediction_data["team/player"] = entities[0].get("name", "none")
-            prediction_data["prediction"] = entities[0].get("prediction", "none")
+        prediction_data = map_prediction_entities(parse_prediction_entities(openai_result))
     
     except Exception as e:
         print(f"OpenAI extraction failed: {e}")
@@ -395,20 +581,50 @@ def extract_prediction_json(response_text: str):
     return prediction_data
 
 
-def call_openai(user_input: str, MATCH_DATA: dict, conversation_history: dict = None) -> dict:
-    system_prompt = get_system_prompt(MATCH_DATA)
+def build_messages(user_input: str, MATCH_DATA: dict, conversation_history: list = None,
+                   inline_prediction: bool = INLINE_PREDICTION) -> list:
+    """Build the chat messages (system prompt, history, user turn) for an Oracle reply"""
+    system_prompt = get_system_prompt(MATCH_DATA, inline_prediction)
 
     messages = [
         {"role": "system", "content": system_prompt.strip()}
     ]
     
     # Add conversation history
-    messages.extend(conversation_history)
+    messages.extend(conversation_history or [])
     
     # Add current user message
     messages.append({"role": "user", "content": user_input.strip()})
+    return messages
+
+
+def prediction_result(conversational_response: str, trailer: str = None, MATCH_DATA: dict = None) -> dict:
+    """
+    Build the call_openai result dict for a finished response
+    Uses the inline prediction trailer when it parses, otherwise the local
+    rule-based extractor, and only calls extract_prediction_json when the
+    local result is not confident enough
+    """
+    conversational_response = conversational_response.strip()
+    prediction_json = inline_prediction_json(trailer)
+    if prediction_json is not None:
+        prediction_extractor.record('inline')
+    else:
+        prediction_json = prediction_extractor.extract(conversational_response, MATCH_DATA,
+                                                       fallback=extract_prediction_json)
+
+    return {
+        "response": conversational_response,
+        "prediction_json": prediction_json
+    }
+
+
+def call_openai(user_input: str, MATCH_DATA: dict, conversation_history: dict = None,
+                inline_prediction: bool = INLINE_PREDICTION) -> dict:
+    messages = build_messages(user_input, MATCH_DATA, conversation_history, inline_prediction)
 
-    response = openai.ChatCompletion.create(
+    response = chat_completion(
+        "call_openai",
         model="gpt-4-turbo",
         messages=messages,
         temperature=0.7,
@@ -420,21 +636,56 @@ def call_openai(user_input: str, MATCH_DATA: dict, conversation_history: dict =
     # Get the conversational response
     conversational_response = response.choices[0].message.content
     
-    # Extract simple prediction JSON
-    prediction_json = extract_prediction_json(conversational_response)
+    # Split off the inline prediction JSON, if the model was asked for one
+    trailer = None
+    if inline_prediction:
+        conversational_response, trailer = split_prediction_trailer(conversational_response)
     
-    return {
-        "response": conversational_response,
-        "prediction_json": prediction_json
-    }
+    return prediction_result(conversational_response, trailer, MATCH_DATA)
  
 
 
-def chat_loop(user_input: str, MATCH_DATA: dict = None, conversation_history: dict = None) -> tuple[str, list]:
+def stream_openai(user_input: str, MATCH_DATA: dict, conversation_history: list = None,
+                  inline_prediction: bool = INLINE_PREDICTION):
+    """
+    Start a streamed Oracle completion
+    Returns a TrailerSplitter yielding the conversational text chunks; its
+    .trailer holds the inline prediction JSON once the stream is consumed
+    """
+    messages = build_messages(user_input, MATCH_DATA, conversation_history, inline_prediction)
+
+    response = chat_completion(
+        "call_openai",
+        model="gpt-4-turbo",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=1200,
+        top_p=0.9,
+        frequency_penalty=0.1,
+        stream=True
+    )
+    return TrailerSplitter(iter_completion_text(response), PREDICTION_OPEN_TAG)
+
+
+def call_openai_stream(user_input: str, MATCH_DATA: dict, conversation_history: list = None,
+                       inline_prediction: bool = INLINE_PREDICTION) -> ResponseStream:
+    """
+    Streaming variant of call_openai
+
+    Returns a ResponseStream yielding the conversational response as it is
+    generated. Once the stream is exhausted, .result holds the same
+    {"response", "prediction_json"} dict call_openai returns.
+    """
+    chunks = stream_openai(user_input, MATCH_DATA, conversation_history, inline_prediction)
+    return ResponseStream(chunks, on_complete=lambda text: prediction_result(text, chunks.trailer, MATCH_DATA))
+
+
+def chat_loop(user_input: str, MATCH_DATA: dict = None, conversation_history: dict = None,
+              inline_prediction: bool = INLINE_PREDICTION) -> tuple[str, list]:
 
     
     # Call OpenAI API with current inputs and history
-    response = call_openai(user_input, MATCH_DATA, conversation_history)
+    response = call_openai(user_input, MATCH_DATA, conversation_history, inline_prediction)
     
     # Update conversation history with new exchange
     conversation_history.append({"role": "user", "content": user_input})
@@ -447,6 +698,30 @@ def chat_loop(user_input: str, MATCH_DATA: dict = None, conversation_history: di
     # Return AI response and updated conversation history
     return response
 
+def chat_loop_stream(user_input: str, MATCH_DATA: dict = None, conversation_history: list = None,
+                     inline_prediction: bool = INLINE_PREDICTION) -> ResponseStream:
+    """
+    Streaming variant of chat_loop
+
+    Yields response chunks as they arrive; conversation_history is updated in
+    place once the stream completes, and .result holds the call_openai dict.
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    chunks = stream_openai(user_input, MATCH_DATA, conversation_history, inline_prediction)
+
+    def update_history(conversational_response):
+        result = prediction_result(conversational_response, chunks.trailer, MATCH_DATA)
+        conversation_history.append({"role": "user", "content": user_input})
+        conversation_history.append({"role": "assistant", "content": result["response"]})
+
+        # Keep only last 10 messages for context management
+        del conversation_history[:-10]
+        return result
+
+    return ResponseStream(chunks, on_complete=update_history)
+
 if __name__ == "__main__":
     user_input = "give me a summary of the last masssges"
     conversation_history = [
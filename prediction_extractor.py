@@ -0,0 +1,272 @@
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from field_specs import get_extractor
+from match_diff import iter_raw_matches
+from text_utils import GENERIC_NAME_WORDS
+
+# Local results below this confidence are handed to the LLM extractor
+PREDICTION_CONFIDENCE_THRESHOLD = float(os.environ.get('PREDICTION_CONFIDENCE_THRESHOLD', 0.7))
+
+WIN, LOSE, DRAW, NONE = 'win', 'lose', 'draw', 'none'
+_OPPOSITE = {WIN: LOSE, LOSE: WIN, DRAW: DRAW, NONE: NONE}
+
+# Confidence of a call found in the "My Take"/prediction sentence vs. elsewhere
+CONFIDENCE_TAKE = 0.9
+CONFIDENCE_OTHER = 0.7
+# Penalties for a call made through a pronoun and for contradicting calls
+PENALTY_PRONOUN = 0.15
+PENALTY_CONFLICT = 0.3
+# No participant named at all: the reply simply makes no call
+CONFIDENCE_NO_CALL = 0.8
+# Prediction wording we could not attribute to a team or player, or a named
+# side without wording we recognise ("the Eagles should dominate")
+CONFIDENCE_UNRESOLVED = 0.3
+
+# Sentences that carry the reply's actual call
+_TAKE_SENTENCE = re.compile(
+    r"\b(?:my take|my pick|prediction|predict|calling it|call it|final call|verdict|bottom line|i expect|i see)\b")
+
+# Outcome wording following its subject ("Eagles will win", "they edge it 2-1")
+_WIN_AFTER = (r"win|wins|winning|beat|beats|edge it|edges it|edge this|edges this|edge out|edges out|"
+              r"take it|takes it|take this|takes this|prevail|prevails|triumph|triumphs|come out on top|"
+              r"comes out on top|cruise|cruises|clinch|clinches|hold on|holds on|close it out|closes it out|"
+              r"get the win|gets the win|get the job done|gets the job done|run away with it|runs away with it")
+_LOSE_AFTER = (r"lose|loses|losing|fall short|falls short|be beaten|get beaten|gets beaten|come up short|"
+               r"comes up short|drop this|drops this|fall to|falls to|be upset|get upset|collapse|collapses")
+# Outcome wording preceding its object ("calling it for the Eagles", "backing Kansas City")
+_WIN_BEFORE = (r"calling it for|call it for|my pick is|my pick:|i'm taking|i am taking|i'm going with|"
+               r"going with|backing|back the|edge to|advantage|i like|picking|i'm picking|favou?ring")
+_DRAW = r"draw|tie|ties|stalemate|share the points|split the points|deadlock|all square|ends level|end level"
+
+_CUES = re.compile(
+    rf"\b(?:(?P<lose>{_LOSE_AFTER})|(?P<win>{_WIN_AFTER})|(?P<before>{_WIN_BEFORE})|(?P<draw>{_DRAW}))(?!\w)")
+_PRONOUN = re.compile(r"\b(?:they|he|she)\b")
+_NEGATION = re.compile(r"(?:\bnot\b|n't\b|\bnever\b|\bno way\b)")
+# Where a clause starts within a sentence; negation applies to the cues of its own clause
+_CLAUSE_BREAK = re.compile(r"[,;:]|\s(?:but|although|though|while|whereas)\s|\s[-\u2013\u2014]\s")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# How far (in characters) an outcome cue may sit from the name it refers to
+_SUBJECT_WINDOW = 60
+_OBJECT_WINDOW = 30
+
+# Generic references to either side of a match
+_SIDE_ALIASES = {
+    0: ('home team', 'home side', 'hosts', 'home club'),
+    1: ('away team', 'away side', 'visitors', 'road team', 'away club')
+}
+
+
+def match_participants(match: Dict) -> Optional[Tuple[str, str]]:
+    """Return the (home, away) team or player names of a raw match."""
+    for sport in ('soccer', 'nba', 'mlb', 'tennis'):
+        extractor = get_extractor(sport)
+        home = extractor.home_name(match)
+        away = extractor.away_name(match)
+        if home != 'N/A' and away != 'N/A':
+            return str(home), str(away)
+    return None
+
+
+class _Entities:
+    """The teams/players of a MATCH_DATA payload and a regex matching their names."""
+
+    def __init__(self, pairs: Tuple[Tuple[str, str], ...]):
+        # entity index -> (name, pair index, side)
+        self.entities = [(name, pair, side) for pair, names in enumerate(pairs) for side, name in enumerate(names)]
+
+        alias_owner = {}
+        for index, (name, pair, side) in enumerate(self.entities):
+            lowered = name.lower()
+            aliases = {lowered} | {word for word in _WORD.findall(lowered)
+                                   if len(word) > 2 and word not in GENERIC_NAME_WORDS}
+            if len(pairs) == 1:
+                aliases.update(_SIDE_ALIASES[side])
+            for alias in aliases:
+                # Aliases shared by two entities ("manchester") identify neither
+                alias_owner[alias] = index if alias_owner.get(alias, index) == index else None
+        self.aliases = {alias: index for alias, index in alias_owner.items() if index is not None}
+
+        pattern = '|'.join(re.escape(alias) for alias in sorted(self.aliases, key=len, reverse=True))
+        self.pattern = re.compile(rf"\b(?:{pattern})\b") if pattern else None
+
+    def opponent(self, index: int) -> int:
+        return index + 1 if self.entities[index][2] == 0 else index - 1
+
+    def find(self, sentence: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, entity index) for every name mentioned in a lowercased sentence."""
+        if self.pattern is None:
+            return []
+        return [(m.start(), m.end(), self.aliases[m.group(0)]) for m in self.pattern.finditer(sentence)]
+
+
+@lru_cache(maxsize=32)
+def _compile_entities(pairs: Tuple[Tuple[str, str], ...]) -> _Entities:
+    return _Entities(pairs)
+
+
+def match_entities(MATCH_DATA) -> _Entities:
+    """Return the compiled entities of every match in a MATCH_DATA payload."""
+    pairs = []
+    for match, _ in iter_raw_matches(MATCH_DATA or {}):
+        if isinstance(match, dict):
+            names = match_participants(match)
+            if names and names not in pairs:
+                pairs.append(names)
+    return _compile_entities(tuple(pairs))
+
+
+def _empty_prediction() -> Dict[str, str]:
+    return {
+        "team/player": "none",
+        "prediction": "none",
+        "opponent": "none",
+        "opponent_prediction": "none"
+    }
+
+
+class PredictionExtractor:
+    """Rule-based extractor for the team/prediction pairs of an Oracle reply.
+
+    Names are matched against the teams/players in MATCH_DATA, then the
+    win/lose/draw wording around them is attributed to the nearest name
+    (or to the last named side for "they"). The call in the "My Take"
+    sentence wins over calls elsewhere. Only results below
+    confidence_threshold are sent to the LLM fallback. Counters record how
+    many replies each path handled.
+    """
+
+    def __init__(self, confidence_threshold: float = PREDICTION_CONFIDENCE_THRESHOLD):
+        self.confidence_threshold = confidence_threshold
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str) -> None:
+        """Count one reply handled by the given path ('inline', 'local', 'llm', ...)."""
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-path counters and the share of replies that needed the LLM."""
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        counts['total'] = total
+        counts['llm_rate'] = counts.get('llm', 0) / total if total else 0.0
+        return counts
+
+    def extract_local(self, response_text: str, MATCH_DATA) -> Tuple[Dict[str, str], float]:
+        """Return (prediction_data, confidence) without calling the LLM."""
+        entities = match_entities(MATCH_DATA)
+        if not entities.entities:
+            return _empty_prediction(), 0.0
+
+        calls = []      # (sentence index, is take sentence, entity index or None, outcome, via pronoun)
+        mentioned = []  # entity indexes in mention order
+        saw_cue = False
+        for number, sentence in enumerate(_SENTENCE_SPLIT.split(response_text.lower().replace('’', "'"))):
+            mentions = entities.find(sentence)
+            pronouns = [(m.start(), m.end(), None) for m in _PRONOUN.finditer(sentence)]
+            references = sorted(mentions + pronouns)
+            is_take = bool(_TAKE_SENTENCE.search(sentence))
+
+            clause_starts = [m.end() for m in _CLAUSE_BREAK.finditer(sentence)]
+            for cue in _CUES.finditer(sentence):
+                saw_cue = True
+                kind = cue.lastgroup
+                clause_start = max((start for start in clause_starts if start <= cue.start()), default=0)
+                negated = bool(_NEGATION.search(sentence, clause_start, cue.start()))
+                if kind == 'draw':
+                    # "I don't see a tie" rules a draw out without calling a winner
+                    if not negated:
+                        calls.append((number, is_take, None, DRAW, False))
+                    continue
+
+                if kind == 'before':
+                    following = [ref for ref in references if ref[0] >= cue.end() and ref[0] - cue.end() <= _OBJECT_WINDOW]
+                    target = following[0] if following else None
+                    outcome = WIN
+                else:
+                    preceding = [ref for ref in references if ref[1] <= cue.start() and cue.start() - ref[1] <= _SUBJECT_WINDOW]
+                    target = preceding[-1] if preceding else None
+                    outcome = WIN if kind == 'win' else LOSE
+                if target is None:
+                    continue
+                if negated:
+                    outcome = _OPPOSITE[outcome]
+
+                entity, via_pronoun = target[2], target[2] is None
+                if via_pronoun:
+                    # "they" refers to the last side named so far
+                    named_before = [ref[2] for ref in mentions if ref[1] <= target[0]]
+                    entity = named_before[-1] if named_before else (mentioned[-1] if mentioned else None)
+                    if entity is None:
+                        continue
+                calls.append((number, is_take, entity, outcome, via_pronoun))
+
+            mentioned.extend(ref[2] for ref in mentions)
+
+        if not calls:
+            prediction = _empty_prediction()
+            named = list(dict.fromkeys(mentioned))
+            if named:
+                prediction["team/player"] = entities.entities[named[0]][0]
+                opponent = entities.opponent(named[0])
+                if opponent in named:
+                    prediction["opponent"] = entities.entities[opponent][0]
+            # A named side without a call may hide a pick in wording we don't know
+            return prediction, (CONFIDENCE_UNRESOLVED if saw_cue or named else CONFIDENCE_NO_CALL)
+
+        considered = [call for call in calls if call[1]] or calls
+        _, is_take, entity, outcome, via_pronoun = considered[-1]
+        if entity is None:
+            # A draw call: it concerns the match of the last named side
+            if not mentioned and len(entities.entities) > 2:
+                return _empty_prediction(), CONFIDENCE_UNRESOLVED
+            entity = mentioned[-1] if mentioned else 0
+            if entities.entities[entity][2] == 1:
+                entity = entities.opponent(entity)
+        opponent = entities.opponent(entity)
+
+        confidence = CONFIDENCE_TAKE if is_take else CONFIDENCE_OTHER
+        if via_pronoun:
+            confidence -= PENALTY_PRONOUN
+        for call in considered:
+            other, other_outcome = call[2], call[3]
+            if other is None:
+                agrees = outcome == DRAW
+            elif other == entity:
+                agrees = other_outcome == outcome
+            elif other == opponent:
+                agrees = other_outcome == _OPPOSITE[outcome]
+            else:
+                continue
+            if not agrees:
+                confidence -= PENALTY_CONFLICT
+                break
+
+        return {
+            "team/player": entities.entities[entity][0],
+            "prediction": outcome,
+            "opponent": entities.entities[opponent][0],
+            "opponent_prediction": _OPPOSITE[outcome]
+        }, confidence
+
+    def extract(self, response_text: str, MATCH_DATA,
+                fallback: Optional[Callable[[str], Dict[str, str]]] = None) -> Dict[str, str]:
+        """Extract the prediction locally, calling fallback(response_text) only when unsure."""
+        prediction, confidence = self.extract_local(response_text, MATCH_DATA)
+        if confidence >= self.confidence_threshold or fallback is None:
+            self.record('local')
+            return prediction
+        self.record('llm')
+        return fallback(response_text)
+
+
+# Process-wide extractor shared by all chats
+prediction_extractor = PredictionExtractor()
@@ -0,0 +1,162 @@
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from match_record import MatchRecord, parse_score
+from match_status import FINAL, SCHEDULED, classify_status
+from win_probability import OVERTIME_HOME_SHARE, POISSON_RATES, elapsed_fraction
+
+# Simulated paths per match
+SIMULATION_PATHS = int(os.environ.get('SIMULATION_PATHS', 20000))
+# Fixed seed for reproducible simulations (unset: fresh randomness per call)
+SIMULATION_SEED = os.environ.get('SIMULATION_SEED')
+# Score quantiles reported per side
+SCORE_QUANTILES = (0.1, 0.5, 0.9)
+
+# NFL: touchdowns (7 points with the extra point) and field goals per full
+# game as (home, away) Poisson rates
+NFL_SCORING_RATES = {'touchdown': ((2.5, 2.3), 7), 'field_goal': ((1.7, 1.6), 3)}
+# NBA: points per full game as (home, away) means and the per-team standard deviation
+NBA_POINTS = ((115.0, 112.5), 12.0)
+# MLB: runs per full game as (home, away) means and the negative binomial
+# dispersion (smaller is burstier)
+MLB_RUNS = ((4.6, 4.4), 3.0)
+# Points added to (loser, winner) of a simulated regulation tie in overtime,
+# extra innings or a shootout; soccer keeps its draws
+OVERTIME_POINTS = {'nfl': (0, 3), 'nba': (8, 12), 'nhl': (0, 1), 'mlb': (0, 1)}
+
+
+class ScoreDistribution:
+    """Simulated final score distribution of one match."""
+
+    def __init__(self, record: MatchRecord, home_quantiles: Tuple[int, ...], away_quantiles: Tuple[int, ...],
+                 most_likely: Tuple[int, int], most_likely_share: float, paths: int):
+        self.record = record
+        self.home_quantiles = home_quantiles
+        self.away_quantiles = away_quantiles
+        self.most_likely = most_likely
+        self.most_likely_share = most_likely_share
+        self.paths = paths
+
+    def describe(self) -> str:
+        """One readable line for prompts."""
+        record = self.record
+        low, median, high = 0, len(SCORE_QUANTILES) // 2, len(SCORE_QUANTILES) - 1
+        home, away = self.most_likely
+        return (f"{record.home} vs {record.away}: most likely {home}-{away} "
+                f"({self.most_likely_share:.1%} of {self.paths} simulations), "
+                f"median {self.home_quantiles[median]}-{self.away_quantiles[median]}, "
+                f"{record.home} {self.home_quantiles[low]}-{self.home_quantiles[high]}, "
+                f"{record.away} {self.away_quantiles[low]}-{self.away_quantiles[high]} "
+                f"({SCORE_QUANTILES[low]:.0%}-{SCORE_QUANTILES[high]:.0%} range)")
+
+
+def _score(value) -> int:
+    score = parse_score(value)
+    return score if score is not None else 0
+
+
+def _sample_remaining(sport: str, remaining: np.ndarray, paths: int, rng: np.random.Generator) -> np.ndarray:
+    """Sample remaining points as a (2, matches, paths) array of home and away scores."""
+    shape = (2, len(remaining), paths)
+    fraction = remaining[None, :, None]
+
+    if sport in POISSON_RATES:
+        rates = np.array(POISSON_RATES[sport])[:, None, None] * fraction
+        return rng.poisson(np.broadcast_to(rates, shape))
+
+    if sport == 'nfl':
+        points = np.zeros(shape, dtype=np.int64)
+        for rates, value in NFL_SCORING_RATES.values():
+            expected = np.array(rates)[:, None, None] * fraction
+            points += value * rng.poisson(np.broadcast_to(expected, shape))
+        return points
+
+    if sport == 'nba':
+        means, sd = NBA_POINTS
+        expected = np.array(means)[:, None, None] * fraction
+        spread = sd * np.sqrt(fraction)
+        return np.maximum(np.rint(rng.normal(expected, spread, size=shape)), 0).astype(np.int64)
+
+    if sport == 'mlb':
+        means, dispersion = MLB_RUNS
+        expected = np.array(means)[:, None, None] * fraction
+        # Gamma-Poisson mixture: negative binomial runs with the given mean
+        scale = np.broadcast_to(expected / dispersion, shape)
+        return rng.poisson(rng.gamma(dispersion, 1.0, size=shape) * scale)
+
+    raise ValueError(f"No scoring model for {sport}")
+
+
+def _settle_ties(final: np.ndarray, points: Tuple[int, int], rng: np.random.Generator) -> None:
+    """Break tied paths in place, the home side winning OVERTIME_HOME_SHARE of them."""
+    tied = final[0] == final[1]
+    home_wins = rng.random(tied.shape) < OVERTIME_HOME_SHARE
+    loser, winner = points
+    final[0] += np.where(tied, np.where(home_wins, winner, loser), 0)
+    final[1] += np.where(tied, np.where(home_wins, loser, winner), 0)
+
+
+def _modes(home: np.ndarray, away: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the most frequent (home, away) pair per row and its count."""
+    rows, paths = home.shape
+    width = int(away.max(initial=0)) + 1
+    height = int(home.max(initial=0)) + 1
+    keys = (np.arange(rows)[:, None] * height + home) * width + away
+    unique, counts = np.unique(keys.ravel(), return_counts=True)
+    row_of = unique // (height * width)
+    order = np.lexsort((-counts, row_of))
+    first = order[np.searchsorted(row_of[order], np.arange(rows))]
+    pairs = unique[first] % (height * width)
+    return pairs // width, pairs % width, counts[first]
+
+
+def simulate_scores(records: Sequence[MatchRecord], paths: int = SIMULATION_PATHS,
+                    seed: Optional[int] = None) -> List[Optional[ScoreDistribution]]:
+    """Simulate the rest of each match and summarise its final score distribution.
+
+    Progress comes from win_probability.elapsed_fraction() and the current
+    score is the starting point; the remaining play is sampled under the
+    sport's scoring model, with all matches of a sport and all their paths
+    drawn as one array. Finished matches and sports without a scoring model
+    (tennis) get None.
+    """
+    records = list(records)
+    if seed is None and SIMULATION_SEED is not None:
+        seed = int(SIMULATION_SEED)
+    rng = np.random.default_rng(seed)
+    results = [None] * len(records)
+
+    by_sport = {}
+    for i, record in enumerate(records):
+        if classify_status(record.status) != FINAL:
+            by_sport.setdefault(record.sport, []).append(i)
+
+    for sport, indexes in by_sport.items():
+        if sport not in POISSON_RATES and sport not in ('nfl', 'nba', 'mlb'):
+            continue
+        batch = [records[i] for i in indexes]
+        remaining = np.array([1.0 - elapsed_fraction(record) for record in batch])
+        current = np.array([[_score(record.home_score) for record in batch],
+                            [_score(record.away_score) for record in batch]])
+        # Scheduled matches start from 0-0 whatever the feed puts in the score fields
+        scheduled = np.array([classify_status(record.status) == SCHEDULED for record in batch])
+        current[:, scheduled] = 0
+
+        final = current[:, :, None] + _sample_remaining(sport, remaining, paths, rng)
+        if sport in OVERTIME_POINTS:
+            _settle_ties(final, OVERTIME_POINTS[sport], rng)
+        quantiles = np.quantile(final, SCORE_QUANTILES, axis=2, method='nearest')
+        home_mode, away_mode, counts = _modes(final[0], final[1])
+
+        for j, i in enumerate(indexes):
+            results[i] = ScoreDistribution(
+                records[i],
+                tuple(int(value) for value in quantiles[:, 0, j]),
+                tuple(int(value) for value in quantiles[:, 1, j]),
+                (int(home_mode[j]), int(away_mode[j])),
+                counts[j] / paths,
+                paths
+            )
+    return results
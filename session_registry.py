@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Upper bound on live sessions; least recently used ones are evicted first
+SESSION_REGISTRY_MAXSIZE = int(os.environ.get('SESSION_REGISTRY_MAXSIZE', 1000))
+# Sessions idle for longer than this many seconds are dropped
+SESSION_IDLE_TTL = float(os.environ.get('SESSION_IDLE_TTL', 1800))
+# Approximate memory budget for all sessions' own state (shared snapshots are not counted)
+SESSION_REGISTRY_MAX_BYTES = int(os.environ.get('SESSION_REGISTRY_MAX_BYTES', 64 * 1024 * 1024))
+
+# Fixed per-session overhead used by the memory estimate
+_SESSION_OVERHEAD = 2048
+
+
+def estimate_session_bytes(bot) -> int:
+    """Rough size of the state a session owns: its conversation history.
+
+    Live data is not counted; bots hold references to the process-wide
+    snapshots rather than their own copies.
+    """
+    size = _SESSION_OVERHEAD
+    for message in getattr(bot, 'conversation_history', None) or ():
+        content = message.get('content') if isinstance(message, dict) else message
+        size += 64 + len(str(content))
+    return size
+
+
+class Session:
+    """A registered bot with its bookkeeping. Hold .lock while running a turn."""
+
+    def __init__(self, session_id: Hashable, bot: Any, now: float):
+        self.session_id = session_id
+        self.bot = bot
+        self.created_at = now
+        self.last_used = now
+        self.size = estimate_session_bytes(bot)
+        self.lock = threading.Lock()
+
+
+class SessionRegistry:
+    """In-process registry of chat bots keyed by session id.
+
+    Sessions are kept in least-recently-used order and evicted when the
+    registry holds more than maxsize sessions, when their estimated memory
+    exceeds max_bytes, or once they have been idle for idle_ttl seconds.
+    """
+
+    def __init__(self, maxsize: int = SESSION_REGISTRY_MAXSIZE, idle_ttl: float = SESSION_IDLE_TTL,
+                 max_bytes: int = SESSION_REGISTRY_MAX_BYTES, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, session_id):
+        """Remove a session. Caller must hold the lock."""
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.size
+
+    def _evict(self, now, keep=None):
+        """Drop idle sessions, then LRU ones past the size and memory caps. Caller must hold the lock."""
+        for session_id in [sid for sid, session in self._sessions.items()
+                           if now - session.last_used > self.idle_ttl and sid != keep]:
+            self._drop(session_id)
+            self.expirations += 1
+        while len(self._sessions) > 1 and (len(self._sessions) > self.maxsize or self._bytes > self.max_bytes):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                self._sessions.move_to_end(session_id)
+                session_id = next(iter(self._sessions))
+            self._drop(session_id)
+            self.evictions += 1
+
+    def get(self, session_id: Hashable) -> Optional[Session]:
+        """Return the live session for an id, or None if it is unknown or expired."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            now = self.clock()
+            if now - session.last_used > self.idle_ttl:
+                self._drop(session_id)
+                self.expirations += 1
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: Hashable, factory: Callable[[], Any]) -> Session:
+        """Return the session for an id, creating its bot with factory() if needed."""
+        session = self.get(session_id)
+        if session is not None:
+            return session
+
+        bot = factory()
+        with self._lock:
+            # Another thread may have created the session meanwhile
+            session = self._sessions.get(session_id)
+            if session is None:
+                now = self.clock()
+                session = self._sessions[session_id] = Session(session_id, bot, now)
+                self._bytes += session.size
+                self.created += 1
+                self._evict(now, keep=session_id)
+            return session
+
+    def touch(self, session: Session) -> None:
+        """Re-estimate a session's memory after a turn and enforce the caps."""
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return
+            size = estimate_session_bytes(session.bot)
+            self._bytes += size - session.size
+            session.size = size
+            now = self.clock()
+            session.last_used = now
+            self._sessions.move_to_end(session.session_id)
+            self._evict(now, keep=session.session_id)
+
+    def discard(self, session_id: Hashable) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return session counts, eviction counters and the estimated memory in use."""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'created': self.created,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+# Process-wide registry of chat sessions
+session_registry = SessionRegistry()
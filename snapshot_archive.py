@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional
+
+from live_poller import LiveSnapshot
+from match_normalizer import NormalizedSlate
+
+# Directory holding the archive, next to this module unless configured (set to '' to
+# disable recording from the live poller)
+SNAPSHOT_ARCHIVE_DIR = os.environ.get('SNAPSHOT_ARCHIVE_DIR',
+                                      os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshot_archive'))
+SNAPSHOT_ARCHIVE_COMPRESSLEVEL = int(os.environ.get('SNAPSHOT_ARCHIVE_COMPRESSLEVEL', 6))
+
+# Sidecar index entry: poll timestamp, byte offset and length of its gzip member
+_INDEX_ENTRY = struct.Struct('<dQI')
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime('%Y%m%d', time.gmtime(timestamp))
+
+
+class ArchivedSnapshot:
+    """One recorded poll: when it was taken, the sport and its flat matches."""
+
+    def __init__(self, timestamp: float, sport: str, matches: List[Dict]):
+        self.timestamp = timestamp
+        self.sport = sport
+        self.matches = matches
+
+    def __repr__(self):
+        return f"ArchivedSnapshot({self.sport}, {self.timestamp:.0f}, {len(self.matches)} matches)"
+
+
+class _DayIndex:
+    """Read-only view of a sidecar index file, searchable by timestamp."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.timestamps = [entry[0] for entry in _INDEX_ENTRY.iter_unpack(data)]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def entry(self, i: int):
+        return _INDEX_ENTRY.unpack_from(self.data, i * _INDEX_ENTRY.size)
+
+
+class SnapshotArchive:
+    """Append-only, compressed, time-indexed archive of polled snapshots.
+
+    Each sport gets one data file per UTC day, <root>/<sport>/<YYYYMMDD>.ndjson.gz,
+    where every poll is appended as its own gzip member holding one JSON line
+    (the whole file still reads with gzip/zcat). A fixed-width sidecar index,
+    <YYYYMMDD>.idx, records each poll's timestamp, offset and length, so a
+    range read binary-searches the index and decompresses only the polls it
+    returns. Polls whose matches did not change since the last recorded one
+    are skipped: the snapshot in force at a time is the latest one at or
+    before it (see at()).
+    """
+
+    def __init__(self, root: str = SNAPSHOT_ARCHIVE_DIR, compresslevel: int = SNAPSHOT_ARCHIVE_COMPRESSLEVEL):
+        self.root = root
+        self.compresslevel = compresslevel
+        # Fingerprint of the matches last recorded per sport
+        self._recorded = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, sport: str, day: str):
+        directory = os.path.join(self.root, sport)
+        return os.path.join(directory, f"{day}.ndjson.gz"), os.path.join(directory, f"{day}.idx")
+
+    def append(self, sport: str, matches: List[Dict], timestamp: Optional[float] = None) -> int:
+        """Record one poll of a sport; returns the compressed size in bytes."""
+        return self._append(sport, json.dumps(matches, separators=(',', ':')), timestamp)
+
+    def _append(self, sport: str, matches_json: str, timestamp: Optional[float]) -> int:
+        timestamp = time.time() if timestamp is None else timestamp
+        line = f'{{"ts":{json.dumps(timestamp)},"sport":{json.dumps(sport)},"matches":{matches_json}}}'
+        member = gzip.compress((line + '\n').encode('utf-8'), compresslevel=self.compresslevel)
+
+        data_path, index_path = self._paths(sport, _day(timestamp))
+        with self._lock:
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            with open(data_path, 'ab') as data_file:
+                offset = data_file.tell()
+                data_file.write(member)
+            # The index entry goes last so readers never see an entry without its data
+            with open(index_path, 'ab') as index_file:
+                index_file.write(_INDEX_ENTRY.pack(timestamp, offset, len(member)))
+        return len(member)
+
+    def record(self, slate: NormalizedSlate, timestamp: Optional[float] = None) -> Optional[int]:
+        """Record a slate's flat view, unless it equals the last one this archive recorded for the sport.
+
+        The comparison is against what was recorded, not slate.delta: the
+        incremental slate is shared with the bots' own fetches, so its delta
+        can be empty even though this archive never saw the change.
+        """
+        matches_json = json.dumps(slate.flat(), separators=(',', ':'))
+        fingerprint = hashlib.blake2b(matches_json.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            if self._recorded.get(slate.sport) == fingerprint:
+                return None
+            self._recorded[slate.sport] = fingerprint
+        return self._append(slate.sport, matches_json, timestamp)
+
+    def on_snapshot(self, snapshot: LiveSnapshot) -> None:
+        """LivePoller listener recording every published snapshot."""
+        if self.root:
+            self.record(snapshot.slate, snapshot.fetched_at)
+
+    def days(self, sport: str) -> List[str]:
+        """Return the UTC days (YYYYMMDD) with recorded polls for a sport, oldest first."""
+        directory = os.path.join(self.root, sport)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len('.idx')] for name in os.listdir(directory) if name.endswith('.idx'))
+
+    def _load_index(self, sport: str, day: str) -> _DayIndex:
+        _, index_path = self._paths(sport, day)
+        try:
+            with open(index_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        # Drop a partially written trailing entry
+        return _DayIndex(data[:len(data) - len(data) % _INDEX_ENTRY.size])
+
+    def _read(self, data_file, sport: str, offset: int, length: int) -> ArchivedSnapshot:
+        data_file.seek(offset)
+        record = json.loads(gzip.decompress(data_file.read(length)))
+        return ArchivedSnapshot(record['ts'], record.get('sport', sport), record['matches'])
+
+    def read_range(self, sport: str, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Iterator[ArchivedSnapshot]:
+        """Yield a sport's recorded polls with start <= timestamp <= end, oldest first.
+
+        Only the day files overlapping the range are opened and only the
+        matching polls are decompressed, one at a time.
+        """
+        first_day = _day(start) if start is not None else None
+        last_day = _day(end) if end is not None else None
+        for day in self.days(sport):
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            index = self._load_index(sport, day)
+            low = bisect_left(index.timestamps, start) if start is not None else 0
+            high = bisect_right(index.timestamps, end) if end is not None else len(index)
+            if low >= high:
+                continue
+            data_path, _ = self._paths(sport, day)
+            with open(data_path, 'rb') as data_file:
+                for i in range(low, high):
+                    _, offset, length = index.entry(i)
+                    yield self._read(data_file, sport, offset, length)
+
+    def at(self, sport: str, timestamp: float) -> Optional[ArchivedSnapshot]:
+        """Return the snapshot in force at timestamp: the latest poll recorded at or before it."""
+        last_day = _day(timestamp) if timestamp != float('inf') else None
+        for day in reversed(self.days(sport)):
+            if last_day and day > last_day:
+                continue
+            index = self._load_index(sport, day)
+            position = bisect_right(index.timestamps, timestamp)
+            if position:
+                _, offset, length = index.entry(position - 1)
+                data_path, _ = self._paths(sport, day)
+                with open(data_path, 'rb') as data_file:
+                    return self._read(data_file, sport, offset, length)
+        return None
+
+    def latest(self, sport: str) -> Optional[ArchivedSnapshot]:
+        """Return the most recently recorded poll of a sport."""
+        return self.at(sport, float('inf'))
+
+    def stats(self, sport: str) -> Dict[str, int]:
+        """Return the number of recorded polls and the compressed bytes on disk for a sport."""
+        polls = size = 0
+        for day in self.days(sport):
+            data_path, index_path = self._paths(sport, day)
+            polls += os.path.getsize(index_path) // _INDEX_ENTRY.size
+            size += os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        return {'days': len(self.days(sport)), 'polls': polls, 'bytes': size}
+
+
+# Process-wide archive; the chat app subscribes it to the live poller
+snapshot_archive = SnapshotArchive()
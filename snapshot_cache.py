@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from live_fetcher import fetch_livescores
+
+# How long a fetched livescores payload is served before statpal is asked again
+SNAPSHOT_CACHE_TTL = float(os.environ.get('SNAPSHOT_CACHE_TTL', 30))
+# Upper bound on cached payloads; least recently used sports are evicted first
+SNAPSHOT_CACHE_MAXSIZE = int(os.environ.get('SNAPSHOT_CACHE_MAXSIZE', 16))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire a fixed number of seconds after being set."""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key):
+        """Return the live value for key or _MISSING. Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl=None):
+        """Insert value and evict the oldest entries past maxsize. Caller must hold the lock."""
+        self._entries[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache value under key for ttl seconds (defaults to the cache TTL)."""
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value, or default if it was not cached."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class _InflightLoad:
+    """A load in progress that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class SnapshotCache(TTLCache):
+    """TTL/LRU cache that coalesces concurrent misses into a single upstream load.
+
+    When several threads miss on the same key at once, only the first one calls
+    the loader; the others block until it finishes and share its result.
+    Failed loads (None results) are not cached.
+    """
+
+    def __init__(self, maxsize: int = SNAPSHOT_CACHE_MAXSIZE, ttl: float = SNAPSHOT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._inflight = {}
+        self.coalesced = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader once on a miss."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightLoad()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            return call.value
+
+        try:
+            call.value = loader()
+        finally:
+            with self._lock:
+                if call.value is not None:
+                    self._store(key, call.value)
+                del self._inflight[key]
+            call.done.set()
+        return call.value
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['coalesced'] = self.coalesced
+        return stats
+
+
+# Process-wide cache of raw livescores payloads keyed by sport
+snapshot_cache = SnapshotCache()
+
+
+def get_livescores(sport: str) -> Optional[Dict]:
+    """Return the livescores payload for a sport, served from snapshot_cache when fresh."""
+    return snapshot_cache.get_or_load(sport, lambda: fetch_livescores(sport))
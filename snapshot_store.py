@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from match_normalizer import NormalizedSlate
+from snapshot_cache import TTLCache
+
+# How long a published snapshot can still be resolved from a history reference
+SNAPSHOT_STORE_TTL = float(os.environ.get('SNAPSHOT_STORE_TTL', 600))
+# Upper bound on retained snapshots across all sports
+SNAPSHOT_STORE_MAXSIZE = int(os.environ.get('SNAPSHOT_STORE_MAXSIZE', 64))
+
+# Distinguishes snapshot ids minted by this process from those of earlier runs
+_EPOCH = uuid.uuid4().hex[:8]
+
+
+class StoredSnapshot:
+    """One sport's livescores payload and its normalized slate, under a stable id."""
+
+    def __init__(self, snapshot_id: str, sport: str, version: int, raw_data: Dict, slate: NormalizedSlate):
+        self.snapshot_id = snapshot_id
+        self.sport = sport
+        self.version = version
+        self.raw_data = raw_data
+        self.slate = slate
+        self.stored_at = time.time()
+
+    def ref(self) -> Dict[str, Any]:
+        """Return the compact reference stored in conversation history."""
+        return {'id': self.snapshot_id, 'sport': self.sport, 'version': self.version}
+
+
+class SnapshotStore:
+    """Recently published snapshots, resolvable by the reference kept in history.
+
+    Conversation history carries only {'id', 'sport', 'version'}; the
+    payload stays in the process. Publishing the payload object that is
+    already the sport's latest snapshot returns the existing entry, so
+    versions only move when the data does.
+    """
+
+    def __init__(self, maxsize: int = SNAPSHOT_STORE_MAXSIZE, ttl: float = SNAPSHOT_STORE_TTL):
+        self._snapshots = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._latest = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def put(self, sport: str, raw_data: Dict, slate: NormalizedSlate) -> StoredSnapshot:
+        """Store a sport's payload and return its snapshot."""
+        with self._lock:
+            latest = self._latest.get(sport)
+            if latest is not None and latest.raw_data is raw_data and latest.snapshot_id in self._snapshots:
+                return latest
+
+            version = self._versions.get(sport, 0) + 1
+            self._versions[sport] = version
+            snapshot = StoredSnapshot(f"{sport}:{_EPOCH}:{version}", sport, version, raw_data, slate)
+            self._latest[sport] = snapshot
+        self._snapshots.set(snapshot.snapshot_id, snapshot)
+        return snapshot
+
+    def resolve(self, ref: Optional[Dict]) -> Optional[StoredSnapshot]:
+        """Return the snapshot a history reference points to, or None if it has expired."""
+        if not isinstance(ref, dict) or not ref.get('id'):
+            return None
+        snapshot = self._snapshots.get(ref['id'])
+        if snapshot is None or snapshot.version != ref.get('version'):
+            return None
+        return snapshot
+
+    def latest(self, sport: str) -> Optional[StoredSnapshot]:
+        """Return the most recent snapshot stored for a sport, if it has not expired."""
+        snapshot = self._latest.get(sport)
+        return snapshot if snapshot is not None and snapshot.snapshot_id in self._snapshots else None
+
+    def stats(self) -> Dict[str, Any]:
+        return self._snapshots.stats()
+
+
+# Process-wide store shared by the poller and every bot
+snapshot_store = SnapshotStore()
@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+
+from columnar_store import ColumnarStore, Segment, SegmentWriter
+from match_normalizer import normalize_records
+from snapshot_archive import SnapshotArchive
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'soccer_filtered_data.json')
+
+
+def nba_payload(statuses):
+    return {'livescores': {'sport': 'basketball', 'tournament': {'name': 'NBA', 'country': 'usa', 'match': [
+        {'id': str(1000 + i), 'status': status,
+         'home': {'name': f'Home {i}', 'totalscore': str(100 + i)},
+         'away': {'name': f'Away {i}', 'totalscore': '?'}}
+        for i, status in enumerate(statuses)]}}}
+
+
+def test_records_round_trip(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    records = normalize_records(nba_payload(['Final', 'Q3', 'Not Started']), 'nba')
+    path = store.append_records(records, timestamp=1750000000.0)
+
+    with Segment(path) as segment:
+        assert len(segment) == 3
+        assert segment.decode('match_id') == ['1000', '1001', '1002']
+        assert segment.decode('home') == ['Home 0', 'Home 1', 'Home 2']
+        assert segment['home_score'].tolist() == [100, 101, 102]
+        assert segment['away_score'].tolist() == [-1, -1, -1]
+        assert segment['state'].tolist() == [2, 1, 0]
+        assert segment['timestamp'].tolist() == [1750000000.0] * 3
+        # Columns are views of the mapped file, not copies
+        assert not segment['timestamp'].flags.owndata
+
+
+def test_archive_import_keeps_match_ids(tmp_path):
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+    records = normalize_records(nba_payload(['Q1', 'Q2', 'Q4']), 'nba')
+    for i in range(3):
+        archive.append('nba', [record.to_flat() for record in records], timestamp=1750000000.0 + i)
+
+    store = ColumnarStore(str(tmp_path / 'history'))
+    path = store.import_archive(archive, 'nba')
+    with Segment(path) as segment:
+        assert len(segment) == 9
+        assert sorted(set(segment.decode('match_id'))) == ['1000', '1001', '1002']
+
+
+def test_json_dump_import_keeps_distinct_matches(tmp_path):
+    with open(FIXTURE) as f:
+        matches = json.load(f)
+    store = ColumnarStore(str(tmp_path))
+    path = store.import_json(FIXTURE, timestamp=1.0)
+
+    with Segment(path) as segment:
+        assert len(segment) == len(matches)
+        ids = segment.decode('match_id')
+        assert 'N/A' not in ids
+        assert len(set(ids)) == len({(m['league_name'], m['home_team'], m['away_team']) for m in matches})
+
+
+def test_scan_filters_by_sport(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.append_records(normalize_records(nba_payload(['Final', 'Q3']), 'nba'), timestamp=1.0)
+    writer = SegmentWriter()
+    writer.add_flat({'sport': 'soccer', 'home_team': 'A', 'away_team': 'B', 'home_score': '1',
+                     'away_score': '0', 'status': 'FT', 'league_name': 'L'}, 2.0)
+    store.append(writer)
+
+    assert len(store) == 3
+    nba = list(store.scan(['home_score', 'state'], sport='nba'))
+    assert [batch['home_score'].tolist() for batch in nba] == [[100, 101]]
+    soccer = np.concatenate([batch['state'] for batch in store.scan(['state'], sport='soccer')])
+    assert soccer.tolist() == [2]
+    assert list(store.scan(['state'], sport='tennis')) == []
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from context_builder import build_context, estimate_tokens, rank_matches
+from match_normalizer import normalize_livescores
+
+
+def match(i, home, kickoff, status='Not Started'):
+    return {'id': str(2000 + i), 'status': status, 'date': kickoff.strftime('%d.%m.%Y'),
+            'time': kickoff.strftime('%H:%M'),
+            'home': {'name': home, 'totalscore': '?'}, 'away': {'name': f'Away {i}', 'totalscore': '?'}}
+
+
+def slate(matches):
+    payload = {'livescores': {'sport': 'basketball', 'tournament': {'name': 'NBA', 'country': 'usa',
+                                                                    'match': matches}}}
+    return normalize_livescores(payload, 'nba')
+
+
+def test_ties_rank_by_kickoff_closest_to_now():
+    now = datetime.now()
+    matches = [match(0, 'Far Home', now + timedelta(days=5)), match(1, 'Near Home', now + timedelta(hours=2)),
+               match(2, 'Past Home', now - timedelta(days=1))]
+    assert [i for _, i in rank_matches(slate(matches), '')] == [1, 2, 0]
+
+
+def test_mentions_outrank_recency():
+    now = datetime.now()
+    matches = [match(0, 'Near Home', now + timedelta(hours=1)), match(1, 'Boston Celtics', now + timedelta(days=3))]
+    assert rank_matches(slate(matches), 'how will the boston celtics do?')[0][1] == 1
+
+
+def test_over_budget_line_does_not_end_the_context():
+    now = datetime.now()
+    matches = [match(0, 'Celtics ' + 'Long ' * 150, now), match(1, 'Celtics Short', now)]
+    current = slate(matches)
+    budget = 150
+    assert estimate_tokens(current.lines[0]) > budget
+    context = build_context(current, 'celtics', token_budget=budget)
+    assert 'Celtics Short' in context
+    assert 'Long Long' not in context
+    assert '(+1 less relevant nba matches omitted)' in context
+
+
+def test_focus_match_ranks_first():
+    now = datetime.now()
+    current = slate([match(0, 'Near Home', now), match(1, 'Other Home', now + timedelta(days=2))])
+    assert rank_matches(current, '')[0][1] == 0
+    assert rank_matches(current, '', focus=current.records[1])[0][1] == 1
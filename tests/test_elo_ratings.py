@@ -0,0 +1,41 @@
+import json
+
+from elo_ratings import EloRatings
+from match_normalizer import normalize_livescores
+
+
+def nba_payload(first_id, count):
+    return {'livescores': {'sport': 'basketball', 'tournament': {'name': 'NBA', 'country': 'usa', 'match': [
+        {'id': str(first_id + i), 'status': 'Final',
+         'home': {'name': f'Home {i}', 'totalscore': '110'},
+         'away': {'name': f'Away {i}', 'totalscore': '100'}}
+        for i in range(count)]}}}
+
+
+def saved_settled(path):
+    with open(path) as f:
+        return len(json.load(f)['settled'])
+
+
+def test_saves_are_throttled_and_flushed(tmp_path):
+    path = str(tmp_path / 'elo.json')
+    ratings = EloRatings(path, save_interval=3600)
+
+    assert ratings.update(normalize_livescores(nba_payload(1, 2), 'nba')) == 2
+    assert saved_settled(path) == 2
+    # Inside the interval results are applied in memory only
+    assert ratings.update(normalize_livescores(nba_payload(10, 3), 'nba')) == 3
+    assert saved_settled(path) == 2
+
+    ratings.flush()
+    assert saved_settled(path) == 5
+    reloaded = EloRatings(path)
+    assert reloaded.stats() == {'teams': 6, 'settled': 5}
+
+
+def test_results_are_applied_once(tmp_path):
+    ratings = EloRatings(str(tmp_path / 'elo.json'), save_interval=0)
+    slate = normalize_livescores(nba_payload(1, 1), 'nba')
+    assert ratings.update(slate) == 1
+    assert ratings.update(slate) == 0
+    assert ratings.rating('nba', 'NBA', 'Home 0') > ratings.rating('nba', 'NBA', 'Away 0')
@@ -0,0 +1,32 @@
+from entity_index import EntityIndex
+from match_record import MatchRecord
+
+
+class Slate:
+    def __init__(self, sport, records):
+        self.sport = sport
+        self.records = records
+
+
+def index():
+    entity_index = EntityIndex()
+    entity_index.update(Slate('soccer', [
+        MatchRecord(sport='soccer', match_id='1', league='Premier League', country='England',
+                    home='Red Star Rovers', away='New World United'),
+        MatchRecord(sport='soccer', match_id='2', league='Serie A', country='Italy', home='Juventus', away='Inter')
+    ]))
+    return entity_index
+
+
+def test_single_name_word_does_not_resolve():
+    entity_index = index()
+    assert entity_index.lookup("Anything new today?")
+    assert entity_index.resolve("Anything new today?") is None
+    assert entity_index.resolve("Is the star player fit?") is None
+
+
+def test_full_name_league_or_two_name_words_resolve():
+    entity_index = index()
+    assert entity_index.resolve("How are Juventus doing?").record.match_id == '2'
+    assert entity_index.resolve("Premier League scores").sport == 'soccer'
+    assert entity_index.resolve("red star tonight?").record.match_id == '1'
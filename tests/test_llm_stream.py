@@ -0,0 +1,17 @@
+from llm_stream import ResponseStream
+
+
+def test_value_and_result_are_set_once_exhausted():
+    def chunks():
+        yield 'Hello, '
+        yield 'world'
+        return 'remember me'
+
+    completed = []
+    stream = ResponseStream(chunks(), on_complete=lambda text: completed.append(text) or len(completed))
+    iterator = iter(stream)
+    assert next(iterator) == 'Hello, '
+    assert stream.value is None and not completed
+    assert stream.read() == 'Hello, world'
+    assert stream.value == 'remember me'
+    assert completed == ['Hello, world'] and stream.result == 1
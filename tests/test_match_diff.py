@@ -0,0 +1,59 @@
+import copy
+
+from match_diff import IncrementalSlate, match_key
+
+
+def payload(scores):
+    return {'livescores': {'tournament': {'name': 'NBA', 'match': [
+        {'id': str(i), 'home': {'name': f'Home {i}', 'totalscore': score}, 'away': {'name': f'Away {i}'}}
+        for i, score in enumerate(scores)]}}}
+
+
+def build(match, league_info):
+    return (match['id'], match['home']['totalscore'])
+
+
+def test_first_update_builds_everything():
+    slate = IncrementalSlate()
+    delta, artefacts = slate.update(payload(['1', '2']), build)
+    assert delta.added == ['0', '1'] and not delta.changed and not delta.removed
+    assert artefacts == [('0', '1'), ('1', '2')]
+
+
+def test_only_changed_matches_are_rebuilt():
+    slate = IncrementalSlate()
+    slate.update(payload(['1', '2', '3']), build)
+    built = []
+
+    def counting_build(match, league_info):
+        built.append(match['id'])
+        return build(match, league_info)
+
+    delta, artefacts = slate.update(payload(['1', '5']), counting_build)
+    assert built == ['1']
+    assert delta.changed == ['1'] and delta.removed == ['2'] and delta.unchanged == 1
+    assert artefacts == [('0', '1'), ('1', '5')]
+
+
+def test_same_payload_object_is_a_no_op():
+    slate = IncrementalSlate()
+    raw = payload(['1'])
+    slate.update(raw, build)
+    delta, artefacts = slate.update(raw, lambda match, league_info: 1 / 0)
+    assert not delta and delta.unchanged == 1
+    assert artefacts == [('0', '1')]
+    # An equal copy is diffed, but nothing in it changed
+    delta, _ = slate.update(copy.deepcopy(raw), lambda match, league_info: 1 / 0)
+    assert not delta
+
+
+def test_rejected_matches_are_skipped():
+    slate = IncrementalSlate()
+    _, artefacts = slate.update(payload(['1', 'N/A']), lambda m, l: None if m['home']['totalscore'] == 'N/A' else 1)
+    assert artefacts == [1]
+
+
+def test_match_key_falls_back_to_names():
+    assert match_key({'id': 7}, {}) == '7'
+    assert match_key({'home': {'name': 'A'}, 'away': 'B'}, {'name': 'Cup'}) == ('Cup', 'A', 'B')
+    assert match_key({'player': [{'name': 'X'}, {'name': 'Y'}]}, {'name': 'Open'}) == ('Open', 'X', 'Y')
@@ -0,0 +1,62 @@
+import pytest
+
+from columnar_store import _score as store_score
+from match_normalizer import normalize_records
+from match_record import DETAIL_KEYS, MatchColumns, parse_score
+from score_simulator import _score as simulator_score
+from win_probability import _score as probability_score
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2', 2), (' 3 ', 3), (7, 7), ('1 (4)', 1), ('12', 12),
+    ('N/A', None), ('?', None), ('', None), ('-', None), (None, None)
+])
+def test_parse_score(value, expected):
+    assert parse_score(value) == expected
+
+
+def test_callers_pick_their_fallback():
+    assert store_score('?') == -1
+    assert simulator_score('?') == 0
+    assert probability_score('?') == 0
+    assert store_score('3') == simulator_score('3') == probability_score('3') == 3
+
+
+def nba_records():
+    payload = {'livescores': {'tournament': {'name': 'NBA', 'country': 'usa', 'match': [
+        {'id': 7, 'status': 'Q3', 'home': {'name': 'Boston Celtics', 'totalscore': 50},
+         'away': {'name': 'Miami Heat', 'totalscore': '48'}},
+        {'id': '8', 'status': 'Not Started', 'home': {'name': 'Miami Heat'}, 'away': {'name': 'Orlando Magic'}}]}}}
+    return normalize_records(payload, 'nba')
+
+
+def test_record_views():
+    record = nba_records()[0]
+    flat = record.to_flat()
+    assert flat['match_id'] == 7 and flat['home_team'] == 'Boston Celtics'
+    assert (flat['home_score'], flat['away_score']) == (50, '48')
+    assert flat['league_name'] == 'NBA' and flat['sport'] == 'nba'
+    assert set(('quarter', 'time_remaining')) <= set(flat)
+
+    nested = record.to_dict()
+    assert nested['match_id'] == 7
+    assert nested['league'] == {'name': 'NBA', 'country': 'usa', 'season': 'N/A'}
+    assert nested['home']['name'] == 'Boston Celtics' and nested['home']['score'] == 50
+    assert nested['away']['score'] == '48'
+    assert set(nested['details']) == set(DETAIL_KEYS['nba'])
+
+
+def test_records_are_hashable():
+    first, second = nba_records()
+    assert len({first, second, nba_records()[0]}) == 2
+
+
+def test_columns_round_trip_keeps_types():
+    records = nba_records()
+    columns = MatchColumns.from_records(records)
+    assert len(columns) == 2
+    assert columns.records() == records
+    assert columns.to_dicts() == [record.to_flat() for record in records]
+    assert columns.column('match_id') == [7, '8']
+    assert list(columns.home_goals) == [50, -1]
+    assert list(columns.away_goals) == [48, -1]
@@ -0,0 +1,74 @@
+from prediction_extractor import (CONFIDENCE_NO_CALL, CONFIDENCE_TAKE, CONFIDENCE_UNRESOLVED,
+                                  PREDICTION_CONFIDENCE_THRESHOLD, PredictionExtractor)
+
+MATCH_DATA = {'livescores': {'tournament': {'name': 'NBA', 'match': [
+    {'id': '1', 'home': {'name': 'Boston Celtics'}, 'away': {'name': 'Miami Heat'}}]}}}
+
+
+def extract_local(text):
+    return PredictionExtractor().extract_local(text, MATCH_DATA)
+
+
+def test_take_sentence_win():
+    prediction, confidence = extract_local("Great matchup tonight. My take: the Celtics win this one.")
+    assert prediction == {'team/player': 'Boston Celtics', 'prediction': 'win',
+                          'opponent': 'Miami Heat', 'opponent_prediction': 'lose'}
+    assert confidence == CONFIDENCE_TAKE
+
+
+def test_negated_call_flips_the_outcome():
+    prediction, _ = extract_local("The Heat won't win tonight.")
+    assert prediction['team/player'] == 'Miami Heat'
+    assert prediction['prediction'] == 'lose'
+    assert prediction['opponent_prediction'] == 'win'
+
+
+def test_pronoun_refers_to_last_named_side():
+    prediction, confidence = extract_local("Miami has looked sharp. I think they will win.")
+    assert prediction['team/player'] == 'Miami Heat' and prediction['prediction'] == 'win'
+    assert confidence < CONFIDENCE_TAKE
+
+
+def test_negation_before_the_subject_flips_the_outcome():
+    prediction, _ = extract_local("No way the Celtics win this.")
+    assert prediction['team/player'] == 'Boston Celtics' and prediction['prediction'] == 'lose'
+
+
+def test_negation_in_another_clause_is_ignored():
+    prediction, _ = extract_local("The Celtics are not at full strength, but the Heat win this.")
+    assert prediction['team/player'] == 'Miami Heat' and prediction['prediction'] == 'win'
+
+
+def test_negated_draw_is_not_a_draw_call():
+    prediction, confidence = extract_local("I don't see a tie here.")
+    assert prediction['prediction'] == 'none'
+    assert confidence < PREDICTION_CONFIDENCE_THRESHOLD
+
+
+def test_named_side_without_a_call_is_unresolved():
+    prediction, confidence = extract_local("**My Take**: The Celtics should dominate and seal this one comfortably.")
+    assert prediction['prediction'] == 'none'
+    assert prediction['team/player'] == 'Boston Celtics' and prediction['opponent'] == 'none'
+    assert confidence == CONFIDENCE_UNRESOLVED < PREDICTION_CONFIDENCE_THRESHOLD
+
+
+def test_reply_naming_no_side_makes_no_call():
+    prediction, confidence = extract_local("Nothing on the schedule worth a pick today.")
+    assert prediction['team/player'] == 'none' and prediction['prediction'] == 'none'
+    assert confidence == CONFIDENCE_NO_CALL
+
+
+def test_fallback_only_when_unsure():
+    calls = []
+
+    def fallback(text):
+        calls.append(text)
+        return {'team/player': 'fallback'}
+
+    extractor = PredictionExtractor()
+    extractor.extract("My pick is the Celtics.", MATCH_DATA, fallback=fallback)
+    assert not calls
+    # A call for a side the slate does not know leaves the extractor unsure
+    result = extractor.extract("Nobody wins easily; the Lakers will win it.", MATCH_DATA, fallback=fallback)
+    assert extractor.confidence_threshold == PREDICTION_CONFIDENCE_THRESHOLD
+    assert result == {'team/player': 'fallback'} and len(calls) == 1
@@ -0,0 +1,81 @@
+import copy
+import gzip
+
+from match_normalizer import normalize_livescores
+from snapshot_archive import SnapshotArchive
+
+DAY = 86400.0
+T0 = 1750000000.0
+
+
+def payload(home_score='1'):
+    return {'livescore': {'league': [{'name': 'Archive League', 'country': 'nowhere', 'match': [
+        {'id': 'a1', 'status': '55', 'home': {'name': 'Alpha', 'goals': home_score},
+         'away': {'name': 'Beta', 'goals': '0'}},
+        {'id': 'a2', 'status': 'FT', 'home': {'name': 'Gamma', 'goals': '2'},
+         'away': {'name': 'Delta', 'goals': '2'}}]}]}}
+
+
+def test_append_and_read_range(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    for i in range(6):
+        archive.append('nba', [{'match_id': str(i)}], timestamp=T0 + i * 0.5 * DAY)
+
+    assert len(archive.days('nba')) >= 3
+    polls = list(archive.read_range('nba', T0 + 0.5 * DAY, T0 + 2 * DAY))
+    assert [poll.timestamp for poll in polls] == [T0 + 0.5 * DAY, T0 + DAY, T0 + 1.5 * DAY, T0 + 2 * DAY]
+    assert [poll.matches[0]['match_id'] for poll in polls] == ['1', '2', '3', '4']
+    assert len(list(archive.read_range('nba'))) == 6
+    assert list(archive.read_range('nba', T0 + 10 * DAY)) == []
+    assert list(archive.read_range('soccer')) == []
+
+
+def test_at_and_latest(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    for i in range(3):
+        archive.append('nhl', [{'match_id': str(i)}], timestamp=T0 + i * DAY)
+
+    assert archive.at('nhl', T0 - 1) is None
+    assert archive.at('nhl', T0 + 1.5 * DAY).matches == [{'match_id': '1'}]
+    assert archive.latest('nhl').matches == [{'match_id': '2'}]
+    assert archive.latest('mlb') is None
+
+
+def test_data_file_is_plain_gzip_ndjson(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.append('nfl', [{'match_id': 'x'}], timestamp=T0)
+    archive.append('nfl', [{'match_id': 'y'}], timestamp=T0 + 60)
+
+    data_path, _ = archive._paths('nfl', archive.days('nfl')[0])
+    with gzip.open(data_path, 'rt') as f:
+        assert len(f.readlines()) == 2
+    assert archive.stats('nfl')['polls'] == 2
+
+
+def test_truncated_index_entry_is_ignored(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.append('nba', [], timestamp=T0)
+    _, index_path = archive._paths('nba', archive.days('nba')[0])
+    with open(index_path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    assert len(list(archive.read_range('nba'))) == 1
+
+
+def test_record_skips_only_what_it_already_recorded(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    sport = 'soccer'
+
+    first = normalize_livescores(payload('1'), sport)
+    assert archive.record(first, timestamp=T0) is not None
+    # Same matches again: skipped
+    assert archive.record(normalize_livescores(copy.deepcopy(payload('1')), sport), timestamp=T0 + 15) is None
+
+    # A bot fetch consumes the change, so the poller's next slate has an empty delta
+    normalize_livescores(payload('2'), sport)
+    polled = normalize_livescores(copy.deepcopy(payload('2')), sport)
+    assert not polled.delta
+    assert archive.record(polled, timestamp=T0 + 30) is not None
+
+    recorded = list(archive.read_range(sport))
+    assert [poll.matches[0]['home_score'] for poll in recorded] == ['1', '2']
+    assert recorded[0].matches[0]['match_id'] == 'a1'
@@ -0,0 +1,14 @@
+# Text helpers shared by the prompt, backend and name-matching modules. Kept
+# free of project imports so any layer can use them without side effects.
+
+# Words too common in team and league names to signal a specific match
+GENERIC_NAME_WORDS = {
+    'the', 'and', 'club', 'city', 'united', 'town', 'real', 'sport', 'sports', 'team', 'women',
+    'reserves', 'youth', 'league', 'cup', 'division', 'national', 'state', 'athletic', 'football',
+    'soccer', 'basketball', 'hockey', 'baseball', 'tennis', 'open', 'usa'
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
@@ -0,0 +1,297 @@
+import math
+import re
+from typing import Optional, Sequence
+
+import numpy as np
+
+from match_record import MatchRecord, parse_score
+from match_status import FINAL, SCHEDULED, classify_status
+
+# Regulation length per sport as (periods, minutes per period)
+REGULATION = {
+    'soccer': (2, 45),
+    'nba': (4, 12),
+    'nfl': (4, 15),
+    'nhl': (3, 20),
+    'mlb': (9, 1)      # innings; mlb progress is counted in innings, not minutes
+}
+
+# Low-scoring sports: expected goals per full regulation game as (home, away),
+# remaining goals are modelled as independent Poisson counts
+POISSON_RATES = {
+    'soccer': (1.50, 1.15),
+    'nhl': (3.15, 2.90)
+}
+
+# High-scoring sports: standard deviation of the full-game margin and the home
+# edge in points, the remaining margin is modelled as a normal variable
+MARGIN_MODELS = {
+    'nba': (13.0, 2.5),
+    'nfl': (13.5, 1.8),
+    'mlb': (4.4, 0.25)
+}
+
+# Share of regulation-time ties won by the home side in overtime/shootouts
+OVERTIME_HOME_SHARE = 0.52
+# Highest number of remaining goals per side the Poisson grid sums over
+MAX_REMAINING_GOALS = 12
+# Tennis: exponent of the ranking ratio in the per-set win probability
+RANKING_EXPONENT = 0.6
+
+# Binomial coefficients C(a - 1 + k, k) for a sets still needed and k sets conceded
+_SET_PATHS = np.array([[math.comb(a - 1 + k, k) if a > 0 else 0 for k in range(6)] for a in range(6)], dtype=float)
+
+_NUMBER = re.compile(r'\d+')
+_CLOCK = re.compile(r'^(\d{1,2}):(\d{2})$')
+_ORDINAL_PERIOD = re.compile(r'(\d+)\s*(?:st|nd|rd|th)?\s*(?:quarter|period|qtr|inning|inn)', re.IGNORECASE)
+_SHORT_PERIOD = re.compile(r'^(?:q|p|quarter|period)\s*(\d+)', re.IGNORECASE)
+_SOCCER_MINUTE = re.compile(r'^(\d{1,3})(?:\s*\+\s*(\d{1,2}))?\'?$')
+
+
+def _to_int(value) -> Optional[int]:
+    """Parse a numeric detail field (period, minute, ranking): the first number anywhere in it."""
+    match = _NUMBER.search(str(value)) if value not in (None, 'N/A', '') else None
+    return int(match.group()) if match else None
+
+
+def _score(value) -> int:
+    score = parse_score(value)
+    return score if score is not None else 0
+
+
+def _clock_minutes(value) -> Optional[float]:
+    match = _CLOCK.match(str(value or '').strip())
+    return int(match.group(1)) + int(match.group(2)) / 60 if match else None
+
+
+def _period(record: MatchRecord, key: str) -> Optional[int]:
+    """Return the current period/quarter/inning from the record's detail or status."""
+    period = _to_int(record.detail(key))
+    if period is not None:
+        return period
+    status = str(record.status)
+    match = _ORDINAL_PERIOD.search(status) or _SHORT_PERIOD.match(status.strip())
+    return int(match.group(1)) if match else None
+
+
+def elapsed_fraction(record: MatchRecord) -> float:
+    """Estimate the share of regulation already played, from status, period and clock.
+
+    Scheduled matches are at 0.0 and finished ones at 1.0; live matches
+    whose progress cannot be read are assumed to be halfway through.
+    """
+    state = classify_status(record.status)
+    if state == SCHEDULED:
+        return 0.0
+    if state == FINAL:
+        return 1.0
+
+    sport = record.sport
+    status = str(record.status).strip().lower()
+    if sport not in REGULATION:
+        return 0.5
+    periods, length = REGULATION[sport]
+    total = periods * length
+
+    if sport == 'soccer':
+        if status in ('ht', 'half time', 'halftime'):
+            return 0.5
+        if status in ('et', 'pen', 'pen.', 'break time', 'awaiting extra time', 'awaiting penalties'):
+            return 1.0
+        match = _SOCCER_MINUTE.match(status)
+        minute = int(match.group(1)) if match else _to_int(record.detail('minute'))
+        return min(minute / total, 1.0) if minute is not None else 0.5
+
+    if sport == 'mlb':
+        inning = _period(record, 'inning')
+        if inning is None:
+            return 0.5
+        half = f"{record.detail('inning_half')} {status}".lower()
+        if 'end' in half:
+            played = inning
+        elif 'mid' in half:
+            played = inning - 0.5
+        elif 'bot' in half:
+            played = inning - 0.25
+        else:
+            played = inning - 0.75
+        return min(played / total, 1.0)
+
+    if 'half' in status:
+        return 0.5
+    if status.startswith('ot') or 'overtime' in status:
+        return 1.0
+    period = _period(record, 'quarter' if sport in ('nba', 'nfl') else 'period')
+    if period is None:
+        return 0.5
+    period = min(period, periods)
+    clock = _clock_minutes(record.detail('time_remaining'))
+    remaining_in_period = min(clock, length) if clock is not None else length / 2
+    return min(((period - 1) * length + length - remaining_in_period) / total, 1.0)
+
+
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz-Stegun 7.1.26 erf, |error| < 1.5e-7)."""
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def poisson_pmf(rates: np.ndarray, max_count: int = MAX_REMAINING_GOALS) -> np.ndarray:
+    """Return an (n, max_count + 1) array of Poisson probabilities, one row per rate."""
+    rates = np.asarray(rates, dtype=float)
+    counts = np.arange(1, max_count + 1)
+    steps = np.concatenate([np.ones((len(rates), 1)), rates[:, None] / counts[None, :]], axis=1)
+    return np.exp(-rates)[:, None] * np.cumprod(steps, axis=1)
+
+
+def _poisson_outcomes(margin, remaining, home_rate, away_rate):
+    """Home win / draw / away win arrays when the rest of the game is Poisson goals."""
+    home = poisson_pmf(home_rate * remaining)
+    away = poisson_pmf(away_rate * remaining)
+    joint = home[:, :, None] * away[:, None, :]
+    goals = np.arange(MAX_REMAINING_GOALS + 1)
+    final_margin = margin[:, None, None] + (goals[:, None] - goals[None, :])[None, :, :]
+    win = (joint * (final_margin > 0)).sum(axis=(1, 2))
+    draw = (joint * (final_margin == 0)).sum(axis=(1, 2))
+    # Mass beyond the grid is negligible; renormalise so the three outcomes sum to one
+    total = joint.sum(axis=(1, 2))
+    return win / total, draw / total, (total - win - draw) / total
+
+
+def _margin_outcomes(margin, remaining, sigma, edge):
+    """Home win / away win arrays when the rest of the game is a normal margin."""
+    spread = sigma * np.sqrt(remaining)
+    settled = spread <= 0
+    z = (margin + edge * remaining) / np.where(settled, 1.0, spread)
+    win = np.where(settled, np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, OVERTIME_HOME_SHARE)),
+                   _normal_cdf(z))
+    return win, 1.0 - win
+
+
+def _set_win_probability(home_rank, away_rank):
+    """Per-set win probability for the home player from the two rankings (0.5 if unknown)."""
+    known = (home_rank > 0) & (away_rank > 0)
+    ratio = np.where(known, home_rank / np.where(known, away_rank, 1.0), 1.0)
+    return 1.0 / (1.0 + ratio ** RANKING_EXPONENT)
+
+
+def _tennis_outcomes(home_sets, away_sets, final, p):
+    """Home/away match win arrays from sets won, treating each remaining set as a coin with bias p."""
+    sets_to_win = np.where((np.maximum(home_sets, away_sets) >= 2) & ~final, 3, 2)
+    sets_to_win = np.maximum(sets_to_win, np.maximum(home_sets, away_sets))
+    need_home = sets_to_win - home_sets
+    need_away = sets_to_win - away_sets
+    win = np.zeros(len(p))
+    # P(home takes need_home sets before away takes need_away): sum over sets away wins first
+    for k in range(int(need_away.max(initial=0))):
+        paths = _SET_PATHS[np.clip(need_home, 0, 5).astype(int), min(k, 5)]
+        win += np.where(k < need_away, paths * p ** need_home * (1 - p) ** k, 0.0)
+    win = np.where(need_home <= 0, 1.0, np.where(need_away <= 0, 0.0, win))
+    return win, 1.0 - win
+
+
+class WinProbabilities:
+    """Home win / draw / away win probabilities for a batch of matches.
+
+    Arrays are aligned with records; draw is zero for sports where ties are
+    settled in overtime, shootouts or extra sets.
+    """
+
+    def __init__(self, records: Sequence[MatchRecord], home: np.ndarray, draw: np.ndarray,
+                 away: np.ndarray, elapsed: np.ndarray):
+        self.records = list(records)
+        self.home = home
+        self.draw = draw
+        self.away = away
+        self.elapsed = elapsed
+        self._positions = {id(record): i for i, record in enumerate(self.records)}
+
+    def __len__(self):
+        return len(self.records)
+
+    def index_of(self, record: MatchRecord) -> Optional[int]:
+        return self._positions.get(id(record))
+
+    def percentages(self, i: int) -> tuple:
+        """Return rounded (home, draw, away) percentages for match i."""
+        return (int(round(self.home[i] * 100)), int(round(self.draw[i] * 100)),
+                int(round(self.away[i] * 100)))
+
+    def label(self, i: int) -> str:
+        """Compact annotation for a context line, e.g. 'win% 62/20/18'."""
+        return "win% {}/{}/{}".format(*self.percentages(i))
+
+    def describe(self, i: int) -> str:
+        """One readable line for match i, for prompts."""
+        record = self.records[i]
+        home, draw, away = self.percentages(i)
+        text = f"{record.home} {home}%"
+        if record.sport == 'soccer':
+            text += f", draw {draw}%"
+        text += f", {record.away} {away}%"
+        state = classify_status(record.status)
+        progress = f"{int(round(self.elapsed[i] * 100))}% played" if state not in (SCHEDULED, FINAL) else state
+        return f"{record.home} {record.home_score}-{record.away_score} {record.away} ({progress}): {text}"
+
+    def render(self, limit: Optional[int] = None) -> str:
+        """Return the probabilities as prompt lines, one per match."""
+        count = len(self) if limit is None else min(limit, len(self))
+        return "\n".join(f"- {self.describe(i)}" for i in range(count))
+
+
+def win_probabilities(records: Sequence[MatchRecord]) -> WinProbabilities:
+    """Score every match in one vectorized pass per sport model.
+
+    Progress comes from elapsed_fraction(); the current score differential
+    and the scoring model of the sport (Poisson goals for soccer and hockey,
+    a normal margin for basketball, football and baseball, per-set odds for
+    tennis) give the outcome probabilities. Sports without a model get an
+    even split.
+    """
+    records = list(records)
+    n = len(records)
+    sports = np.array([record.sport for record in records], dtype=object)
+    home_score = np.array([_score(record.home_score) for record in records], dtype=float)
+    away_score = np.array([_score(record.away_score) for record in records], dtype=float)
+    elapsed = np.array([elapsed_fraction(record) for record in records], dtype=float)
+    final = np.array([classify_status(record.status) == FINAL for record in records], dtype=bool)
+    margin = home_score - away_score
+    remaining = np.where(final, 0.0, 1.0 - elapsed)
+
+    home = np.full(n, 0.5)
+    draw = np.zeros(n)
+    away = np.full(n, 0.5)
+
+    for sport, (home_rate, away_rate) in POISSON_RATES.items():
+        mask = sports == sport
+        if not mask.any():
+            continue
+        win, tie, loss = _poisson_outcomes(margin[mask], remaining[mask], home_rate, away_rate)
+        if sport == 'soccer':
+            home[mask], draw[mask], away[mask] = win, tie, loss
+        else:
+            home[mask] = win + tie * OVERTIME_HOME_SHARE
+            away[mask] = loss + tie * (1 - OVERTIME_HOME_SHARE)
+
+    for sport, (sigma, edge) in MARGIN_MODELS.items():
+        mask = sports == sport
+        if mask.any():
+            home[mask], away[mask] = _margin_outcomes(margin[mask], remaining[mask], sigma, edge)
+
+    mask = sports == 'tennis'
+    if mask.any():
+        rankings = np.array([[_to_int(record.detail(f'{side}_ranking')) or 0 for side in ('home', 'away')]
+                             for record in records if record.sport == 'tennis'], dtype=float)
+        p = _set_win_probability(rankings[:, 0], rankings[:, 1])
+        home[mask], away[mask] = _tennis_outcomes(home_score[mask], away_score[mask], final[mask], p)
+
+    return WinProbabilities(records, home, draw, away, elapsed)
+
+
+def live_win_probabilities(records: Sequence[MatchRecord]) -> WinProbabilities:
+    """Score only the matches that are currently being played."""
+    return win_probabilities([record for record in records
+                              if classify_status(record.status) not in (SCHEDULED, FINAL)])